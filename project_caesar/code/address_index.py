@@ -0,0 +1,285 @@
+# Imports
+import sqlite3
+
+
+# Components
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# Local imports
+from ..utils import hash, module_logger
+
+
+# Local components
+from .block import Block
+from .gaius import script_to_bytes
+from .script_interpreter import ScriptError, compile_lock_script
+from .utxo_set import BlockUndo, Outpoint
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+ADDRESS_PREFIX = 'csr_'
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scripts (
+    id INTEGER PRIMARY KEY,
+    public_key_hash BLOB NOT NULL UNIQUE,
+    address TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scripts_address ON scripts (address);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL,
+    block_height INTEGER NOT NULL,
+    UNIQUE (hash, block_height)
+);
+CREATE INDEX IF NOT EXISTS transactions_block_height ON transactions (block_height);
+CREATE TABLE IF NOT EXISTS outputs (
+    script_id INTEGER NOT NULL,
+    transaction_id INTEGER NOT NULL,
+    output_index INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    spent_height INTEGER,
+    PRIMARY KEY (script_id, transaction_id, output_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS outputs_spent_height ON outputs (spent_height);
+CREATE TABLE IF NOT EXISTS history (
+    script_id INTEGER NOT NULL,
+    transaction_id INTEGER NOT NULL,
+    PRIMARY KEY (script_id, transaction_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_transaction ON history (transaction_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+
+
+class AddressCoin(NamedTuple):
+    outpoint: Outpoint
+    value: int
+
+
+
+
+class AddressIndex:
+    """
+    An index from addresses (pay-to-public-key-hash lock scripts) to their unspent outputs and transaction history.
+
+    It is kept in an SQLite database, and updated as each block is connected or disconnected. Each public key hash
+    and each transaction is stored once, and the outputs and history tables refer to them by integer id, so their
+    rows (and keys) stay small.
+
+    An address is derived from a public key hash, but cannot be converted back into one (and the toy hash means that
+    two public key hashes can have the same address), so an address lookup covers every public key hash with that
+    address.
+    """
+
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'height'").fetchone()
+        self.height: Optional[int] = None if row is None else row[0]
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'block_hash'").fetchone()
+        self.block_hash: Optional[str] = None if row is None else row[0]
+        self._script_ids: Dict[bytes, int] = {}
+
+
+    def __enter__(self) -> "AddressIndex":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        self._db.close()
+
+
+    def _get_script_id(self, public_key_hash: bytes) -> int:
+        script_id = self._script_ids.get(public_key_hash)
+        if script_id is None:
+            db = self._db
+            row = db.execute('SELECT id FROM scripts WHERE public_key_hash = ?', (public_key_hash,)).fetchone()
+            if row is None:
+                address = get_address(public_key_hash)
+                script_id = db.execute(
+                    'INSERT INTO scripts (public_key_hash, address) VALUES (?, ?)',
+                    (public_key_hash, address),
+                ).lastrowid
+            else:
+                script_id = row[0]
+            self._script_ids[public_key_hash] = script_id
+        return script_id
+
+
+    def _get_transaction_id(self, transaction_hash: str, block_height: int) -> Optional[int]:
+        row = self._db.execute(
+            'SELECT id FROM transactions WHERE hash = ? AND block_height = ?',
+            (bytes.fromhex(transaction_hash), block_height),
+        ).fetchone()
+        return None if row is None else row[0]
+
+
+    def apply_block(self, block: Block, height: int, undo: BlockUndo) -> None:
+        """
+        Indexes a connected block. The undo data (from UtxoSet.apply_block) gives the lock scripts of the spent
+        coins.
+        """
+        db = self._db
+        spent_coins = dict(undo.spent)
+        with db:
+            for tx in block.transactions:
+                transaction_id = db.execute(
+                    'INSERT INTO transactions (hash, block_height) VALUES (?, ?)',
+                    (bytes.fromhex(tx.hash), height),
+                ).lastrowid
+                script_ids = set()
+                if not tx.is_coinbase:
+                    for i in tx.inputs:
+                        outpoint = i.outpoint
+                        public_key_hash = get_public_key_hash(spent_coins[outpoint].lock_script)
+                        if public_key_hash is None:
+                            continue
+                        script_id = self._get_script_id(public_key_hash)
+                        block_height, transaction_hash, output_index = outpoint
+                        db.execute(
+                            'UPDATE outputs SET spent_height = ? '
+                            'WHERE script_id = ? AND transaction_id = ? AND output_index = ?',
+                            (height, script_id, self._get_transaction_id(transaction_hash, block_height), output_index),
+                        )
+                        script_ids.add(script_id)
+                for output_index, o in enumerate(tx.outputs):
+                    public_key_hash = get_public_key_hash(script_to_bytes(o.lock_script))
+                    if public_key_hash is None:
+                        continue
+                    script_id = self._get_script_id(public_key_hash)
+                    db.execute(
+                        'INSERT INTO outputs VALUES (?, ?, ?, ?, NULL)',
+                        (script_id, transaction_id, output_index, o.value),
+                    )
+                    script_ids.add(script_id)
+                db.executemany(
+                    'INSERT INTO history VALUES (?, ?)',
+                    [(script_id, transaction_id) for script_id in script_ids],
+                )
+            self._set_tip(height, block.hash)
+
+
+    def undo_block(self, height: int, previous_block_hash: Optional[str]) -> None:
+        """
+        Removes the block at height (which must be the index's tip) from the index.
+        """
+        if height != self.height:
+            raise ValueError(f"Can only disconnect the tip block (height {self.height}), not height {height}.")
+        db = self._db
+        with db:
+            db.execute('UPDATE outputs SET spent_height = NULL WHERE spent_height = ?', (height,))
+            transaction_ids = [
+                (row[0],) for row in db.execute('SELECT id FROM transactions WHERE block_height = ?', (height,))
+            ]
+            db.executemany('DELETE FROM history WHERE transaction_id = ?', transaction_ids)
+            db.execute(
+                'DELETE FROM outputs WHERE transaction_id IN (SELECT id FROM transactions WHERE block_height = ?)',
+                (height,),
+            )
+            db.execute('DELETE FROM transactions WHERE block_height = ?', (height,))
+            self._set_tip(height - 1 if height > 0 else None, previous_block_hash)
+
+
+    def _set_tip(self, height: Optional[int], block_hash: Optional[str]) -> None:
+        self._db.executemany(
+            'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+            [('height', height), ('block_hash', block_hash)],
+        )
+        self.height = height
+        self.block_hash = block_hash
+
+
+    def _get_script_ids(self, address: str) -> List[int]:
+        # The address may be given as an address (csr_...) or as a public key hash (hex).
+        if address.startswith(ADDRESS_PREFIX):
+            rows = self._db.execute('SELECT id FROM scripts WHERE address = ?', (address,))
+        else:
+            rows = self._db.execute('SELECT id FROM scripts WHERE public_key_hash = ?', (bytes.fromhex(address),))
+        return [row[0] for row in rows]
+
+
+    def get_balance(self, address: str) -> int:
+        """
+        The total value of the unspent outputs paid to an address (or public key hash).
+        """
+        script_ids = self._get_script_ids(address)
+        return sum(
+            self._db.execute(
+                'SELECT COALESCE(SUM(value), 0) FROM outputs WHERE script_id = ? AND spent_height IS NULL',
+                (script_id,),
+            ).fetchone()[0]
+            for script_id in script_ids
+        )
+
+
+    def get_unspent(self, address: str) -> List[AddressCoin]:
+        coins = []
+        for script_id in self._get_script_ids(address):
+            rows = self._db.execute(
+                'SELECT t.block_height, t.hash, o.output_index, o.value FROM outputs o '
+                'JOIN transactions t ON t.id = o.transaction_id '
+                'WHERE o.script_id = ? AND o.spent_height IS NULL',
+                (script_id,),
+            )
+            coins.extend(AddressCoin((h, tx_hash.hex(), i), value) for h, tx_hash, i, value in rows)
+        coins.sort()
+        return coins
+
+
+    def get_history(self, address: str) -> List[Tuple[int, str]]:
+        """
+        The (block height, transaction hash) of every transaction that pays to or spends from an address, oldest
+        first.
+        """
+        history = []
+        for script_id in self._get_script_ids(address):
+            rows = self._db.execute(
+                'SELECT t.block_height, t.hash FROM history h JOIN transactions t ON t.id = h.transaction_id '
+                'WHERE h.script_id = ?',
+                (script_id,),
+            )
+            history.extend((h, tx_hash.hex()) for h, tx_hash in rows)
+        history.sort()
+        return history
+
+
+    def get_transaction_heights(self, transaction_hash: str) -> List[int]:
+        """
+        The heights of the blocks that contain a transaction (every transaction is indexed, whatever its scripts).
+        """
+        rows = self._db.execute(
+            'SELECT block_height FROM transactions WHERE hash = ? ORDER BY block_height',
+            (bytes.fromhex(transaction_hash),),
+        )
+        return [height for (height,) in rows]
+
+
+
+
+def get_public_key_hash(lock_script: bytes) -> Optional[bytes]:
+    # The public key hash of a pay-to-public-key-hash lock script, or None for any other script.
+    try:
+        return compile_lock_script(lock_script).public_key_hash
+    except ScriptError:
+        return None
+
+
+def get_address(public_key_hash: bytes) -> str:
+    # As in address.public_key_to_address: add the network version byte, and hash again.
+    return ADDRESS_PREFIX + hash.toy_hash('00' + public_key_hash.hex())
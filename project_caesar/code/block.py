@@ -1,5 +1,5 @@
 # Components
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import Field
 
 
@@ -8,16 +8,16 @@ from ..utils import hash, misc
 
 
 # Local components
-from .models.hex_string import HexString
+from .block_header import BlockHeader
+from .merkle import MerkleTree
+from .models.binary_serializable import BinarySerializable
 from .models.json_serializable import JsonSerializable
 from .transaction import Transaction
-from ..utils.misc import iso_timestamp_to_int
-from ..utils.hex_utils import compact_size, int_to_hex
 
 
 
 
-class Block(JsonSerializable):
+class Block(JsonSerializable, BinarySerializable):
     """
     Represents a block in a blockchain, containing transactions and a header.
 
@@ -59,79 +59,97 @@ class Block(JsonSerializable):
 
 
     @property
-    def merkle_root(self) -> HexString:
+    def merkle_tree(self) -> MerkleTree:
+        return self.cached('merkle_tree', lambda: MerkleTree.from_transactions(self.transactions))
+
+
+    @property
+    def merkle_root(self) -> str:
         """
         Computes the Merkle root of the block's transactions.
 
         Returns:
             str: The Merkle root of the block's transactions.
         """
-        merkle_root = None
-        n = len(self.transactions)
-        if n == 0:
+        if not self.transactions:
             raise ValueError('No transactions to compute the Merkle root.')
-        if n == 1:
-            tx = self.transactions[0]
-            merkle_root = tx.hash
-            return merkle_root
-        else:
-            raise NotImplementedError('Merkle root computation for more than one transaction is not implemented.')
-        return merkle_root
+        return self.cached('merkle_root', lambda: self.merkle_tree.root)
 
 
     @property
-    def hex_values(self) -> Dict[str, HexString]:
-        version_hex = int_to_hex(self.version)
-        previous_block = self.previous_block
-        block_height_hex = int_to_hex(previous_block['block_height'])
-        block_hash = previous_block['block_hash']
-        timestamp_int = iso_timestamp_to_int(self.timestamp)
-        timestamp_hex = int_to_hex(timestamp_int)
-        mining_difficulty_threshold_hex = int_to_hex(self.mining_difficulty_threshold)
-        nonce_hex = int_to_hex(self.nonce)
-        merkle_root_hex = self.merkle_root
-        transaction_count_hex = int_to_hex(self.transaction_count)
-        transactions_hex_values = [t.hex_values for t in self.transactions]
+    def header(self) -> BlockHeader:
+        """
+        The block's header. Its hash is the block hash.
+        """
+        return self.cached('header', lambda: BlockHeader(
+            version=self.version,
+            previous_block=dict(self.previous_block),
+            merkle_root=self.merkle_root,
+            timestamp=self.timestamp,
+            mining_difficulty_threshold=self.mining_difficulty_threshold,
+            nonce=self.nonce,
+            transaction_count=self.transaction_count,
+        ))
+
+
+    @classmethod
+    def from_header(cls, header: BlockHeader, transactions: List[Transaction], trusted: bool = False) -> "Block":
+        """
+        Creates a block from a header and its transactions (validated, unless trusted is set).
+
+        The block keeps the given header (until a field is assigned), so its hash is the header's hash. Block
+        validation checks that the header's Merkle root matches the transactions.
+        """
+        instance = cls.from_values(
+            trusted,
+            version=header.version,
+            previous_block=dict(header.previous_block),
+            timestamp=header.timestamp,
+            mining_difficulty_threshold=header.mining_difficulty_threshold,
+            nonce=header.nonce,
+            transaction_count=header.transaction_count,
+            transactions=transactions,
+        )
+        instance._cache['header'] = header
+        return instance
+
+
+    @property
+    def hex_values(self) -> Dict[str, Any]:
         return {
-            'version_length': compact_size(version_hex),
-            'version': version_hex,
-            'previous_block': {
-                'block_height_length': compact_size(block_height_hex),
-                'block_height': block_height_hex,
-                'block_hash': block_hash,
-            },
-            'merkle_root': merkle_root_hex,
-            'timestamp_length': compact_size(timestamp_hex),
-            'timestamp': timestamp_hex,
-            'mining_difficulty_threshold_length': compact_size(mining_difficulty_threshold_hex),
-            'mining_difficulty_threshold': mining_difficulty_threshold_hex,
-            'nonce_length': compact_size(nonce_hex),
-            'nonce': nonce_hex,
-            'transaction_count_length': compact_size(transaction_count_hex),
-            'transaction_count': transaction_count_hex,
-            'transactions': transactions_hex_values,
+            'header': self.header.hex_values,
+            'transactions': [t.hex_values for t in self.transactions],
         }
 
 
-    @property
-    def hex(self) -> HexString:
-        v = self.hex_values
-        s = ''
-        s += v['version_length']
-        s += v['version']
-        pb = v['previous_block']
-        s += pb['block_height_length']
-        s += pb['block_height']
-        s += pb['block_hash']
-        s += v['merkle_root']
-        for key in 'timestamp mining_difficulty_threshold nonce transaction_count'.split():
-            s += v[key + '_length']
-            s += v[key]
-        s += ''.join([t.hex for t in self.transactions])
-        return s
+    def serialize_into(self, buffer: bytearray) -> None:
+        self.header.serialize_into(buffer)
+        for t in self.transactions:
+            # Use each transaction's cached bytes.
+            buffer += t.to_bytes()
+
+
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["Block", int]:
+        header, offset = BlockHeader.read_from(data, offset, trusted)
+        transactions = []
+        for _ in range(header.transaction_count):
+            t, offset = Transaction.read_from(data, offset, trusted)
+            transactions.append(t)
+        instance = cls.from_header(header, transactions, trusted)
+        return instance, offset
+
+
+    def to_bytes(self) -> bytes:
+        return self.cached('bytes', super().to_bytes)
 
 
     @property
-    def hash(self) -> HexString:
-        return hash.get_sha256(self.hex)
+    def hash(self) -> str:
+        # The hash covers only the header, so its cost does not depend on the size of the block.
+        return self.header.hash
 
+
+    @property
+    def meets_difficulty(self) -> bool:
+        return self.header.meets_difficulty
@@ -0,0 +1,201 @@
+# Imports
+import struct
+
+
+# Components
+from typing import Any, Dict, Optional, Tuple
+from pydantic import Field
+
+
+# Local imports
+from ..utils import hash
+
+
+# Local components
+from .models.binary_serializable import BinarySerializable
+from .models.json_serializable import JsonSerializable
+from ..utils.misc import int_to_iso_timestamp, iso_timestamp_to_int
+
+
+# Constants
+# Fixed layout (little-endian, no padding):
+# version (4), previous block height (8), previous block hash (32), merkle root (32), timestamp (8),
+# mining difficulty threshold (4), nonce (8), transaction count (4).
+HEADER_FORMAT = struct.Struct('<IQ32s32sQIQI')
+HEADER_FIELD_SIZES = [
+    ('version', 4),
+    ('previous_block_height', 8),
+    ('previous_block_hash', 32),
+    ('merkle_root', 32),
+    ('timestamp', 8),
+    ('mining_difficulty_threshold', 4),
+    ('nonce', 8),
+    ('transaction_count', 4),
+]
+HEADER_SIZE = HEADER_FORMAT.size
+TIMESTAMP_OFFSET = struct.calcsize('<IQ32s32s')
+NONCE_OFFSET = struct.calcsize('<IQ32s32sQI')
+NONCE_FORMAT = struct.Struct('<Q')
+MAX_NONCE = 2 ** 64 - 1
+HASH_SIZE = 32
+NULL_HASH = '00' * HASH_SIZE
+# The genesis block has no previous block, so it has no previous block height.
+NO_BLOCK_HEIGHT = 2 ** 64 - 1
+# 9999-12-31T23:59:59Z: later timestamps do not fit the ISO format.
+MAX_TIMESTAMP = 253402300799
+
+
+
+
+class BlockHeader(JsonSerializable, BinarySerializable):
+    """
+    Represents a block header: the fields of a block that are covered by its hash (the transactions are covered via
+    the Merkle root).
+
+    The header has a fixed-size serialization (HEADER_SIZE bytes), so that mining, header sync and chain linking do
+    not depend on the size of the block.
+
+    Attributes:
+        version (int): The version of the block.
+        previous_block (dict): The previous block in the blockchain.
+            Contains 'block_height' and 'block_hash'.
+        merkle_root (str): The Merkle root of the block's transactions.
+        timestamp (str): The timestamp of the block.
+        mining_difficulty_threshold (int): The mining difficulty threshold.
+        nonce (int): The nonce value for the block.
+        transaction_count (int): The total number of transactions in the block.
+    """
+
+    version: int = Field(description="The version of the block.")
+    previous_block: dict = Field(
+        default_factory=lambda: {
+            'block_height': None,
+            'block_hash': None,
+        },
+        description="The previous block in the blockchain.",
+    )
+    merkle_root: str = Field(description="The Merkle root of the block's transactions.")
+    timestamp: str = Field(description="The timestamp of the block.")
+    mining_difficulty_threshold: int = Field(description="The mining difficulty threshold.")
+    nonce: int = Field(description="The nonce value for the block.")
+    transaction_count: int = Field(description="The total number of transactions in the block.")
+
+
+    @classmethod
+    def from_json(cls, json_data: Dict[str, Any]) -> "BlockHeader":
+        instance = super().from_json(json_data)
+        return instance
+
+
+    @property
+    def hex_values(self) -> Dict[str, Any]:
+        data = self.to_bytes()
+        values = {}
+        offset = 0
+        for name, size in HEADER_FIELD_SIZES:
+            values[name] = data[offset:offset + size].hex()
+            offset += size
+        return values
+
+
+    def serialize_into(self, buffer: bytearray) -> None:
+        previous_block = self.previous_block
+        block_height = previous_block['block_height']
+        if block_height is None:
+            block_height = NO_BLOCK_HEIGHT
+        try:
+            buffer += HEADER_FORMAT.pack(
+                self.version,
+                block_height,
+                hash_to_bytes(previous_block['block_hash']),
+                hash_to_bytes(self.merkle_root),
+                iso_timestamp_to_int(self.timestamp),
+                self.mining_difficulty_threshold,
+                self.nonce,
+                self.transaction_count,
+            )
+        except struct.error as e:
+            raise ValueError(f"Invalid block header: {e}")
+
+
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["BlockHeader", int]:
+        end = offset + HEADER_SIZE
+        if end > len(data):
+            raise ValueError(f"Unexpected end of data at offset {offset}: expected {HEADER_SIZE} header bytes.")
+        (
+            version,
+            block_height,
+            block_hash,
+            merkle_root,
+            timestamp,
+            mining_difficulty_threshold,
+            nonce,
+            transaction_count,
+        ) = HEADER_FORMAT.unpack_from(data, offset)
+        if timestamp > MAX_TIMESTAMP:
+            raise ValueError(f"Invalid block header: timestamp {timestamp} is out of range.")
+        instance = cls.from_values(
+            trusted,
+            version=version,
+            previous_block={
+                'block_height': None if block_height == NO_BLOCK_HEIGHT else block_height,
+                'block_hash': block_hash.hex(),
+            },
+            merkle_root=merkle_root.hex(),
+            timestamp=int_to_iso_timestamp(timestamp),
+            mining_difficulty_threshold=mining_difficulty_threshold,
+            nonce=nonce,
+            transaction_count=transaction_count,
+        )
+        return instance, end
+
+
+    def to_bytes(self) -> bytes:
+        return self.cached('bytes', super().to_bytes)
+
+
+    @property
+    def hash(self) -> str:
+        return self.cached('hash', lambda: hash.get_sha256(self.to_bytes()))
+
+
+    @property
+    def height(self) -> int:
+        """
+        The height of the block, derived from the height of the previous block.
+        """
+        previous_height = self.previous_block['block_height']
+        return 0 if previous_height is None else previous_height + 1
+
+
+    @property
+    def meets_difficulty(self) -> bool:
+        return hash_meets_difficulty(self.hash, self.mining_difficulty_threshold)
+
+
+
+
+def hash_meets_difficulty(block_hash: str, difficulty: int) -> bool:
+    """
+    Checks the proof of work: the mining difficulty threshold is the number of leading zero bits that the block hash
+    must have.
+    """
+    return int(block_hash, 16) >> (256 - difficulty) == 0
+
+
+
+
+def hash_to_bytes(value: Optional[str]) -> bytes:
+    """
+    Converts a hash to its fixed-size bytes. A None hash is written as the null hash.
+    """
+    if value is None:
+        return bytes(HASH_SIZE)
+    try:
+        b = bytes.fromhex(value)
+    except ValueError:
+        raise ValueError(f"Invalid hex string: {value}")
+    if len(b) != HASH_SIZE:
+        raise ValueError(f"Invalid hash length: expected {HASH_SIZE} bytes, got {len(b)}.")
+    return b
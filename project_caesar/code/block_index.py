@@ -0,0 +1,131 @@
+# Components
+from typing import Dict, List, NamedTuple, Optional, Set
+
+
+# Local components
+from .block_header import BlockHeader
+
+
+
+
+class BlockIndexEntry(NamedTuple):
+    block_hash: str
+    # None for the genesis block.
+    previous_hash: Optional[str]
+    height: int
+    # The total work of the chain that ends with this block.
+    chain_work: int
+
+
+
+
+class BlockIndex:
+    """
+    A tree of all known blocks (on the main chain and on competing branches), keyed on block hash.
+
+    Each entry records its parent and the cumulative work of the chain up to and including it, so that the best tip
+    (the one with the most work) is known at all times, and the fork point of two branches is found by walking back
+    from their tips: the cost depends on the length of the branches, not of the chain.
+
+    Blocks that fail validation are marked invalid, along with all of their descendants, and are never chosen as the
+    best tip.
+    """
+
+
+    def __init__(self):
+        self._entries: Dict[str, BlockIndexEntry] = {}
+        self._children: Dict[str, List[str]] = {}
+        self.invalid: Set[str] = set()
+        self.best_tip: Optional[BlockIndexEntry] = None
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self._entries
+
+
+    def get(self, block_hash: str) -> Optional[BlockIndexEntry]:
+        return self._entries.get(block_hash)
+
+
+    def add_header(self, header: BlockHeader) -> BlockIndexEntry:
+        """
+        Adds a block to the tree. If the block has more work than the best tip, it becomes the best tip (with equal
+        work, the first block seen is kept).
+
+        Raises:
+            ValueError: If the block's previous block is not in the tree.
+        """
+        block_hash = header.hash
+        entry = self._entries.get(block_hash)
+        if entry is not None:
+            return entry
+        work = get_block_work(header.mining_difficulty_threshold)
+        if header.previous_block['block_height'] is None:
+            entry = BlockIndexEntry(block_hash, None, 0, work)
+        else:
+            previous_hash = header.previous_block['block_hash']
+            parent = self._entries.get(previous_hash)
+            if parent is None:
+                raise ValueError(f"The previous block {previous_hash} of block {block_hash} is not known.")
+            entry = BlockIndexEntry(block_hash, previous_hash, parent.height + 1, parent.chain_work + work)
+            self._children.setdefault(previous_hash, []).append(block_hash)
+            if previous_hash in self.invalid:
+                self.invalid.add(block_hash)
+        self._entries[block_hash] = entry
+        if block_hash not in self.invalid and (self.best_tip is None or entry.chain_work > self.best_tip.chain_work):
+            self.best_tip = entry
+        return entry
+
+
+    def mark_invalid(self, block_hash: str) -> None:
+        """
+        Marks a block and its descendants as invalid. If the best tip was one of them, the valid block with the most
+        work becomes the best tip.
+        """
+        stack = [block_hash]
+        while stack:
+            h = stack.pop()
+            self.invalid.add(h)
+            stack.extend(self._children.get(h, ()))
+        if self.best_tip is not None and self.best_tip.block_hash in self.invalid:
+            valid = [entry for entry in self._entries.values() if entry.block_hash not in self.invalid]
+            self.best_tip = max(valid, key=lambda entry: entry.chain_work, default=None)
+
+
+    def get_fork_point(self, a: BlockIndexEntry, b: BlockIndexEntry) -> BlockIndexEntry:
+        """
+        Returns the last block that is an ancestor of (or the same as) both a and b.
+        """
+        entries = self._entries
+        while a.height > b.height:
+            a = entries[a.previous_hash]
+        while b.height > a.height:
+            b = entries[b.previous_hash]
+        while a.block_hash != b.block_hash:
+            a = entries[a.previous_hash]
+            b = entries[b.previous_hash]
+        return a
+
+
+    def get_branch(self, ancestor: BlockIndexEntry, tip: BlockIndexEntry) -> List[BlockIndexEntry]:
+        """
+        Returns the blocks after ancestor, up to and including tip, oldest first.
+        """
+        branch = []
+        entry = tip
+        while entry.block_hash != ancestor.block_hash:
+            branch.append(entry)
+            entry = self._entries[entry.previous_hash]
+        branch.reverse()
+        return branch
+
+
+
+
+def get_block_work(difficulty: int) -> int:
+    # The expected number of hashes needed to find a block hash with difficulty leading zero bits.
+    return 1 << difficulty
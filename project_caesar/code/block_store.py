@@ -0,0 +1,421 @@
+# Imports
+import mmap
+import os
+import struct
+
+
+# Components
+from typing import Dict, List, NamedTuple, Optional
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .block_header import HEADER_SIZE, BlockHeader
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_SEGMENT_SIZE = 128 * 1024 * 1024
+DEFAULT_SYNC_EVERY = 100
+SEGMENT_FILE_NAME = 'blocks_{:05d}.dat'
+INDEX_FILE_NAME = 'index.dat'
+# Each block in a segment file is preceded by a record header: magic (4) + length (4).
+RECORD_MAGIC = b'CSRB'
+RECORD_HEADER_FORMAT = struct.Struct('<4sI')
+# Each index entry: height (8) + block hash (32) + segment file number (4) + offset (8) + length (4).
+INDEX_ENTRY_FORMAT = struct.Struct('<Q32sIQI')
+# The height of an index entry for a block that is stored but is not on the main chain (e.g. on a competing branch).
+SIDE_BLOCK_HEIGHT = 2 ** 64 - 1
+
+
+
+
+class BlockLocation(NamedTuple):
+    file_number: int
+    offset: int
+    length: int
+
+
+
+
+class MemoryBlockStore:
+    """
+    A block store that keeps blocks in memory. It has the same interface as BlockStore.
+    """
+
+
+    def __init__(self):
+        self._blocks: Dict[str, Block] = {}
+        self._hashes_by_height: List[str] = []
+
+
+    def __enter__(self) -> "MemoryBlockStore":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+
+    @property
+    def height(self) -> Optional[int]:
+        return len(self._hashes_by_height) - 1 if self._hashes_by_height else None
+
+
+    def put_block(self, block: Block, height: Optional[int] = None) -> None:
+        if height is None:
+            height = block.header.height
+        block_hash = block.hash
+        set_height(self._hashes_by_height, height, block_hash)
+        self._blocks[block_hash] = block
+
+
+    def put_side_block(self, block: Block) -> None:
+        self._blocks.setdefault(block.hash, block)
+
+
+    def truncate(self, height: int) -> None:
+        set_height(self._hashes_by_height, height, self._hashes_by_height[height])
+
+
+    def has_block(self, block_hash: str) -> bool:
+        return block_hash in self._blocks
+
+
+    def get_block_hashes(self) -> List[str]:
+        return list(self._blocks)
+
+
+    def get_block(self, block_hash: str) -> Optional[Block]:
+        return self._blocks.get(block_hash)
+
+
+    def get_header(self, block_hash: str) -> Optional[BlockHeader]:
+        block = self._blocks.get(block_hash)
+        return None if block is None else block.header
+
+
+    def get_block_bytes(self, block_hash: str) -> Optional[bytes]:
+        block = self._blocks.get(block_hash)
+        return None if block is None else block.to_bytes()
+
+
+    def get_hash_by_height(self, height: int) -> Optional[str]:
+        if 0 <= height < len(self._hashes_by_height):
+            return self._hashes_by_height[height]
+        return None
+
+
+    def get_block_by_height(self, height: int) -> Optional[Block]:
+        block_hash = self.get_hash_by_height(height)
+        return None if block_hash is None else self._blocks[block_hash]
+
+
+    def flush(self) -> None:
+        pass
+
+
+    def close(self) -> None:
+        pass
+
+
+
+
+class BlockStore:
+    """
+    An on-disk block store.
+
+    Serialized blocks are appended to segment files. An append-only index file maps each block hash (and height) to
+    the block's location (segment file, offset, length). On start, only the index is read; blocks are read from
+    memory-mapped segment files when they are requested.
+
+    Writes are fsynced in batches (every sync_every blocks, and on flush/close). The segment file is always synced
+    before the index, and any incomplete or unsynced tail left by a crash is discarded on start.
+    """
+
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        sync_every: int = DEFAULT_SYNC_EVERY,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.sync_every = sync_every
+        self._locations: Dict[bytes, BlockLocation] = {}
+        self._hashes_by_height: List[bytes] = []
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._unsynced = 0
+        self._data_file = None
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        self._truncate_segment_tail()
+        self._index_file = open(self._index_path(), 'ab')
+        self._file_number = self._last_file_number()
+        self._data_file = open(self._segment_path(self._file_number), 'ab')
+
+
+    def __enter__(self) -> "BlockStore":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE_NAME)
+
+
+    def _segment_path(self, file_number: int) -> str:
+        return os.path.join(self.directory, SEGMENT_FILE_NAME.format(file_number))
+
+
+    def _last_file_number(self) -> int:
+        if not self._locations:
+            return 0
+        return max(location.file_number for location in self._locations.values())
+
+
+    def _load_index(self) -> None:
+        path = self._index_path()
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry_size = INDEX_ENTRY_FORMAT.size
+        n = len(data) // entry_size
+        valid = 0
+        for i in range(n):
+            height, block_hash, file_number, offset, length = INDEX_ENTRY_FORMAT.unpack_from(data, i * entry_size)
+            if not self._check_record(file_number, offset, length):
+                # The block data for this entry did not reach the disk.
+                break
+            self._locations[block_hash] = BlockLocation(file_number, offset, length)
+            if height != SIDE_BLOCK_HEIGHT:
+                set_height(self._hashes_by_height, height, block_hash)
+            valid += 1
+        if valid * entry_size != len(data):
+            log(f"Discarding {len(data) - valid * entry_size} bytes of incomplete block index.")
+            with open(path, 'r+b') as f:
+                f.truncate(valid * entry_size)
+
+
+    def _check_record(self, file_number: int, offset: int, length: int) -> bool:
+        if not os.path.exists(self._segment_path(file_number)):
+            return False
+        m = self._maps.get(file_number)
+        if m is None:
+            m = self._map_segment(file_number)
+        header_size = RECORD_HEADER_FORMAT.size
+        if offset < header_size or offset + length > len(m):
+            return False
+        magic, record_length = RECORD_HEADER_FORMAT.unpack_from(m, offset - header_size)
+        return magic == RECORD_MAGIC and record_length == length
+
+
+    def _truncate_segment_tail(self) -> None:
+        # Remove block data that was written after the last indexed block.
+        file_number = self._last_file_number()
+        m = self._maps.pop(file_number, None)
+        if m is not None:
+            # A mapped file cannot be truncated.
+            m.close()
+        end = max(
+            (location.offset + location.length for location in self._locations.values()
+             if location.file_number == file_number),
+            default=0,
+        )
+        path = self._segment_path(file_number)
+        if os.path.exists(path) and os.path.getsize(path) > end:
+            log(f"Discarding {os.path.getsize(path) - end} bytes of unindexed block data from {path}.")
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+        # Remove any later segment file that was started but never indexed.
+        while os.path.exists(self._segment_path(file_number + 1)):
+            file_number += 1
+            os.remove(self._segment_path(file_number))
+
+
+    @property
+    def height(self) -> Optional[int]:
+        return len(self._hashes_by_height) - 1 if self._hashes_by_height else None
+
+
+    def put_block(self, block: Block, height: Optional[int] = None) -> BlockLocation:
+        """
+        Appends a block to the store, as the main chain block at height (which becomes the tip). If the block is
+        already stored, only its height is updated.
+        """
+        if height is None:
+            height = block.header.height
+        block_hash = bytes.fromhex(block.hash)
+        set_height(self._hashes_by_height, height, block_hash)
+        location = self._locations.get(block_hash)
+        if location is None:
+            location = self._write_block(block_hash, block)
+        self._write_index_entry(height, block_hash, location)
+        return location
+
+
+    def put_side_block(self, block: Block) -> BlockLocation:
+        """
+        Appends a block to the store without adding it to the main chain.
+        """
+        block_hash = bytes.fromhex(block.hash)
+        location = self._locations.get(block_hash)
+        if location is None:
+            location = self._write_block(block_hash, block)
+            self._write_index_entry(SIDE_BLOCK_HEIGHT, block_hash, location)
+        return location
+
+
+    def truncate(self, height: int) -> None:
+        """
+        Makes the main chain block at height the tip. The blocks above it stay in the store, as side blocks.
+        """
+        block_hash = self._hashes_by_height[height]
+        set_height(self._hashes_by_height, height, block_hash)
+        self._write_index_entry(height, block_hash, self._locations[block_hash])
+
+
+    def _write_block(self, block_hash: bytes, block: Block) -> BlockLocation:
+        data = block.to_bytes()
+        record_header = RECORD_HEADER_FORMAT.pack(RECORD_MAGIC, len(data))
+        position = self._data_file.tell()
+        if position > 0 and position + len(record_header) + len(data) > self.segment_size:
+            self._start_new_segment()
+        self._data_file.write(record_header)
+        offset = self._data_file.tell()
+        self._data_file.write(data)
+        location = BlockLocation(self._file_number, offset, len(data))
+        self._locations[block_hash] = location
+        return location
+
+
+    def _write_index_entry(self, height: int, block_hash: bytes, location: BlockLocation) -> None:
+        self._index_file.write(INDEX_ENTRY_FORMAT.pack(height, block_hash, *location))
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.flush()
+
+
+    def _start_new_segment(self) -> None:
+        self.flush()
+        self._data_file.close()
+        self._file_number += 1
+        self._data_file = open(self._segment_path(self._file_number), 'ab')
+
+
+    def has_block(self, block_hash: str) -> bool:
+        return bytes.fromhex(block_hash) in self._locations
+
+
+    def get_block_hashes(self) -> List[str]:
+        """
+        The hashes of all stored blocks (main chain and side blocks), in the order in which they were first stored.
+        """
+        return [block_hash.hex() for block_hash in self._locations]
+
+
+    def get_hash_by_height(self, height: int) -> Optional[str]:
+        if 0 <= height < len(self._hashes_by_height):
+            return self._hashes_by_height[height].hex()
+        return None
+
+
+    def get_block_bytes(self, block_hash: str) -> Optional[bytes]:
+        location = self._locations.get(bytes.fromhex(block_hash))
+        if location is None:
+            return None
+        file_number, offset, length = location
+        m = self._maps.get(file_number)
+        if m is None or offset + length > len(m):
+            m = self._map_segment(file_number)
+        return m[offset:offset + length]
+
+
+    def _map_segment(self, file_number: int) -> mmap.mmap:
+        if self._data_file is not None and file_number == self._file_number:
+            # The block may still be in the write buffer.
+            self._data_file.flush()
+        old = self._maps.pop(file_number, None)
+        if old is not None:
+            old.close()
+        with open(self._segment_path(file_number), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # An empty file cannot be memory-mapped.
+                return b''
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[file_number] = m
+        return m
+
+
+    def get_block(self, block_hash: str) -> Optional[Block]:
+        data = self.get_block_bytes(block_hash)
+        return None if data is None else Block.from_bytes(data, trusted=True)
+
+
+    def get_header(self, block_hash: str) -> Optional[BlockHeader]:
+        # A serialized block starts with its fixed-size header, so only that part is read.
+        location = self._locations.get(bytes.fromhex(block_hash))
+        if location is None:
+            return None
+        file_number, offset, length = location
+        m = self._maps.get(file_number)
+        if m is None or offset + length > len(m):
+            m = self._map_segment(file_number)
+        return BlockHeader.from_bytes(m[offset:offset + HEADER_SIZE], trusted=True)
+
+
+    def get_block_by_height(self, height: int) -> Optional[Block]:
+        block_hash = self.get_hash_by_height(height)
+        return None if block_hash is None else self.get_block(block_hash)
+
+
+    def flush(self) -> None:
+        """
+        Writes pending blocks to disk: the segment file is synced before the index.
+        """
+        self._data_file.flush()
+        os.fsync(self._data_file.fileno())
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+        self._unsynced = 0
+
+
+    def close(self) -> None:
+        if self._data_file.closed:
+            return
+        self.flush()
+        self._data_file.close()
+        self._index_file.close()
+        for m in self._maps.values():
+            m.close()
+        self._maps.clear()
+
+
+
+
+def set_height(hashes_by_height: List, height: int, block_hash) -> None:
+    # Point a height at a block hash. The list is truncated, so that the last height written is the tip.
+    del hashes_by_height[height:]
+    if height != len(hashes_by_height):
+        raise ValueError(f"Cannot store a block at height {height}: the store's height is {len(hashes_by_height) - 1}.")
+    hashes_by_height.append(block_hash)
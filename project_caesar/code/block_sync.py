@@ -0,0 +1,257 @@
+# Imports
+import asyncio
+import time
+
+
+# Components
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .block_header import BlockHeader
+from .p2p_messages import INV_BLOCK, MAX_HEADERS, encode_get_headers, encode_inventory
+from .validation import BlockValidationError, check_block_stateless, check_header_linkage
+
+
+if TYPE_CHECKING:
+    from .p2p import P2PNode, Peer
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+# Blocks are only requested up to this many heights beyond the last connected block, which bounds the memory used
+# by blocks that arrive before their parents.
+DOWNLOAD_WINDOW = 1024
+MAX_BLOCKS_IN_FLIGHT_PER_PEER = 128
+# Requests are spread across peers in chunks of this many blocks.
+REQUEST_CHUNK_SIZE = 16
+
+
+
+
+class BlockSync:
+    """
+    Headers-first block download, e.g. for the initial sync of a new node.
+
+    The header chain is downloaded first, from one peer (the sync peer), MAX_HEADERS headers per message. Each header
+    is checked against its parent (linkage, height, difficulty) and for proof of work, which is cheap, so an invalid
+    chain is found before any block bodies are downloaded.
+
+    Block bodies are requested for the validated headers (while more headers are still arriving) from every peer
+    that has them, with up to max_in_flight blocks requested from each peer, and only within a window of heights
+    beyond the last connected block. Blocks arrive out of order: each one is checked against its header (Merkle root,
+    sizes, transaction structure) as it arrives, and kept until the blocks before it have been connected. Blocks are
+    connected in height order.
+    """
+
+
+    def __init__(
+        self,
+        p2p_node: "P2PNode",
+        sync_peer: "Peer",
+        window: int = DOWNLOAD_WINDOW,
+        max_in_flight: int = MAX_BLOCKS_IN_FLIGHT_PER_PEER,
+    ):
+        self.p2p_node = p2p_node
+        self.node = p2p_node.node
+        self.sync_peer = sync_peer
+        self.window = window
+        self.max_in_flight = max_in_flight
+        # The validated headers, which follow the block at base_height.
+        self.headers: List[BlockHeader] = []
+        self.base_height: Optional[int] = None
+        self.headers_done = False
+        self.done = asyncio.Event()
+        self.failed = False
+        self.blocks_connected = 0
+        self._heights: Dict[str, int] = {}
+        self._in_flight: Dict[str, "Peer"] = {}
+        self._peer_in_flight: Dict["Peer", int] = {}
+        # Heights whose blocks must be requested again (their peer disconnected).
+        self._retry: List[int] = []
+        self._received: Dict[int, Block] = {}
+        self._next_request_height = 0
+        self._next_connect_height = 0
+        self._start_time = time.perf_counter()
+
+
+    @property
+    def last_header_height(self) -> Optional[int]:
+        if self.base_height is None:
+            return None
+        return self.base_height + len(self.headers)
+
+
+    def start(self) -> None:
+        log(f"Starting headers-first sync from {self.sync_peer} (height {self.sync_peer.height}).")
+        self.sync_peer.send('getheaders', encode_get_headers(self.node.get_locator()))
+
+
+    def on_headers(self, peer: "Peer", headers: List[BlockHeader]) -> None:
+        """
+        Raises:
+            ValueError: If the headers are invalid (the peer is then disconnected, which ends the sync).
+        """
+        if peer is not self.sync_peer or self.headers_done:
+            return
+        if headers:
+            if self.base_height is None:
+                previous_hash = headers[0].previous_block['block_hash']
+                if previous_hash not in self.node.block_index:
+                    raise ValueError("The headers do not connect to a known block.")
+                previous = self.node.block_store.get_header(previous_hash)
+                self.base_height = previous.height
+                self._next_request_height = self._next_connect_height = previous.height + 1
+            else:
+                previous = self.headers[-1]
+            for header in headers:
+                if not header.meets_difficulty:
+                    raise ValueError(f"Header {header.hash} does not meet its mining difficulty threshold.")
+                check_header_linkage(header, previous)
+                self._heights[header.hash] = header.height
+                self.headers.append(header)
+                previous = header
+            self._connect_blocks()
+        if len(headers) == MAX_HEADERS:
+            peer.send('getheaders', encode_get_headers([headers[-1].hash]))
+        else:
+            self.headers_done = True
+            deb(f"Received {len(self.headers)} headers.")
+        self.request_blocks()
+        self._check_done()
+
+
+    def request_blocks(self) -> None:
+        """
+        Requests blocks from each peer, up to its in-flight limit, within the download window.
+        """
+        if self.base_height is None or self.done.is_set():
+            return
+        end = min(self._next_connect_height + self.window, self.last_header_height + 1)
+        peers = [peer for peer in self.p2p_node.peers if peer.ready.is_set() and not peer.closed]
+        requests: Dict["Peer", List[int]] = {}
+        assigned = True
+        while assigned:
+            assigned = False
+            for peer in peers:
+                in_flight = self._peer_in_flight.get(peer, 0)
+                n = min(REQUEST_CHUNK_SIZE, self.max_in_flight - in_flight)
+                heights = requests.setdefault(peer, [])
+                for _ in range(n):
+                    height = self._next_height_to_request(peer, end)
+                    if height is None:
+                        break
+                    heights.append(height)
+                    block_hash = self.headers[height - self.base_height - 1].hash
+                    self._in_flight[block_hash] = peer
+                    self._peer_in_flight[peer] = self._peer_in_flight.get(peer, 0) + 1
+                    assigned = True
+        for peer, heights in requests.items():
+            if heights:
+                items = [(INV_BLOCK, self.headers[h - self.base_height - 1].hash) for h in heights]
+                peer.send('getdata', encode_inventory(items))
+
+
+    def _next_height_to_request(self, peer: "Peer", end: int) -> Optional[int]:
+        # Skips blocks that the node already has. Peers (other than the sync peer) are only asked for blocks up to
+        # the height they reported.
+        while True:
+            if self._retry:
+                height = self._retry[-1]
+            elif self._next_request_height < end:
+                height = self._next_request_height
+            else:
+                return None
+            if peer is not self.sync_peer and (peer.height is None or peer.height < height):
+                return None
+            if self._retry:
+                self._retry.pop()
+            else:
+                self._next_request_height += 1
+            if self.headers[height - self.base_height - 1].hash not in self.node.block_index:
+                return height
+
+
+    def on_block(self, peer: "Peer", block: Block) -> bool:
+        """
+        Handles a block that the sync requested. Returns False for any other block.
+
+        Raises:
+            ValueError: If the block does not match its header, or is invalid on its own.
+        """
+        block_hash = block.hash
+        owner = self._in_flight.get(block_hash)
+        if owner is not peer:
+            return False
+        del self._in_flight[block_hash]
+        self._peer_in_flight[peer] -= 1
+        height = self._heights[block_hash]
+        try:
+            check_block_stateless(block, None)
+        except ValueError:
+            self._retry.append(height)
+            raise
+        self._received[height] = block
+        self._connect_blocks()
+        self.request_blocks()
+        self._check_done()
+        return True
+
+
+    def _connect_blocks(self) -> None:
+        # Blocks that the node already has (e.g. a block relayed by a peer while the sync started) are not requested,
+        # and are skipped.
+        received = self._received
+        node = self.node
+        while self._next_connect_height <= self.last_header_height:
+            height = self._next_connect_height
+            block = received.pop(height, None)
+            if block is None:
+                if self.headers[height - self.base_height - 1].hash not in node.block_index:
+                    break
+            elif block.hash not in node.block_index:
+                try:
+                    node.process_block(block)
+                except BlockValidationError as e:
+                    log(f"Sync failed: {e}")
+                    self.finish(failed=True)
+                    return
+                self.blocks_connected += 1
+            self._next_connect_height += 1
+
+
+    def _check_done(self) -> None:
+        if self.headers_done and (self.base_height is None or self._next_connect_height > self.last_header_height):
+            self.finish()
+
+
+    def on_peer_disconnected(self, peer: "Peer") -> None:
+        if peer is self.sync_peer and not self.headers_done:
+            log(f"Sync failed: the sync peer {peer} disconnected.")
+            self.finish(failed=True)
+            return
+        for block_hash in [h for h, p in self._in_flight.items() if p is peer]:
+            del self._in_flight[block_hash]
+            self._retry.append(self._heights[block_hash])
+        self._peer_in_flight.pop(peer, None)
+        self.request_blocks()
+
+
+    def finish(self, failed: bool = False) -> None:
+        if self.done.is_set():
+            return
+        self.failed = failed
+        self.done.set()
+        self._received.clear()
+        if self.p2p_node.sync is self:
+            self.p2p_node.sync = None
+        elapsed = time.perf_counter() - self._start_time
+        log(f"Sync {'failed' if failed else 'finished'}: connected {self.blocks_connected} blocks in {elapsed:.2f} s.")
@@ -0,0 +1,199 @@
+# Imports
+import random
+
+
+# Components
+from typing import Iterator, List, NamedTuple, Tuple
+
+
+# Local components
+from .address import public_key_to_address
+from .block import Block
+from .genesis import get_genesis_block
+from .input import Input
+from .mempool import get_coinbase_transaction
+from .output import Output
+from .public_key import get_public_key_hash, secret_key_to_public_key
+from .signature import sign_input
+from .transaction import Transaction
+from .utxo_set import Outpoint
+from .validation import BLOCK_REWARD
+from ..utils.misc import int_to_iso_timestamp, iso_timestamp_to_int
+
+
+# Constants
+# The secret key that owns the genesis coinbase output (see scripts/script1.py).
+GENESIS_SECRET_KEY = '00010001'
+BLOCK_INTERVAL = 60
+MAX_FEE = 1000
+
+
+
+
+class Key(NamedTuple):
+    secret_key: str
+    public_key: str
+    address: str
+    lock_script: str
+
+
+    @classmethod
+    def from_secret_key(cls, secret_key: str) -> "Key":
+        public_key = secret_key_to_public_key(secret_key).zfill(8)
+        lock_script = 'OP_DUPLICATE OP_HASH_160 {pkh} OP_EQUAL_VERIFY OP_CHECK_SIGNATURE'.format(
+            pkh=get_public_key_hash(public_key),
+        )
+        return cls(secret_key, public_key, public_key_to_address(public_key), lock_script)
+
+
+
+
+class WalletCoin(NamedTuple):
+    outpoint: Outpoint
+    value: int
+    key: Key
+
+
+
+
+class ChainGenerator:
+    """
+    Generates a valid chain on top of the genesis block, deterministically from a seed.
+
+    Each block has a coinbase transaction and up to transactions_per_block other transactions. Each transaction
+    spends 1 to max_inputs coins (fan-in) and creates 1 to max_outputs outputs (fan-out), each paid to one of n_keys
+    keys: fewer keys means more key (and address) reuse. The keys are toy keys, with pay-to-public-key-hash lock
+    scripts.
+
+    Blocks are generated one at a time, so a chain of any length can be streamed (e.g. with chain_io.write_blocks).
+    Only the generator's own unspent coins are kept in memory.
+    """
+
+
+    def __init__(
+        self,
+        seed: int = 0,
+        transactions_per_block: int = 10,
+        max_inputs: int = 2,
+        max_outputs: int = 2,
+        n_keys: int = 100,
+    ):
+        if transactions_per_block < 0 or max_inputs < 1 or max_outputs < 1 or n_keys < 1:
+            raise ValueError("Invalid chain generator settings.")
+        self.random = random.Random(seed)
+        self.transactions_per_block = transactions_per_block
+        self.max_inputs = max_inputs
+        self.max_outputs = max_outputs
+        # Toy secret keys are 4 random bytes (as in secret_key.create_secret_key_toy), drawn from the seeded RNG.
+        self.keys = [Key.from_secret_key(f'{self.random.getrandbits(32):08x}') for _ in range(n_keys)]
+        self.tip = get_genesis_block()
+        self.height = 0
+        self._start_time = iso_timestamp_to_int(self.tip.timestamp)
+        genesis_coinbase = self.tip.transactions[0]
+        self.coins: List[WalletCoin] = [WalletCoin(
+            (0, genesis_coinbase.hash, 0),
+            genesis_coinbase.outputs[0].value,
+            Key.from_secret_key(GENESIS_SECRET_KEY),
+        )]
+
+
+    def generate_blocks(self, n_blocks: int) -> Iterator[Block]:
+        for _ in range(n_blocks):
+            yield self.generate_block()
+
+
+    def generate_block(self) -> Block:
+        height = self.height + 1
+        spendable = self.coins
+        self.coins = []
+        transactions = []
+        owners = []
+        for _ in range(self.transactions_per_block):
+            if not spendable:
+                break
+            tx, tx_owners = self._generate_transaction(spendable)
+            transactions.append(tx)
+            owners.append(tx_owners)
+        # The coins that were not spent carry over. Coins created in this block can be spent from the next block.
+        self.coins.extend(spendable)
+        fees = sum(tx.fee for tx in transactions)
+        key = self.random.choice(self.keys)
+        coinbase = get_coinbase_transaction(height, BLOCK_REWARD + fees, key.lock_script)
+        self.coins.append(WalletCoin((height, coinbase.hash, 0), BLOCK_REWARD + fees, key))
+        for tx, tx_owners in zip(transactions, owners):
+            tx_hash = tx.hash
+            for output_index, (o, owner) in enumerate(zip(tx.outputs, tx_owners)):
+                self.coins.append(WalletCoin((height, tx_hash, output_index), o.value, owner))
+        block = Block.from_trusted(
+            version=self.tip.version,
+            previous_block={'block_height': self.height, 'block_hash': self.tip.hash},
+            timestamp=int_to_iso_timestamp(self._start_time + height * BLOCK_INTERVAL),
+            mining_difficulty_threshold=self.tip.mining_difficulty_threshold,
+            nonce=0,
+            transaction_count=len(transactions) + 1,
+            transactions=[coinbase] + transactions,
+        )
+        self.tip = block
+        self.height = height
+        return block
+
+
+    def generate_spends(self, n: int) -> List[Transaction]:
+        """
+        Generates up to n transactions (e.g. for a mempool) that spend the generator's coins. The spent coins are
+        removed from the wallet, and the new outputs are not tracked, so these transactions are never spent by
+        generated blocks.
+        """
+        transactions = []
+        for _ in range(n):
+            if not self.coins:
+                break
+            tx, _ = self._generate_transaction(self.coins)
+            transactions.append(tx)
+        return transactions
+
+
+    def _generate_transaction(self, spendable: List[WalletCoin]) -> Tuple[Transaction, List[Key]]:
+        # Spends coins from spendable, and returns the transaction and the owners of its outputs.
+        rng = self.random
+        n_inputs = min(rng.randint(1, self.max_inputs), len(spendable))
+        coins = [pop_random(spendable, rng) for _ in range(n_inputs)]
+        total = sum(coin.value for coin in coins)
+        n_outputs = min(rng.randint(1, self.max_outputs), total)
+        fee = rng.randint(0, min(MAX_FEE, total - n_outputs))
+        owners = [rng.choice(self.keys) for _ in range(n_outputs)]
+        values = split_value(total - fee, n_outputs, rng)
+        tx = Transaction.from_trusted(
+            input_count=n_inputs,
+            output_count=n_outputs,
+            fee=fee,
+            inputs=[
+                Input.from_trusted(previous_output={
+                    'block_height': coin.outpoint[0],
+                    'transaction_hash': coin.outpoint[1],
+                    'output_index': coin.outpoint[2],
+                })
+                for coin in coins
+            ],
+            outputs=[Output.from_trusted(value=v, lock_script=k.lock_script) for v, k in zip(values, owners)],
+        )
+        for index, coin in enumerate(coins):
+            tx.inputs[index].unlock_script = sign_input(tx, index, coin.key.secret_key)
+        tx.invalidate_cache()
+        return tx, owners
+
+
+
+
+def pop_random(items: List, rng: random.Random):
+    # Remove a random item in O(1), by swapping it with the last item.
+    index = rng.randrange(len(items))
+    items[index], items[-1] = items[-1], items[index]
+    return items.pop()
+
+
+def split_value(total: int, n: int, rng: random.Random) -> List[int]:
+    # Split total into n positive values.
+    cuts = sorted(rng.sample(range(1, total), n - 1)) if n > 1 else []
+    bounds = [0] + cuts + [total]
+    return [bounds[i + 1] - bounds[i] for i in range(n)]
@@ -0,0 +1,120 @@
+# Imports
+import itertools
+import time
+
+
+# Components
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from pydantic import ValidationError
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .node import Node
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_BATCH_SIZE = 1000
+
+
+# Types
+T = TypeVar('T')
+
+
+
+
+# Chain files are newline-delimited JSON: one block per line, in height order.
+# Each stage below is a generator, so blocks are read, parsed and processed one batch at a time. A stage only pulls
+# from the one before it when it is ready for more, so memory use is bounded by the batch size, not the file size.
+
+
+def read_lines(f: IO[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Yields (line number, line) for each non-blank line.
+    """
+    for line_number, line in enumerate(f, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def parse_blocks(lines: Iterable[Tuple[int, str]]) -> Iterator[Block]:
+    """
+    Raises:
+        ValueError: If a line is not a valid block.
+    """
+    for line_number, line in lines:
+        try:
+            yield Block.model_validate_json(line)
+        except ValidationError as e:
+            raise ValueError(f"Invalid block on line {line_number}: {e}")
+
+
+def batched(items: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be at least 1, not {batch_size}.")
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+def export_chain(node: Node, f: IO[str], start_height: int = 1, stop_height: Optional[int] = None) -> int:
+    """
+    Writes the node's blocks from start_height to stop_height (inclusive; default: the tip) to f, one per line.
+    The genesis block is skipped by default, as every node already has it.
+
+    Returns:
+        int: The number of blocks written.
+    """
+    if stop_height is None:
+        stop_height = node.height
+    return write_blocks((node.get_block(height) for height in range(start_height, stop_height + 1)), f)
+
+
+def write_blocks(blocks: Iterable[Block], f: IO[str]) -> int:
+    """
+    Writes blocks to f, one per line, as they are produced (blocks may be a generator).
+
+    Returns:
+        int: The number of blocks written.
+    """
+    n = 0
+    for block in blocks:
+        f.write(block.model_dump_json(exclude_none=True))
+        f.write('\n')
+        n += 1
+    return n
+
+
+def import_chain(node: Node, f: IO[str], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Reads blocks from f and validates and connects each one with Node.process_block. Blocks that the node already
+    has are skipped, so an interrupted import can be restarted from the beginning of the file. After each batch, the
+    node's block store and UTXO set are flushed.
+
+    Returns:
+        int: The number of blocks connected.
+
+    Raises:
+        ValueError: If a line cannot be parsed or a block is invalid (BlockValidationError). Blocks from earlier
+            lines stay connected.
+    """
+    n = 0
+    start = time.perf_counter()
+    for batch in batched(parse_blocks(read_lines(f)), batch_size):
+        for block in batch:
+            if node.has_block(block.hash):
+                continue
+            node.process_block(block)
+            n += 1
+        node.flush()
+        elapsed = time.perf_counter() - start
+        log(f"Imported {n} blocks (height {node.height}) in {elapsed:.1f}s.")
+    return n
@@ -0,0 +1,163 @@
+# Imports
+import hashlib
+import random
+import struct
+
+
+# Components
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Local imports
+from ..utils import hash
+
+
+# Local components
+from .block import Block
+from .block_header import BlockHeader
+from .transaction import Transaction
+
+
+# Constants
+# Short transaction IDs: the first SHORT_ID_SIZE bytes of a keyed BLAKE2b hash of the transaction hash. The key is
+# derived from the block header and a random nonce chosen by the sender, so an attacker cannot make transactions
+# whose short IDs collide in every block.
+SHORT_ID_SIZE = 6
+SHORT_ID_KEY_SIZE = 16
+COMPACT_NONCE_FORMAT = struct.Struct('<Q')
+
+
+
+
+class CompactBlock(NamedTuple):
+    """
+    A block as a header and short transaction IDs. Most of the transactions are usually in the recipient's mempool
+    already, so only the short IDs need to be sent.
+    """
+    header: BlockHeader
+    nonce: int
+    # The short IDs of the transactions that are not prefilled, in block order.
+    short_ids: List[bytes]
+    # Transactions that are sent in full, with their index in the block (e.g. the coinbase, which is in no mempool).
+    prefilled: List[Tuple[int, Transaction]]
+
+
+    @property
+    def short_id_key(self) -> bytes:
+        return get_short_id_key(self.header, self.nonce)
+
+
+
+
+def get_short_id_key(header: BlockHeader, nonce: int) -> bytes:
+    return hash.get_sha256_digest(header.to_bytes() + COMPACT_NONCE_FORMAT.pack(nonce))[:SHORT_ID_KEY_SIZE]
+
+
+def get_short_id(key: bytes, tx_hash: str) -> bytes:
+    return hashlib.blake2b(bytes.fromhex(tx_hash), digest_size=SHORT_ID_SIZE, key=key).digest()
+
+
+def create_compact_block(block: Block, nonce: Optional[int] = None, prefill: Iterable[int] = (0,)) -> CompactBlock:
+    """
+    Creates a compact block, with the transactions at the prefill indexes (by default, the coinbase) sent in full.
+    """
+    if nonce is None:
+        nonce = random.getrandbits(64)
+    header = block.header
+    key = get_short_id_key(header, nonce)
+    prefill = set(prefill)
+    transactions = block.transactions
+    return CompactBlock(
+        header=header,
+        nonce=nonce,
+        short_ids=[get_short_id(key, tx.hash) for i, tx in enumerate(transactions) if i not in prefill],
+        prefilled=[(i, transactions[i]) for i in sorted(prefill)],
+    )
+
+
+
+
+class PartialBlock:
+    """
+    A block being rebuilt from a compact block: the prefilled transactions, and the mempool transactions whose short
+    IDs match. The transactions that are still missing must be requested from the sender (see fill).
+
+    Short IDs that match several mempool transactions (a collision) are treated as missing. A collision with a
+    transaction that is not in the block cannot be detected until the block is complete: to_block then finds that
+    the Merkle root does not match, and the full block must be requested instead.
+    """
+
+
+    def __init__(self, compact: CompactBlock, mempool_transactions: Iterable[Transaction]):
+        """
+        Raises:
+            ValueError: If the compact block is inconsistent with its header.
+        """
+        header = compact.header
+        self.header = header
+        n = len(compact.short_ids) + len(compact.prefilled)
+        if n != header.transaction_count:
+            raise ValueError(f"The compact block has {n} transactions, but its header has {header.transaction_count}.")
+        self.transactions: List[Optional[Transaction]] = [None] * n
+        for index, tx in compact.prefilled:
+            if index >= n or self.transactions[index] is not None:
+                raise ValueError(f"Invalid prefilled transaction index {index}.")
+            self.transactions[index] = tx
+        # Short IDs fill the slots that are not prefilled, in order.
+        slots: Dict[bytes, int] = {}
+        short_ids = iter(compact.short_ids)
+        for index, tx in enumerate(self.transactions):
+            if tx is None:
+                short_id = next(short_ids)
+                if short_id in slots:
+                    raise ValueError("The compact block has duplicate short IDs.")
+                slots[short_id] = index
+        key = compact.short_id_key
+        collided: Set[int] = set()
+        transactions = self.transactions
+        for tx in mempool_transactions:
+            index = slots.get(get_short_id(key, tx.hash))
+            if index is None or index in collided:
+                continue
+            if transactions[index] is not None:
+                collided.add(index)
+                transactions[index] = None
+            else:
+                transactions[index] = tx
+        self.from_mempool = n - len(compact.prefilled) - len(self.missing)
+
+
+    @property
+    def missing(self) -> List[int]:
+        """
+        The indexes of the transactions that are not known yet.
+        """
+        return [i for i, tx in enumerate(self.transactions) if tx is None]
+
+
+    def fill(self, transactions: List[Transaction]) -> None:
+        """
+        Adds the missing transactions, in index order (the reply to a request for the missing indexes).
+
+        Raises:
+            ValueError: If the number of transactions does not match the number of missing transactions.
+        """
+        missing = self.missing
+        if len(transactions) != len(missing):
+            raise ValueError(f"Expected {len(missing)} missing transactions, received {len(transactions)}.")
+        for index, tx in zip(missing, transactions):
+            self.transactions[index] = tx
+
+
+    def to_block(self) -> Block:
+        """
+        Raises:
+            ValueError: If transactions are missing, or if the transactions do not match the header's Merkle root
+                (e.g. because of a short ID collision).
+        """
+        if self.missing:
+            raise ValueError(f"{len(self.missing)} transactions are missing.")
+        block = Block.from_header(self.header, self.transactions)
+        if block.merkle_root != self.header.merkle_root:
+            raise ValueError("The reconstructed block does not match its Merkle root.")
+        return block
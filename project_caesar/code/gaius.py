@@ -1,14 +1,79 @@
+# Components
+from typing import Optional
+
+
+
+
 def script_to_hex(s):
+    return script_to_bytes(s).hex()
+
+
+def script_to_bytes(s: Optional[str]) -> bytes:
+    """
+    Converts a script (opcode names and hex data items, separated by spaces) into bytes.
+
+    Data items are prefixed with their push length, so that the bytes can be converted back into a script.
+    """
     if s is None:
-        return ''
-    items = s.split()
-    result = ''
-    for item in items:
+        return b''
+    result = bytearray()
+    for item in s.split():
         if item in opcodes:
-            result += opcodes[item]
+            result += opcode_bytes[item]
+            continue
+        try:
+            data = bytes.fromhex(item)
+        except ValueError:
+            raise ValueError(f"Invalid script item: {item}")
+        n = len(data)
+        if n <= MAX_DIRECT_PUSH_LENGTH:
+            result.append(n)
+        elif n <= 0xFF:
+            result += opcode_bytes['OP_PUSH_DATA_1']
+            result.append(n)
+        elif n <= 0xFFFF:
+            result += opcode_bytes['OP_PUSH_DATA_2']
+            result += n.to_bytes(2, 'little')
         else:
-            result += item
-    return result
+            raise ValueError(f"Script data item is too long: {n} bytes.")
+        result += data
+    return bytes(result)
+
+
+def bytes_to_script(b: bytes) -> Optional[str]:
+    """
+    Converts script bytes back into a script (opcode names and hex data items, separated by spaces).
+    """
+    if not b:
+        return None
+    items = []
+    i = 0
+    n = len(b)
+    while i < n:
+        op = b[i]
+        i += 1
+        if 0 < op <= MAX_DIRECT_PUSH_LENGTH:
+            length = op
+        elif op == PUSH_DATA_1:
+            if i + 1 > n:
+                raise ValueError(f"Script push length at offset {i} runs past the end of the script.")
+            length = b[i]
+            i += 1
+        elif op == PUSH_DATA_2:
+            if i + 2 > n:
+                raise ValueError(f"Script push length at offset {i} runs past the end of the script.")
+            length = int.from_bytes(b[i:i + 2], 'little')
+            i += 2
+        elif op in opcode_names:
+            items.append(opcode_names[op])
+            continue
+        else:
+            raise ValueError(f"Unknown opcode: {op:02x}")
+        if i + length > n:
+            raise ValueError(f"Script data item at offset {i} runs past the end of the script.")
+        items.append(b[i:i + length].hex())
+        i += length
+    return ' '.join(items)
 
 
 opcodes = {
@@ -16,8 +81,15 @@ opcodes = {
     'OP_0': '00',
     'OP_FALSE': '00',
 
+    # Values 0x01-0x4b push that many bytes of data.
+    'OP_PUSH_DATA_1': '4c',
+    'OP_PUSH_DATA_2': '4d',
+
+    'OP_VERIFY': '69',
+
     'OP_DUPLICATE': '76',
 
+    'OP_EQUAL': '87',
     'OP_EQUAL_VERIFY': '88',
 
     'OP_CHECK_SIGNATURE': 'ac',
@@ -26,3 +98,13 @@ opcodes = {
 
 }
 
+
+# Derived
+MAX_DIRECT_PUSH_LENGTH = 0x4b
+PUSH_DATA_1 = int(opcodes['OP_PUSH_DATA_1'], 16)
+PUSH_DATA_2 = int(opcodes['OP_PUSH_DATA_2'], 16)
+opcode_bytes = {name: bytes.fromhex(value) for name, value in opcodes.items()}
+opcode_names = {}
+for name, value in opcodes.items():
+    # The first name listed for a value is the canonical one.
+    opcode_names.setdefault(int(value, 16), name)
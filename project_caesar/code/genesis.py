@@ -1,5 +1,6 @@
 # Local components
 from .block import Block
+from .block_header import NULL_HASH
 
 
 def get_genesis_block():
@@ -13,7 +14,7 @@ def get_genesis_block_json():
         'version': 1,
         'previous_block': {
             'block_height': None,
-            'block_hash': '00000000',
+            'block_hash': NULL_HASH,
         },
         'timestamp': '2024-11-18T08:09:09Z',
         'mining_difficulty_threshold': 0,
@@ -1,18 +1,19 @@
 # Components
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from pydantic import Field
 
 
 # Local components
-from .gaius import script_to_hex
-from .models.hex_string import HexString
+from .gaius import bytes_to_script, script_to_bytes, script_to_hex
+from .models.binary_serializable import BinarySerializable
 from .models.json_serializable import JsonSerializable
 from ..utils.hex_utils import compact_size, int_to_hex
+from ..utils.serialization import read_bytes, read_hex, read_int, write_bytes, write_hex, write_int
 
 
 
 
-class Input(JsonSerializable):
+class Input(JsonSerializable, BinarySerializable):
     """
     Represents an input in a blockchain transaction, which typically includes a previous output
     and an unlock script.
@@ -48,7 +49,26 @@ class Input(JsonSerializable):
 
 
     @property
-    def hex_values(self) -> Dict[str, HexString]:
+    def outpoint(self) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+        """
+        The (block_height, transaction_hash, output_index) key of the previous output spent by this input.
+        """
+        previous_output = self.previous_output
+        return (
+            previous_output['block_height'],
+            previous_output['transaction_hash'],
+            previous_output['output_index'],
+        )
+
+
+    @property
+    def is_coinbase(self) -> bool:
+        previous_output = self.previous_output
+        return previous_output['block_height'] is None and previous_output['output_index'] is None
+
+
+    @property
+    def hex_values(self) -> Dict[str, Any]:
         """
         Returns the hex-encoded values of the input's attributes, along with their lengths.
 
@@ -57,7 +77,7 @@ class Input(JsonSerializable):
         """
         previous_output = self.previous_output
         block_height_hex = int_to_hex(previous_output['block_height'])
-        transaction_hash = previous_output['transaction_hash']
+        transaction_hash = previous_output['transaction_hash'] or ''
         output_index_hex = int_to_hex(previous_output['output_index'])
         unlock_script_hex = script_to_hex(self.unlock_script)
 
@@ -65,6 +85,7 @@ class Input(JsonSerializable):
             'previous_output': {
                 'block_height_length': compact_size(block_height_hex),
                 'block_height': block_height_hex,
+                'transaction_hash_length': compact_size(transaction_hash),
                 'transaction_hash': transaction_hash,
                 'output_index_length': compact_size(output_index_hex),
                 'output_index': output_index_hex,
@@ -74,22 +95,36 @@ class Input(JsonSerializable):
         }
 
 
-    @property
-    def hex(self) -> HexString:
+    def serialize_into(self, buffer: bytearray) -> None:
+        """
+        Appends the serialized input to the buffer.
         """
-        Returns the full hex-encoded string of the input, combining all the hex-encoded components.
+        previous_output = self.previous_output
+        write_int(buffer, previous_output['block_height'])
+        write_hex(buffer, previous_output['transaction_hash'])
+        write_int(buffer, previous_output['output_index'])
+        write_bytes(buffer, script_to_bytes(self.unlock_script))
 
-        Returns:
-            str: The full hex string representation of the input.
+
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["Input", int]:
         """
-        v = self.hex_values
-        hex_string = ''
-        hex_string += v['previous_output']['block_height_length']
-        hex_string += v['previous_output']['block_height']
-        hex_string += v['previous_output']['transaction_hash']
-        hex_string += v['previous_output']['output_index_length']
-        hex_string += v['previous_output']['output_index']
-        hex_string += v['unlock_script_length']
-        hex_string += v['unlock_script']
-        return hex_string
+        Parses an input from data at offset.
 
+        Returns:
+            Tuple[Input, int]: The input and the offset of the first byte after it.
+        """
+        block_height, offset = read_int(data, offset)
+        transaction_hash, offset = read_hex(data, offset)
+        output_index, offset = read_int(data, offset)
+        unlock_script, offset = read_bytes(data, offset)
+        instance = cls.from_values(
+            trusted,
+            previous_output={
+                'block_height': block_height,
+                'transaction_hash': transaction_hash,
+                'output_index': output_index,
+            },
+            unlock_script=bytes_to_script(unlock_script),
+        )
+        return instance, offset
@@ -0,0 +1,132 @@
+# Imports
+import multiprocessing
+
+
+# Components
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence
+
+
+# NumPy is optional: it is only needed for the array functions.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Constants
+# These must match the toy functions in public_key.py and utils/hash.py.
+TOY_PUBLIC_KEY_CONSTANT = 0xdeadbeef
+TOY_HASH_SHIFT = 3
+MASK_32 = 0xFFFFFFFF
+ADDRESS_PREFIX = 'csr_'
+DEFAULT_CHUNK_SIZE = 10000
+
+
+
+
+# Batch versions of secret_key_to_public_key, get_public_key_hash and public_key_to_address. Each one returns
+# exactly what the scalar function returns for each item, but parses each key once and skips the intermediate
+# string round-trips.
+
+
+def secret_keys_to_public_keys(secret_keys: Sequence[str]) -> List[str]:
+    c = TOY_PUBLIC_KEY_CONSTANT
+    return [format((int(sk, 16) + c) & MASK_32, 'x') for sk in secret_keys]
+
+
+def get_public_key_hashes(public_keys: Sequence[str]) -> List[str]:
+    return [format((int(pk, 16) << TOY_HASH_SHIFT) & MASK_32, '08x') for pk in public_keys]
+
+
+def public_keys_to_addresses(public_keys: Sequence[str]) -> List[str]:
+    # The address is the toy hash of the version byte ('00') and the public key hash. A leading zero byte does not
+    # change the hashed value, so this is the public key hash hashed again.
+    return [
+        ADDRESS_PREFIX + format((int(pk, 16) << 2 * TOY_HASH_SHIFT) & MASK_32, '08x')
+        for pk in public_keys
+    ]
+
+
+def secret_keys_to_addresses(secret_keys: Sequence[str]) -> List[str]:
+    c = TOY_PUBLIC_KEY_CONSTANT
+    return [
+        ADDRESS_PREFIX + format((((int(sk, 16) + c) & MASK_32) << 2 * TOY_HASH_SHIFT) & MASK_32, '08x')
+        for sk in secret_keys
+    ]
+
+
+def derive_addresses(
+    secret_keys: Sequence[str],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[str]:
+    """
+    Derives the address of each secret key. With more than one worker, chunks of keys are derived in a pool of worker
+    processes (worthwhile for expensive key schemes, and for very large batches).
+    """
+    return map_chunks(secret_keys_to_addresses, secret_keys, workers, chunk_size)
+
+
+def map_chunks(
+    func: Callable[[Sequence], List],
+    items: Sequence,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List:
+    """
+    Applies a batch function to items, chunk by chunk, in worker processes if workers > 1. The results are in the
+    same order as the items. func must be a module-level function, so that it can be sent to the workers.
+    """
+    if workers <= 1 or len(items) <= chunk_size:
+        return func(items)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = []
+    # Workers are spawned rather than forked, as the caller may be running other threads.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for chunk_result in executor.map(func, chunks):
+            results.extend(chunk_result)
+    return results
+
+
+
+
+# Array versions, for keys held as NumPy uint32 arrays. Arithmetic wraps modulo 2^32, as in the scalar functions.
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The array functions need NumPy, which is not installed.")
+
+
+def hex_to_array(values: Sequence[str]) -> "np.ndarray":
+    _require_numpy()
+    return np.fromiter((int(v, 16) for v in values), dtype=np.uint32, count=len(values))
+
+
+def array_to_hex(values: "np.ndarray", pad: bool = True) -> List[str]:
+    # Public keys are not zero-padded by secret_key_to_public_key; hashes are.
+    fmt = '08x' if pad else 'x'
+    return [format(v, fmt) for v in values.tolist()]
+
+
+def secret_keys_to_public_keys_array(secret_keys: "np.ndarray") -> "np.ndarray":
+    _require_numpy()
+    return secret_keys.astype(np.uint32) + np.uint32(TOY_PUBLIC_KEY_CONSTANT)
+
+
+def get_public_key_hashes_array(public_keys: "np.ndarray") -> "np.ndarray":
+    _require_numpy()
+    return public_keys.astype(np.uint32) << np.uint32(TOY_HASH_SHIFT)
+
+
+def public_keys_to_addresses_array(public_keys: "np.ndarray") -> "np.ndarray":
+    """
+    Returns the address hashes: the address of each key is ADDRESS_PREFIX followed by its hash as 8 hex digits.
+    """
+    _require_numpy()
+    return public_keys.astype(np.uint32) << np.uint32(2 * TOY_HASH_SHIFT)
+
+
+def addresses_array_to_addresses(address_hashes: "np.ndarray") -> List[str]:
+    return [ADDRESS_PREFIX + h for h in array_to_hex(address_hashes)]
@@ -0,0 +1,290 @@
+# Imports
+import bisect
+import itertools
+import time
+
+
+# Components
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .block_header import HEADER_SIZE
+from .input import Input
+from .output import Output
+from .transaction import Transaction
+from .utxo_set import Outpoint, UtxoSet
+from .validation import BLOCK_REWARD, MAX_BLOCK_SIZE, check_transaction_stateless, check_transaction_values
+from .validation import verify_input_script
+from ..utils.misc import int_to_iso_timestamp
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_MAX_MEMPOOL_SIZE = 300 * 1024 * 1024
+# Space kept free in a block template for the coinbase transaction.
+COINBASE_RESERVE = 1000
+# When selecting transactions, a transaction that does not fit is skipped (a smaller one further down may fit),
+# until less than this many bytes are left.
+TEMPLATE_FILL_MARGIN = 1000
+
+
+
+
+class MempoolEntry(NamedTuple):
+    tx: Transaction
+    tx_hash: str
+    size: int
+    fee: int
+    # Sort key: highest fee rate first, then oldest first.
+    key: Tuple[float, int, str]
+
+
+    @property
+    def fee_rate(self) -> float:
+        return self.fee / self.size
+
+
+
+
+class BlockTemplate(NamedTuple):
+    block: Block
+    # The selected transactions, excluding the coinbase.
+    transactions: List[Transaction]
+    fees: int
+
+
+
+
+class Mempool:
+    """
+    Pending transactions, ordered by fee rate (fee per byte).
+
+    The pool keeps a sorted list of (negative fee rate, arrival sequence, transaction hash) keys, so that the best
+    transactions are at the front: building a block template only walks the front of the list, and eviction (when
+    the pool exceeds max_size bytes) removes from the back. Each outpoint spent by a pooled transaction is mapped to
+    that transaction, so that double spends are rejected with one lookup.
+
+    Outpoints include the height of the block that created the output, so a transaction can only spend confirmed
+    outputs (i.e. those in the UTXO set), not outputs of other pooled transactions.
+    """
+
+
+    def __init__(self, utxo_set: Optional[UtxoSet] = None, max_size: int = DEFAULT_MAX_MEMPOOL_SIZE):
+        self.utxo_set = utxo_set
+        self.max_size = max_size
+        self.size = 0
+        self._entries: Dict[str, MempoolEntry] = {}
+        self._keys: List[Tuple[float, int, str]] = []
+        self._spent: Dict[Outpoint, str] = {}
+        self._sequence = itertools.count()
+        # The pool changes whenever a transaction is added or removed. Templates are cached for one version.
+        self._version = 0
+        self._template_cache = None
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self._entries
+
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return (entry.tx for entry in self._entries.values())
+
+
+    def get_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        entry = self._entries.get(tx_hash)
+        return None if entry is None else entry.tx
+
+
+    def get_spender(self, outpoint: Outpoint) -> Optional[str]:
+        return self._spent.get(outpoint)
+
+
+    def add_transaction(self, tx: Transaction, verify_scripts: bool = True) -> MempoolEntry:
+        """
+        Validates a transaction against the UTXO set and adds it to the pool.
+
+        Raises:
+            ValueError: If the transaction is invalid, already in the pool, spends an output that a pooled
+                transaction spends, or has too low a fee rate to stay in a full pool.
+        """
+        tx_hash = tx.hash
+        if tx_hash in self._entries:
+            raise ValueError(f"Transaction {tx_hash} is already in the mempool.")
+        if tx.is_coinbase:
+            raise ValueError(f"Transaction {tx_hash} is a coinbase transaction.")
+        check_transaction_stateless(tx)
+        outpoints = [i.outpoint for i in tx.inputs]
+        if len(set(outpoints)) != len(outpoints):
+            raise ValueError(f"Transaction {tx_hash} spends the same output more than once.")
+        for outpoint in outpoints:
+            spender = self._spent.get(outpoint)
+            if spender is not None:
+                raise ValueError(f"Transaction {tx_hash} spends {outpoint}, which {spender} already spends.")
+        if self.utxo_set is not None:
+            coins = self.utxo_set.get_coins(outpoints)
+            for outpoint, coin in zip(outpoints, coins):
+                if coin is None:
+                    raise ValueError(f"Transaction {tx_hash} spends a missing or spent output: {outpoint}")
+            check_transaction_values(tx, coins)
+            if verify_scripts:
+                for input_index, coin in enumerate(coins):
+                    if not verify_input_script(tx, input_index, coin.lock_script):
+                        raise ValueError(f"Transaction {tx_hash}: the script for input {input_index} is not valid.")
+        size = len(tx.to_bytes())
+        entry = MempoolEntry(tx, tx_hash, size, tx.fee, (-tx.fee / size, next(self._sequence), tx_hash))
+        self._entries[tx_hash] = entry
+        bisect.insort(self._keys, entry.key)
+        for outpoint in outpoints:
+            self._spent[outpoint] = tx_hash
+        self.size += size
+        self._version += 1
+        self._evict()
+        if tx_hash not in self._entries:
+            raise ValueError(f"Transaction {tx_hash} has too low a fee rate for the full mempool.")
+        return entry
+
+
+    def _evict(self) -> None:
+        while self.size > self.max_size and self._keys:
+            tx_hash = self._keys[-1][2]
+            deb(f"Evicting transaction {tx_hash} from the mempool.")
+            self.remove_transaction(tx_hash)
+
+
+    def remove_transaction(self, tx_hash: str) -> Optional[Transaction]:
+        entry = self._entries.pop(tx_hash, None)
+        if entry is None:
+            return None
+        keys = self._keys
+        index = bisect.bisect_left(keys, entry.key)
+        del keys[index]
+        for i in entry.tx.inputs:
+            del self._spent[i.outpoint]
+        self.size -= entry.size
+        self._version += 1
+        return entry.tx
+
+
+    def remove_block(self, block: Block) -> int:
+        """
+        Removes the transactions in a newly connected block, and any pooled transactions that conflict with them
+        (i.e. spend an output that the block spends).
+
+        Returns:
+            int: The number of transactions removed.
+        """
+        n = 0
+        for tx in block.transactions:
+            if self.remove_transaction(tx.hash) is not None:
+                n += 1
+            if tx.is_coinbase:
+                continue
+            for i in tx.inputs:
+                spender = self._spent.get(i.outpoint)
+                if spender is not None:
+                    self.remove_transaction(spender)
+                    n += 1
+        return n
+
+
+    def remove_spenders(self, outpoints: Iterable[Outpoint]) -> int:
+        """
+        Removes any pooled transactions that spend the given outpoints (e.g. the outputs of a disconnected block).
+
+        Returns:
+            int: The number of transactions removed.
+        """
+        n = 0
+        for outpoint in outpoints:
+            spender = self._spent.get(outpoint)
+            if spender is not None:
+                self.remove_transaction(spender)
+                n += 1
+        return n
+
+
+    def select_transactions(self, max_size: int) -> Tuple[List[Transaction], int, int]:
+        """
+        Selects the transactions with the highest fee rates that fit in max_size bytes.
+
+        Returns:
+            Tuple[List[Transaction], int, int]: The transactions, their total size, and their total fee.
+        """
+        cache_key = (self._version, max_size)
+        if self._template_cache is not None and self._template_cache[0] == cache_key:
+            return self._template_cache[1]
+        selected = []
+        total_size = 0
+        total_fee = 0
+        entries = self._entries
+        for _, _, tx_hash in self._keys:
+            entry = entries[tx_hash]
+            if total_size + entry.size > max_size:
+                if max_size - total_size < TEMPLATE_FILL_MARGIN:
+                    break
+                continue
+            selected.append(entry.tx)
+            total_size += entry.size
+            total_fee += entry.fee
+        result = (selected, total_size, total_fee)
+        self._template_cache = (cache_key, result)
+        return result
+
+
+    def get_block_template(
+        self,
+        previous_block: Block,
+        lock_script: str,
+        max_block_size: int = MAX_BLOCK_SIZE,
+        timestamp: Optional[str] = None,
+    ) -> BlockTemplate:
+        """
+        Builds a block on top of previous_block, containing the best pooled transactions and a coinbase transaction
+        that pays the block reward plus fees to lock_script. The block is ready to be mined.
+        """
+        height = previous_block.header.height + 1
+        transactions, _, fees = self.select_transactions(max_block_size - HEADER_SIZE - COINBASE_RESERVE)
+        coinbase = get_coinbase_transaction(height, BLOCK_REWARD + fees, lock_script)
+        if timestamp is None:
+            timestamp = int_to_iso_timestamp(int(time.time()))
+        block = Block.from_trusted(
+            version=previous_block.version,
+            previous_block={'block_height': height - 1, 'block_hash': previous_block.hash},
+            timestamp=timestamp,
+            mining_difficulty_threshold=previous_block.mining_difficulty_threshold,
+            nonce=0,
+            transaction_count=len(transactions) + 1,
+            transactions=[coinbase] + transactions,
+        )
+        return BlockTemplate(block, transactions, fees)
+
+
+
+
+def get_coinbase_transaction(height: int, value: int, lock_script: str) -> Transaction:
+    # The unlock script of a coinbase input is arbitrary data: use the block height.
+    return Transaction.from_trusted(
+        input_count=1,
+        output_count=1,
+        fee=0,
+        inputs=[
+            Input.from_trusted(
+                previous_output={'block_height': None, 'transaction_hash': '00000000', 'output_index': None},
+                unlock_script=height.to_bytes(8, 'big').hex(),
+            )
+        ],
+        outputs=[Output.from_trusted(value=value, lock_script=lock_script)],
+    )
@@ -0,0 +1,118 @@
+# Components
+from typing import Iterable, List
+
+
+# Local imports
+from ..utils import hash
+
+
+
+
+class MerkleTree:
+    """
+    A Merkle tree over transaction hashes, which keeps all of its intermediate levels.
+
+    Level 0 holds the leaves and the last level holds the root. A parent is the SHA256 hash of its two children
+    concatenated. If a level has an odd number of nodes, the last node is paired with itself. A tree with a single
+    leaf has that leaf as its root.
+
+    Keeping the levels means that appending or replacing a leaf only rehashes the O(log N) nodes on the path from
+    that leaf to the root.
+    """
+
+
+    def __init__(self, leaves: Iterable[str] = ()):
+        self.levels: List[List[bytes]] = [[bytes.fromhex(leaf) for leaf in leaves]]
+        self._build()
+
+
+    @classmethod
+    def from_transactions(cls, transactions) -> "MerkleTree":
+        return cls(tx.hash for tx in transactions)
+
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+
+    @property
+    def root(self) -> str:
+        if not self.levels[0]:
+            raise ValueError('No transactions to compute the Merkle root.')
+        return self.levels[-1][0].hex()
+
+
+    def _build(self):
+        # Hash each level in one batch.
+        del self.levels[1:]
+        level = self.levels[0]
+        while len(level) > 1:
+            n = len(level)
+            pairs = [level[i] + level[i + 1 if i + 1 < n else i] for i in range(0, n, 2)]
+            level = hash.get_sha256_batch(pairs)
+            self.levels.append(level)
+
+
+    def _update_path(self, index: int):
+        # Rehash the parents of the leaf at index, up to the root.
+        depth = 0
+        while len(self.levels[depth]) > 1:
+            nodes = self.levels[depth]
+            parent_index = index // 2
+            left = nodes[2 * parent_index]
+            right = nodes[2 * parent_index + 1] if 2 * parent_index + 1 < len(nodes) else left
+            parent = hash.get_sha256_digest(left + right)
+            if depth + 1 == len(self.levels):
+                self.levels.append([])
+            parents = self.levels[depth + 1]
+            if parent_index < len(parents):
+                parents[parent_index] = parent
+            else:
+                parents.append(parent)
+            index = parent_index
+            depth += 1
+        del self.levels[depth + 1:]
+
+
+    def append(self, leaf: str):
+        self.levels[0].append(bytes.fromhex(leaf))
+        self._update_path(len(self.levels[0]) - 1)
+
+
+    def replace(self, index: int, leaf: str):
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Leaf index {index} is out of range.")
+        self.levels[0][index] = bytes.fromhex(leaf)
+        self._update_path(index)
+
+
+    def get_proof(self, index: int) -> List[str]:
+        """
+        Returns the inclusion proof for the leaf at index: the sibling hash at each level, from the leaves upwards.
+        """
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Leaf index {index} is out of range.")
+        proof = []
+        for nodes in self.levels[:-1]:
+            sibling_index = index ^ 1
+            if sibling_index >= len(nodes):
+                sibling_index = index
+            proof.append(nodes[sibling_index].hex())
+            index //= 2
+        return proof
+
+
+    @staticmethod
+    def verify_proof(leaf: str, index: int, proof: List[str], root: str) -> bool:
+        """
+        Checks that the leaf at index is included in the tree with the given root.
+        """
+        node = bytes.fromhex(leaf)
+        for sibling in proof:
+            sibling = bytes.fromhex(sibling)
+            if index % 2 == 0:
+                node = hash.get_sha256_digest(node + sibling)
+            else:
+                node = hash.get_sha256_digest(sibling + node)
+            index //= 2
+        return index == 0 and node.hex() == root
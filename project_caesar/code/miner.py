@@ -0,0 +1,202 @@
+# Imports
+import hashlib
+import multiprocessing
+import os
+import time
+
+
+# Components
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .block_header import MAX_NONCE, NONCE_FORMAT, NONCE_OFFSET
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_CHUNK_SIZE = 50000
+# How many attempts a worker makes between checks for cancellation.
+CANCEL_CHECK_INTERVAL = 4096
+
+
+
+
+class MiningResult(BaseModel):
+    """
+    The outcome of a mining run.
+    """
+
+    nonce: Optional[int] = Field(default=None, description="The nonce found, or None if no nonce was found.")
+    block_hash: Optional[str] = Field(default=None, description="The block hash for the nonce found.")
+    attempts: int = Field(default=0, description="The number of nonces tried.")
+    elapsed: float = Field(default=0.0, description="The time taken, in seconds.")
+    cancelled: bool = Field(default=False, description="Whether the run was cancelled.")
+
+    @property
+    def hashes_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.attempts / self.elapsed
+
+
+
+
+# Worker state
+# The cancel event is passed to each worker process when the pool starts it.
+_cancel_event = None
+
+
+def _init_worker(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _mine_range(header: bytes, difficulty: int, start: int, stop: int) -> Tuple[Optional[int], Optional[str], int]:
+    """
+    Tries the nonces in [start, stop) on a serialized block header.
+
+    The header bytes before the nonce are hashed once (the SHA256 midstate is copied for each attempt), and each
+    attempt only patches the nonce bytes in a small buffer holding the rest of the header.
+
+    Returns:
+        Tuple of (nonce, block_hash, attempts). The nonce and block hash are None if no nonce was found.
+    """
+    # Mining uses hashlib directly: the midstate copy is not available from the other hash backends, which all
+    # produce identical digests.
+    target = 1 << (256 - difficulty)
+    midstate = hashlib.sha256(header[:NONCE_OFFSET])
+    tail = bytearray(header[NONCE_OFFSET:])
+    pack_nonce = NONCE_FORMAT.pack_into
+    cancel_event = _cancel_event
+    attempts = 0
+    for nonce in range(start, stop):
+        pack_nonce(tail, 0, nonce)
+        h = midstate.copy()
+        h.update(tail)
+        digest = h.digest()
+        attempts += 1
+        if int.from_bytes(digest, 'big') < target:
+            return nonce, digest.hex(), attempts
+        if attempts % CANCEL_CHECK_INTERVAL == 0 and cancel_event is not None and cancel_event.is_set():
+            break
+    return None, None, attempts
+
+
+
+
+class Miner:
+    """
+    A proof-of-work miner that searches for a block nonce across a pool of worker processes.
+
+    The nonce space is split into chunks, and each worker tries one chunk at a time. The pool is kept between calls
+    to mine, so that many blocks can be mined in a row. Call cancel (e.g. from another thread, when a new tip
+    arrives) to stop the current run.
+    """
+
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Workers are spawned rather than forked, as the caller (e.g. a node) may be running other threads.
+        context = multiprocessing.get_context('spawn')
+        self._cancel_event = context.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._cancel_event,),
+        )
+
+
+    def __enter__(self) -> "Miner":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        self._cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+
+    def mine(self, block: Block, start_nonce: int = 0, max_attempts: Optional[int] = None) -> MiningResult:
+        """
+        Searches for a nonce that gives the block a hash which meets its mining difficulty threshold.
+
+        If a nonce is found, it is set on the block.
+
+        Args:
+            block: The block to mine.
+            start_nonce: The first nonce to try.
+            max_attempts: Stop after trying this many nonces. By default, the whole nonce space is searched.
+
+        Returns:
+            MiningResult: The nonce found (if any), and the number of attempts and time taken.
+        """
+        self._cancel_event.clear()
+        difficulty = block.mining_difficulty_threshold
+        # Only the header is hashed, so the size of the block does not affect mining.
+        header = block.header.to_bytes()
+        stop_nonce = MAX_NONCE + 1
+        if max_attempts is not None:
+            stop_nonce = min(stop_nonce, start_nonce + max_attempts)
+
+        start_time = time.perf_counter()
+        next_nonce = start_nonce
+        pending = set()
+        attempts = 0
+        found = None
+
+        def submit_chunk():
+            nonlocal next_nonce
+            if next_nonce >= stop_nonce:
+                return
+            end = min(next_nonce + self.chunk_size, stop_nonce)
+            pending.add(self._executor.submit(_mine_range, header, difficulty, next_nonce, end))
+            next_nonce = end
+
+        for _ in range(self.workers):
+            submit_chunk()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                nonce, block_hash, chunk_attempts = future.result()
+                attempts += chunk_attempts
+                if nonce is not None and (found is None or nonce < found[0]):
+                    found = (nonce, block_hash)
+            if found is not None or self._cancel_event.is_set():
+                # Stop the other workers.
+                self._cancel_event.set()
+                continue
+            for _ in done:
+                submit_chunk()
+        elapsed = time.perf_counter() - start_time
+
+        result = MiningResult(attempts=attempts, elapsed=elapsed)
+        if found is not None:
+            result.nonce, result.block_hash = found
+            block.nonce = result.nonce
+        else:
+            result.cancelled = self._cancel_event.is_set()
+        deb(
+            f"Mining finished: nonce={result.nonce}, attempts={result.attempts}, "
+            f"hashes_per_second={result.hashes_per_second:.0f}, cancelled={result.cancelled}"
+        )
+        return result
@@ -0,0 +1,53 @@
+# Components
+from typing import Tuple
+
+
+
+
+class BinarySerializable:
+    """
+    A mixin for providing binary serialization and deserialization functionality to models.
+
+    Subclasses implement serialize_into (append the model's bytes to a shared buffer) and read_from (parse a model
+    from data at an offset). Nested models write into, and read from, the same buffer, so serializing a block
+    builds a single bytearray with no intermediate strings.
+
+    Parsed models are validated, unless trusted is set: only for bytes that the node wrote itself (e.g. blocks read
+    back from the block store), never for data from peers or clients.
+    """
+
+
+    def serialize_into(self, buffer: bytearray) -> None:
+        raise NotImplementedError
+
+
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["BinarySerializable", int]:
+        raise NotImplementedError
+
+
+    def to_bytes(self) -> bytes:
+        buffer = bytearray()
+        self.serialize_into(buffer)
+        return bytes(buffer)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes, trusted: bool = False) -> "BinarySerializable":
+        """
+        Creates an instance of the class from its serialized bytes.
+
+        Raises:
+            ValueError: If the data is malformed or has trailing bytes.
+        """
+        instance, offset = cls.read_from(data, 0, trusted)
+        if offset != len(data):
+            raise ValueError(
+                f"Invalid data for class {cls.__name__}: {len(data) - offset} trailing bytes after offset {offset}."
+            )
+        return instance
+
+
+    @property
+    def hex(self) -> str:
+        return self.to_bytes().hex()
@@ -1,76 +1,91 @@
-# Imports
-from pydantic import BaseModel, Field, field_validator
-import re
+# Components
+from typing import Any, Optional
+from pydantic_core import core_schema
 
 
-class HexString(BaseModel):
+
+
+class HexString(bytes):
     """
-    A custom class for a hex string with validation for content and length, using Pydantic v2.
+    A hex string, stored as the bytes that it encodes.
+
+    It is created from a hex string (with or without a 0x prefix) or from bytes, and it is validated by bytes.fromhex
+    (in C), so no Python code runs per character. As it is a bytes object, it can be hashed and serialized directly.
+    Its value property and str() give the hex string.
+
+    It can be used as a pydantic field type: the field accepts a hex string or bytes, and is serialized as a hex
+    string.
     """
-    value: str
-    length: int | None = None
-
-    @field_validator('value', mode='before')
-    def strip_prefix(cls, value: str) -> str:
-        """
-        Strips the 0x prefix from the hex string.
-        """
-        if value.startswith('0x') or value.startswith('0X'):
-            value = value[2:]
-        return value
-
-    @field_validator('value', mode='after')
-    def validate_hex_characters(cls, value: str) -> str:
-        """
-        Validates that the value is a valid hex string.
-        """
-        if not all(c in "0123456789abcdefABCDEF" for c in value):
-            raise ValueError(f"Invalid hex string: {value}")
-        return value
-
-    @field_validator('value', mode='after')
-    def validate_length(cls, value: str, info) -> str:
-        """
-        Validates the length of the hex string after all previous validators have run.
-        """
-        length = info.data.get('length')
-        if length is not None and len(value) != length * 2:
+
+    __slots__ = ()
+
+
+    def __new__(cls, value: str | bytes = b'', length: Optional[int] = None) -> "HexString":
+        if isinstance(value, str):
+            data = hex_to_bytes(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            data = value
+        else:
+            raise ValueError(f"Invalid hex string: {value!r}")
+        if length is not None and len(data) != length:
             raise ValueError(
                 f"Invalid length for hex string. Expected {length * 2} hex characters "
-                f"(or {length} bytes), but got {len(value)} characters."
+                f"(or {length} bytes), but got {len(data) * 2} characters."
             )
-        return value
+        return super().__new__(cls, data)
 
 
+    @property
+    def value(self) -> str:
+        return self.hex()
 
 
-class HexString2(str):
-    """
-    A custom class for a hex string that validates its content.
-    Inherits from `str` so it behaves like a string with additional validation.
-    """
+    @property
+    def length(self) -> int:
+        return len(self)
 
-    @classmethod
-    def __new__(cls, value: str):
-        # Create an instance of the hex string class
-        instance = super().__new__(cls, value)
 
-        # Perform validation on initialization
-        if not cls.is_valid_hex(value):
-            raise ValueError(f"Invalid hex string: {value}")
+    def __str__(self) -> str:
+        return self.hex()
 
-        return instance
+
+    def __repr__(self) -> str:
+        return f"HexString('{self.hex()}')"
 
 
     @staticmethod
     def is_valid_hex(value: str) -> bool:
-        """
-        Check if the string is a valid hex string.
-        Optionally supports strings with a 0x prefix.
-        """
-        if value.startswith('0x') or value.startswith('0X'):
-            value = value[2:]  # Remove the 0x prefix if it exists
+        try:
+            hex_to_bytes(value)
+        except ValueError:
+            return False
+        return True
+
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(bytes.hex),
+        )
+
 
-        # Check if the string consists only of valid hexadecimal characters
-        return bool(re.match(r'^[0-9a-fA-F]+$', value))
 
+
+def hex_to_bytes(value: str) -> bytes:
+    """
+    Converts a hex string (optionally with a 0x prefix) to bytes.
+
+    Raises:
+        ValueError: If the string contains a non-hex character or an odd number of hex characters.
+    """
+    if value[:2] in ('0x', '0X'):
+        value = value[2:]
+    try:
+        data = bytes.fromhex(value)
+    except ValueError:
+        raise ValueError(f"Invalid hex string: {value}")
+    # bytes.fromhex skips whitespace between bytes, which is not valid here.
+    if len(data) * 2 != len(value):
+        raise ValueError(f"Invalid hex string: {value}")
+    return data
@@ -1,12 +1,42 @@
+# Imports
+import multiprocessing
+import os
+import time
+
+
+# Components
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+
 # Local imports
-from ..utils import hash, misc
+from ..utils import hash, misc, module_logger
 from . import transaction
 
 
 # Local components
+from .address_index import AddressIndex
 from .block import Block
+from .block_header import BlockHeader
+from .block_index import BlockIndex, BlockIndexEntry
+from .block_store import BlockStore, MemoryBlockStore
 from .genesis import get_genesis_block
+from .mempool import Mempool
 from .transaction import Transaction
+from .utxo_set import UtxoSet
+from .validation import BlockValidationError, check_block_inputs, check_block_stateless, verify_input_script
+from .validation import verify_transaction_scripts
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+UTXO_SET_FILE_NAME = 'utxo.sqlite'
+ADDRESS_INDEX_FILE_NAME = 'addresses.sqlite'
+# Blocks with fewer inputs than this have their scripts verified in the node's own process.
+PARALLEL_SCRIPT_THRESHOLD = 64
 
 
 
@@ -14,20 +44,374 @@ from .transaction import Transaction
 class Node:
 
 
-    def __init__(self):
-        self.chain = []
-        self.process_genesis_block()
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        script_workers: Optional[int] = None,
+        address_index: bool = False,
+    ):
+        # With a data directory, blocks are kept in an on-disk block store, and a restarted node continues from the
+        # stored chain. Otherwise, blocks are kept in memory.
+        # With address_index, the node also maintains an index of the outputs and transactions of each address.
+        self.script_workers = script_workers or os.cpu_count() or 1
+        self._script_executor = None
+        self.last_timings: Dict[str, float] = {}
+        if data_dir is None:
+            self.block_store = MemoryBlockStore()
+            self.utxo_set = UtxoSet()
+        else:
+            self.block_store = BlockStore(data_dir)
+            self.utxo_set = UtxoSet(os.path.join(data_dir, UTXO_SET_FILE_NAME))
+        self.address_index: Optional[AddressIndex] = None
+        if address_index:
+            self.address_index = AddressIndex(
+                ':memory:' if data_dir is None else os.path.join(data_dir, ADDRESS_INDEX_FILE_NAME)
+            )
+        # The block tree is kept in memory, and rebuilt from the stored headers on start.
+        self.block_index = BlockIndex()
+        if self.height is None:
+            self.process_genesis_block()
+        else:
+            self.load_block_index()
+        self.catch_up_utxo_set()
+        if self.address_index is not None:
+            self.catch_up_address_index()
+        self.mempool = Mempool(self.utxo_set)
+
+
+    def __enter__(self) -> "Node":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def close(self):
+        if self._script_executor is not None:
+            self._script_executor.shutdown()
+            self._script_executor = None
+        self.utxo_set.close()
+        self.block_store.close()
+        if self.address_index is not None:
+            self.address_index.close()
+
+
+    @property
+    def height(self) -> Optional[int]:
+        return self.block_store.height
+
+
+    @property
+    def tip(self) -> Block:
+        return self.block_store.get_block_by_height(self.height)
+
+
+    def get_block(self, height: int) -> Optional[Block]:
+        return self.block_store.get_block_by_height(height)
+
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        return self.block_store.get_block(block_hash)
+
+
+    def get_block_bytes(self, block_hash: str) -> Optional[bytes]:
+        return self.block_store.get_block_bytes(block_hash)
+
+
+    def has_block(self, block_hash: str) -> bool:
+        return self.block_store.has_block(block_hash)
+
+
+    def get_locator(self) -> List[str]:
+        """
+        Hashes of main chain blocks, from the tip back to the genesis block: the last 10 blocks, then with gaps that
+        double each time. A peer finds the last block that it shares with this node by looking for the first of
+        these that is on its own main chain.
+        """
+        hashes = []
+        step = 1
+        height = self.height
+        while height > 0:
+            hashes.append(self.block_store.get_hash_by_height(height))
+            if len(hashes) >= 10:
+                step *= 2
+            height -= step
+        hashes.append(self.block_store.get_hash_by_height(0))
+        return hashes
+
+
+    def get_headers(
+        self,
+        locator: List[str],
+        stop_hash: Optional[str] = None,
+        max_headers: int = 2000,
+    ) -> List[BlockHeader]:
+        """
+        The headers of the main chain blocks after the first locator hash that is on the main chain (or after the
+        genesis block, if none is), up to stop_hash or max_headers headers.
+        """
+        block_store = self.block_store
+        start = 0
+        for block_hash in locator:
+            entry = self.block_index.get(block_hash)
+            if entry is not None and block_store.get_hash_by_height(entry.height) == block_hash:
+                start = entry.height
+                break
+        headers = []
+        for height in range(start + 1, min(start + max_headers, self.height) + 1):
+            block_hash = block_store.get_hash_by_height(height)
+            headers.append(block_store.get_header(block_hash))
+            if block_hash == stop_hash:
+                break
+        return headers
+
+
+    def flush(self):
+        self.block_store.flush()
+        self.utxo_set.flush()
 
 
     def process_genesis_block(self):
         block_0 = get_genesis_block()
-        # Future: Store block in db.
-        self.chain.append(block_0)
-        # Future: Add coinbase tx to db.
+        self.block_store.put_block(block_0, height=0)
+        self.block_index.add_header(block_0.header)
+        self.utxo_set.apply_block(block_0, 0)
+
+
+    def load_block_index(self):
+        # Only the headers are read. Each block was stored after its parent, so its parent is already in the tree.
+        for block_hash in self.block_store.get_block_hashes():
+            self.block_index.add_header(self.block_store.get_header(block_hash))
+
+
+    @property
+    def tip_entry(self) -> BlockIndexEntry:
+        return self.block_index.get(self.block_store.get_hash_by_height(self.height))
+
+
+    def _get_previous_hash(self, block_hash: str, height: int) -> Optional[str]:
+        entry = self.block_index.get(block_hash)
+        if entry is not None:
+            return entry.previous_hash
+        # The block itself was lost in a crash (it was never synced), so it was on the main chain.
+        return self.block_store.get_hash_by_height(height - 1)
+
+
+    def catch_up_utxo_set(self):
+        # After a crash, the UTXO set may be behind the block store, ahead of it, or (during a reorganization) on
+        # another branch: disconnect blocks until it is on the main chain, then apply the missing blocks.
+        utxo_set = self.utxo_set
+        block_store = self.block_store
+        while utxo_set.height is not None and utxo_set.block_hash != block_store.get_hash_by_height(utxo_set.height):
+            utxo_set.undo_block(utxo_set.height, self._get_previous_hash(utxo_set.block_hash, utxo_set.height))
+        start = 0 if utxo_set.height is None else utxo_set.height + 1
+        for height in range(start, self.height + 1):
+            utxo_set.apply_block(self.get_block(height), height)
+
+
+    def catch_up_address_index(self):
+        # The address index commits each block as it is applied, so (like the UTXO set) it can be ahead of the block
+        # store after a crash, or on another branch. It is behind when it is first enabled on an existing data
+        # directory. The spent coins of each missing block come from the UTXO set's undo data.
+        index = self.address_index
+        while index.height is not None and index.block_hash != self.block_store.get_hash_by_height(index.height):
+            index.undo_block(index.height, self._get_previous_hash(index.block_hash, index.height))
+        start = 0 if index.height is None else index.height + 1
+        for height in range(start, self.height + 1):
+            index.apply_block(self.get_block(height), height, self.utxo_set.get_undo(height))
+
+
+    def process_block(self, block: Block) -> Dict[str, float]:
+        """
+        Validates a block and adds it to the block tree. A block that extends the tip is connected to the chain. A
+        block on another branch is stored and, if its branch has more work than the main chain, the node
+        reorganizes onto that branch.
+
+        Validation runs in stages, cheapest first, so that an invalid block is rejected as early as possible:
+        - stateless: sizes, counts, Merkle root, proof of work and linkage to the previous block.
+        - inputs: UTXO lookups for every input, values and fees.
+        - scripts: script verification, spread across a pool of worker processes for large blocks.
+        - apply: update the UTXO set (and the address index, if enabled) and store the block.
+        The inputs, scripts and apply stages run when a block is connected: for a block on another branch, that is
+        during the reorganization (timed as the reorg stage).
+
+        Returns:
+            Dict[str, float]: The time taken by each stage, in seconds (also kept in last_timings).
+
+        Raises:
+            BlockValidationError: If the block is invalid. Its stage attribute names the stage that rejected it.
+        """
+        timings = {}
+        self.last_timings = timings
+        block_hash = block.hash
+
+        start = time.perf_counter()
+        if block_hash in self.block_index:
+            raise BlockValidationError('stateless', f"Block {block_hash} is already known.")
+        previous_hash = block.previous_block['block_hash']
+        if previous_hash not in self.block_index:
+            raise BlockValidationError('stateless', f"The previous block {previous_hash} is not known.")
+        if previous_hash in self.block_index.invalid:
+            raise BlockValidationError('stateless', f"The previous block {previous_hash} is invalid.")
+        try:
+            check_block_stateless(block, self.block_store.get_header(previous_hash))
+        except ValueError as e:
+            raise BlockValidationError('stateless', str(e))
+        timings['stateless'] = time.perf_counter() - start
+
+        if previous_hash == self.block_store.get_hash_by_height(self.height):
+            self.block_index.add_header(block.header)
+            try:
+                self.connect_block(block, timings)
+            except BlockValidationError:
+                self.block_index.mark_invalid(block_hash)
+                raise
+            return timings
+
+        self.block_store.put_side_block(block)
+        entry = self.block_index.add_header(block.header)
+        if entry.chain_work > self.tip_entry.chain_work:
+            start = time.perf_counter()
+            self.reorganize()
+            timings['reorg'] = time.perf_counter() - start
+        return timings
+
+
+    def connect_block(self, block: Block, timings: Optional[Dict[str, float]] = None) -> None:
+        """
+        Validates the inputs and scripts of a block that extends the tip, and connects it.
+
+        Raises:
+            BlockValidationError: If the block is invalid. The chain is left unchanged.
+        """
+        if timings is None:
+            timings = {}
+        height = self.height + 1
+
+        start = time.perf_counter()
+        try:
+            spends = check_block_inputs(block, height, self.utxo_set)
+        except ValueError as e:
+            raise BlockValidationError('inputs', str(e))
+        timings['inputs'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        error = self.verify_scripts(spends)
+        if error is not None:
+            raise BlockValidationError('scripts', error)
+        timings['scripts'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        undo = self.utxo_set.apply_block(block, height)
+        self.block_store.put_block(block, height)
+        if self.address_index is not None:
+            self.address_index.apply_block(block, height, undo)
+        self.mempool.remove_block(block)
+        timings['apply'] = time.perf_counter() - start
+
+
+    def disconnect_block(self) -> Block:
+        """
+        Disconnects the tip block, using the UTXO set's undo data. The block stays in the block store.
+
+        Pooled transactions that spend its outputs are removed from the mempool.
+        """
+        height = self.height
+        block = self.tip
+        previous_hash = block.previous_block['block_hash']
+        undo = self.utxo_set.undo_block(height, previous_hash)
+        if self.address_index is not None:
+            self.address_index.undo_block(height, previous_hash)
+        self.block_store.truncate(height - 1)
+        self.mempool.remove_spenders(undo.created)
+        return block
+
+
+    def reorganize(self) -> None:
+        """
+        Switches the main chain to the best tip in the block tree. The blocks after the fork point are disconnected,
+        and the blocks of the new branch are connected, so the cost depends on the depth of the fork, not on the
+        length of the chain.
 
+        If a block on the new branch is invalid, it (and its descendants) are marked invalid, and the node switches
+        to the best remaining tip (which may be the old one). The transactions of the disconnected blocks are
+        returned to the mempool, if they are still valid.
 
-    def process_block(self):
-        pass
+        Raises:
+            BlockValidationError: If a block on the new branch was invalid.
+        """
+        error = None
+        disconnected = []
+        while True:
+            best = self.block_index.best_tip
+            tip = self.tip_entry
+            if best.block_hash == tip.block_hash:
+                break
+            fork = self.block_index.get_fork_point(tip, best)
+            log(f"Reorganizing from block {tip.block_hash} (height {tip.height}) to block {best.block_hash} "
+                f"(height {best.height}), with the fork at height {fork.height}.")
+            while self.height > fork.height:
+                disconnected.append(self.disconnect_block())
+            for entry in self.block_index.get_branch(fork, best):
+                try:
+                    self.connect_block(self.block_store.get_block(entry.block_hash))
+                except BlockValidationError as e:
+                    log(f"Block {entry.block_hash} on the new branch is invalid: {e}")
+                    self.block_index.mark_invalid(entry.block_hash)
+                    error = e
+                    break
+        for block in disconnected:
+            for tx in block.transactions[1:]:
+                try:
+                    self.mempool.add_transaction(tx)
+                except ValueError:
+                    # Spent (or double-spent) on the new branch.
+                    pass
+        if error is not None:
+            raise error
 
 
+    def verify_scripts(self, spends) -> Optional[str]:
+        """
+        Verifies the scripts of each (transaction, coins) pair.
 
+        Returns:
+            The first error found, or None if all of the scripts are valid.
+        """
+        n_inputs = sum(len(coins) for _, coins in spends)
+        if n_inputs < PARALLEL_SCRIPT_THRESHOLD or self.script_workers == 1:
+            for tx, coins in spends:
+                for input_index, coin in enumerate(coins):
+                    if not verify_input_script(tx, input_index, coin.lock_script):
+                        return f"Transaction {tx.hash}: the script for input {input_index} is not valid."
+            return None
+        # Worker processes have their own (empty) signature caches, so only send them the transactions whose
+        # signatures were not already verified in this process (e.g. when they entered the mempool).
+        jobs = [
+            (tx.to_bytes(), [coin.lock_script for coin in coins])
+            for tx, coins in spends
+            if not all(
+                verify_input_script(tx, input_index, coin.lock_script, cache_only=True)
+                for input_index, coin in enumerate(coins)
+            )
+        ]
+        if not jobs:
+            return None
+        if self._script_executor is None:
+            # Workers are spawned rather than forked, as the node may be running other threads.
+            self._script_executor = ProcessPoolExecutor(
+                max_workers=self.script_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        chunk_size = max(1, len(jobs) // (self.script_workers * 4))
+        errors = self._script_executor.map(
+            verify_transaction_scripts,
+            [tx_bytes for tx_bytes, _ in jobs],
+            [lock_scripts for _, lock_scripts in jobs],
+            chunksize=chunk_size,
+        )
+        for error in errors:
+            if error is not None:
+                return error
+        return None
@@ -1,19 +1,20 @@
 # Components
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from pydantic import BaseModel, Field
 
 
 # Local components
-from .gaius import script_to_hex
-from .models.hex_string import HexString
+from .gaius import bytes_to_script, script_to_bytes, script_to_hex
+from .models.binary_serializable import BinarySerializable
 from .models.json_serializable import JsonSerializable
 from ..utils.hex_utils import compact_size, int_to_hex
+from ..utils.serialization import read_bytes, read_int, write_bytes, write_int
 
 
 
 
 # Todo: A from_json method that returns an Output
-class Output(JsonSerializable):
+class Output(JsonSerializable, BinarySerializable):
     """
     Represents an output in a blockchain transaction, containing a value and a lock script.
 
@@ -37,7 +38,7 @@ class Output(JsonSerializable):
 
 
     @property
-    def hex_values(self) -> Dict[str, HexString]:
+    def hex_values(self) -> Dict[str, Any]:
         """
         Returns the hex-encoded values of the output's attributes, along with their lengths.
 
@@ -57,21 +58,25 @@ class Output(JsonSerializable):
             'lock_script': lock_script_hex,
         }
 
-    @property
-    def hex(self) -> HexString:
+    def serialize_into(self, buffer: bytearray) -> None:
+        """
+        Appends the serialized output to the buffer.
         """
-        Returns the full hex-encoded string of the output.
+        if self.value is None or self.lock_script is None:
+            raise ValueError("Both 'value' and 'lock_script' must be set before serializing.")
+        write_int(buffer, self.value)
+        write_bytes(buffer, script_to_bytes(self.lock_script))
 
-        This combines the length and value of both the value and lock script.
 
-        Returns:
-            str: The full hex string representation of the output.
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["Output", int]:
         """
-        v = self.hex_values
-        hex_string = ''
-        hex_string += v['value_length']
-        hex_string += v['value']
-        hex_string += v['lock_script_length']
-        hex_string += v['lock_script']
-        return hex_string
+        Parses an output from data at offset.
 
+        Returns:
+            Tuple[Output, int]: The output and the offset of the first byte after it.
+        """
+        value, offset = read_int(data, offset)
+        lock_script, offset = read_bytes(data, offset)
+        instance = cls.from_values(trusted, value=value, lock_script=bytes_to_script(lock_script))
+        return instance, offset
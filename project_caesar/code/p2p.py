@@ -0,0 +1,589 @@
+# Imports
+import asyncio
+
+
+# Components
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .block_sync import BlockSync
+from .compact_block import PartialBlock, create_compact_block
+from .node import Node
+from .p2p_messages import INV_BLOCK, INV_TRANSACTION, MAX_HEADERS, MAX_INVENTORY_ITEMS, MESSAGE_HEADER_FORMAT
+from .p2p_messages import InventoryItem, decode_block_transactions, decode_compact_block
+from .p2p_messages import decode_get_block_transactions, decode_get_headers, decode_headers, decode_inventory
+from .p2p_messages import decode_version, encode_block_transactions, encode_compact_block
+from .p2p_messages import encode_get_block_transactions, encode_headers, encode_inventory, encode_message
+from .p2p_messages import encode_version, read_message
+from .transaction import Transaction
+from .validation import BlockValidationError
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_HOST = '127.0.0.1'
+# A peer whose send queue grows beyond this (because it does not read its messages) is disconnected.
+MAX_SEND_QUEUE_SIZE = 64 * 1024 * 1024
+# The number of hashes that a peer is remembered to know about, so that they are not announced to it again.
+MAX_KNOWN_INVENTORY = 100000
+
+
+
+
+class Peer:
+    """
+    A connection to another node.
+
+    Messages to the peer go through a send queue, which a writer task drains: all of the messages queued at that
+    point are written together, and followed by a single drain. Announcements (inventory) are not queued one by one,
+    but collected and sent as one inv message each time the writer runs, so that a burst of new transactions costs
+    a few large messages rather than one small message each.
+    """
+
+
+    def __init__(self, network: "P2PNode", reader: asyncio.StreamReader, writer: asyncio.StreamWriter, outbound: bool):
+        self.network = network
+        self.reader = reader
+        self.writer = writer
+        self.outbound = outbound
+        self.address = writer.get_extra_info('peername')
+        # Set from the peer's version message.
+        self.version: Optional[int] = None
+        self.height: Optional[int] = None
+        self.tip_hash: Optional[str] = None
+        self.ready = asyncio.Event()
+        # Set when the peer asks to receive new blocks as compact blocks (sendcmpct), rather than announcements.
+        self.compact_blocks = False
+        self.known_inventory: Set[str] = set()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queue_size = 0
+        self._pending_inventory: List[InventoryItem] = []
+        self._writer_task: Optional[asyncio.Task] = None
+        self.closed = False
+
+
+    def __repr__(self) -> str:
+        return f"Peer({self.address})"
+
+
+    def send(self, command: str, payload: bytes = b'') -> None:
+        if self.closed:
+            return
+        message = encode_message(command, payload)
+        self._queue_size += len(message)
+        if self._queue_size > MAX_SEND_QUEUE_SIZE:
+            log(f"Disconnecting {self}: its send queue is full.")
+            self.close()
+            return
+        self._queue.put_nowait(message)
+
+
+    def announce(self, inv_type: int, item_hash: str) -> None:
+        """
+        Queues an announcement of an item, unless the peer already knows about it.
+        """
+        if self.closed or item_hash in self.known_inventory:
+            return
+        self.add_known_inventory(item_hash)
+        if not self._pending_inventory:
+            # Wake the writer, which sends all of the pending announcements together.
+            self._queue.put_nowait(None)
+        self._pending_inventory.append((inv_type, item_hash))
+
+
+    def add_known_inventory(self, item_hash: str) -> None:
+        known = self.known_inventory
+        if len(known) >= MAX_KNOWN_INVENTORY:
+            known.clear()
+        known.add(item_hash)
+
+
+    async def run(self) -> None:
+        self._writer_task = asyncio.create_task(self._write_loop())
+        try:
+            await self._read_loop()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            deb(f"{self} disconnected.")
+        except ValueError as e:
+            log(f"Disconnecting {self}: {e}")
+        except Exception:
+            # A bug in a handler must not leave the peer connected (or its task failing unnoticed).
+            logger.exception(f"Disconnecting {self}: error while handling a message.")
+        finally:
+            self.close()
+            self.network.remove_peer(self)
+
+
+    async def _read_loop(self) -> None:
+        handlers = self.network.handlers
+        while True:
+            command, payload = await read_message(self.reader)
+            self.bytes_received += MESSAGE_HEADER_FORMAT.size + len(payload)
+            handler = handlers.get(command)
+            if handler is None:
+                deb(f"Ignoring unknown message '{command}' from {self}.")
+                continue
+            handler(self, payload)
+
+
+    async def _write_loop(self) -> None:
+        queue = self._queue
+        try:
+            while True:
+                chunks = [await queue.get()]
+                while not queue.empty():
+                    chunks.append(queue.get_nowait())
+                data = b''.join(chunk for chunk in chunks if chunk is not None)
+                self._queue_size -= len(data)
+                inventory = self._pending_inventory
+                self._pending_inventory = []
+                for i in range(0, len(inventory), MAX_INVENTORY_ITEMS):
+                    data += encode_message('inv', encode_inventory(inventory[i:i + MAX_INVENTORY_ITEMS]))
+                self.bytes_sent += len(data)
+                self.writer.write(data)
+                await self.writer.drain()
+        except ConnectionError:
+            self.close()
+
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self.writer.close()
+
+
+
+
+class P2PNode:
+    """
+    Connects a Node to other nodes over TCP.
+
+    Nodes announce new transactions and blocks with inventory (inv) messages. A node that does not have an announced
+    item requests it (getdata), validates it, and announces it to its other peers. Full transactions and blocks are
+    only sent to peers that ask for them.
+
+    New blocks are pushed to peers that asked for compact blocks (sendcmpct), without an announcement: a compact
+    block carries the header and short transaction IDs, and the recipient rebuilds the block from its mempool,
+    requesting only the transactions that it does not have (getblocktxn / blocktxn). Other peers get an
+    announcement, and request the full block.
+
+    A node that learns of a peer with a longer chain (from its version message, or from a block whose parent it
+    does not have) catches up with a headers-first sync (see BlockSync).
+
+    The Node is not thread-safe: all of its work (validation included) runs on the event loop.
+
+    Message handlers are looked up by command in the handlers dictionary. Each handler takes the peer and the
+    message payload.
+    """
+
+
+    def __init__(
+        self,
+        node: Node,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        auto_sync: bool = True,
+        compact_blocks: bool = True,
+    ):
+        self.node = node
+        self.host = host
+        self.port = port
+        self.auto_sync = auto_sync
+        self.compact_blocks = compact_blocks
+        self.peers: List[Peer] = []
+        self.sync: Optional[BlockSync] = None
+        # Items requested from a peer, and not yet received.
+        self._requested: Dict[str, Peer] = {}
+        # Compact blocks waiting for their missing transactions, by block hash.
+        self._partial_blocks: Dict[str, Tuple[Peer, PartialBlock]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.handlers: Dict[str, Callable[[Peer, bytes], None]] = {
+            'version': self._on_version,
+            'inv': self._on_inv,
+            'getdata': self._on_getdata,
+            'notfound': self._on_notfound,
+            'tx': self._on_tx,
+            'block': self._on_block,
+            'getheaders': self._on_get_headers,
+            'headers': self._on_headers,
+            'sendcmpct': self._on_send_compact,
+            'cmpctblock': self._on_compact_block,
+            'getblocktxn': self._on_get_block_transactions,
+            'blocktxn': self._on_block_transactions,
+        }
+
+
+    async def __aenter__(self) -> "P2PNode":
+        await self.start()
+        return self
+
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._on_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log(f"Listening on {self.host}:{self.port}.")
+
+
+    async def stop(self) -> None:
+        # The server only finishes closing once its connections are closed.
+        if self._server is not None:
+            self._server.close()
+        for peer in list(self.peers):
+            peer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+    async def connect(self, host: str, port: int) -> Peer:
+        """
+        Opens a connection to a node, and waits for its version message.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        peer = self._add_peer(reader, writer, outbound=True)
+        await peer.ready.wait()
+        return peer
+
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._add_peer(reader, writer, outbound=False)
+
+
+    def _add_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, outbound: bool) -> Peer:
+        peer = Peer(self, reader, writer, outbound)
+        self.peers.append(peer)
+        task = asyncio.create_task(peer.run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        node = self.node
+        peer.send('version', encode_version(node.height, node.tip_entry.block_hash))
+        if self.compact_blocks:
+            peer.send('sendcmpct')
+        deb(f"Connected to {peer} ({'outbound' if outbound else 'inbound'}).")
+        return peer
+
+
+    def remove_peer(self, peer: Peer) -> None:
+        if peer in self.peers:
+            self.peers.remove(peer)
+        # Items requested from the peer can be requested again from another peer.
+        for item_hash in [h for h, p in self._requested.items() if p is peer]:
+            del self._requested[item_hash]
+            self._partial_blocks.pop(item_hash, None)
+        if self.sync is not None:
+            self.sync.on_peer_disconnected(peer)
+
+
+    def start_sync(self, peer: Peer) -> BlockSync:
+        """
+        Starts a headers-first sync from a peer (unless one is already running).
+        """
+        if self.sync is None:
+            self.sync = BlockSync(self, peer)
+            self.sync.start()
+        return self.sync
+
+
+    def broadcast_inventory(self, inv_type: int, item_hash: str, source: Optional[Peer] = None) -> None:
+        for peer in self.peers:
+            if peer is not source:
+                peer.announce(inv_type, item_hash)
+
+
+    def relay_block(self, block: Block, source: Optional[Peer] = None) -> None:
+        """
+        Sends a new block as a compact block to the peers that asked for compact blocks, and announces it to the
+        others.
+        """
+        block_hash = block.hash
+        payload = None
+        for peer in self.peers:
+            if peer is source or peer.closed or block_hash in peer.known_inventory:
+                continue
+            if not peer.compact_blocks:
+                peer.announce(INV_BLOCK, block_hash)
+                continue
+            if payload is None:
+                payload = encode_compact_block(create_compact_block(block))
+            peer.add_known_inventory(block_hash)
+            peer.send('cmpctblock', payload)
+
+
+    def submit_transaction(self, tx: Transaction) -> None:
+        """
+        Adds a transaction to the node's mempool, and announces it to all peers.
+
+        Raises:
+            ValueError: If the mempool rejects the transaction.
+        """
+        self.node.mempool.add_transaction(tx)
+        self.broadcast_inventory(INV_TRANSACTION, tx.hash)
+
+
+    def submit_block(self, block: Block) -> None:
+        """
+        Processes a block (e.g. one that was just mined), and announces it to all peers.
+
+        Raises:
+            BlockValidationError: If the block is invalid.
+        """
+        self.node.process_block(block)
+        self.relay_block(block)
+
+
+    def has_item(self, inv_type: int, item_hash: str) -> bool:
+        if inv_type == INV_TRANSACTION:
+            return item_hash in self.node.mempool
+        return item_hash in self.node.block_index
+
+
+    def _on_version(self, peer: Peer, payload: bytes) -> None:
+        peer.version, peer.height, peer.tip_hash = decode_version(payload)
+        peer.ready.set()
+        if self.auto_sync and peer.height > self.node.height:
+            self.start_sync(peer)
+        elif self.sync is not None:
+            self.sync.request_blocks()
+
+
+    def _on_inv(self, peer: Peer, payload: bytes) -> None:
+        wanted = []
+        requested = self._requested
+        for inv_type, item_hash in decode_inventory(payload):
+            peer.add_known_inventory(item_hash)
+            if item_hash in requested or self.has_item(inv_type, item_hash):
+                continue
+            if inv_type == INV_BLOCK and self.sync is not None:
+                # The sync will reach the block.
+                continue
+            requested[item_hash] = peer
+            wanted.append((inv_type, item_hash))
+        if wanted:
+            peer.send('getdata', encode_inventory(wanted))
+
+
+    def _on_getdata(self, peer: Peer, payload: bytes) -> None:
+        not_found = []
+        for inv_type, item_hash in decode_inventory(payload):
+            if inv_type == INV_TRANSACTION:
+                tx = self.node.mempool.get_transaction(item_hash)
+                if tx is not None:
+                    peer.send('tx', tx.to_bytes())
+                    continue
+            elif inv_type == INV_BLOCK:
+                data = self.node.get_block_bytes(item_hash)
+                if data is not None:
+                    peer.send('block', data)
+                    continue
+            not_found.append((inv_type, item_hash))
+        if not_found:
+            peer.send('notfound', encode_inventory(not_found))
+
+
+    def _on_notfound(self, peer: Peer, payload: bytes) -> None:
+        for _, item_hash in decode_inventory(payload):
+            if self._requested.get(item_hash) is peer:
+                del self._requested[item_hash]
+                self._partial_blocks.pop(item_hash, None)
+
+
+    def _on_tx(self, peer: Peer, payload: bytes) -> None:
+        tx = Transaction.from_bytes(payload)
+        tx_hash = tx.hash
+        self._requested.pop(tx_hash, None)
+        peer.add_known_inventory(tx_hash)
+        try:
+            self.node.mempool.add_transaction(tx)
+        except ValueError as e:
+            deb(f"Rejected transaction {tx_hash} from {peer}: {e}")
+            return
+        self.broadcast_inventory(INV_TRANSACTION, tx_hash, source=peer)
+
+
+    def _on_block(self, peer: Peer, payload: bytes) -> None:
+        block = Block.from_bytes(payload)
+        block_hash = block.hash
+        self._requested.pop(block_hash, None)
+        self._partial_blocks.pop(block_hash, None)
+        peer.add_known_inventory(block_hash)
+        if self.sync is not None:
+            self.sync.on_block(peer, block)
+            return
+        if block.previous_block['block_hash'] not in self.node.block_index:
+            # The peer is further ahead than this block's parent: catch up with a sync.
+            if self.auto_sync:
+                self.start_sync(peer)
+            return
+        self._accept_block(peer, block)
+
+
+    def _accept_block(self, peer: Peer, block: Block) -> None:
+        try:
+            self.node.process_block(block)
+        except BlockValidationError as e:
+            log(f"Rejected block {block.hash} from {peer}: {e}")
+            return
+        self.relay_block(block, source=peer)
+
+
+    def _on_send_compact(self, peer: Peer, payload: bytes) -> None:
+        peer.compact_blocks = True
+
+
+    def _on_compact_block(self, peer: Peer, payload: bytes) -> None:
+        compact = decode_compact_block(payload)
+        header = compact.header
+        block_hash = header.hash
+        peer.add_known_inventory(block_hash)
+        if block_hash in self.node.block_index or block_hash in self._requested or self.sync is not None:
+            return
+        if header.previous_block['block_hash'] not in self.node.block_index:
+            if self.auto_sync:
+                self.start_sync(peer)
+            return
+        # Proof of work is checked before any work is done to rebuild the block.
+        if not header.meets_difficulty:
+            raise ValueError(f"Compact block {block_hash} does not meet its mining difficulty threshold.")
+        partial = PartialBlock(compact, self.node.mempool)
+        missing = partial.missing
+        if missing:
+            deb(f"Compact block {block_hash}: requesting {len(missing)} of {len(partial.transactions)} transactions.")
+            self._requested[block_hash] = peer
+            self._partial_blocks[block_hash] = (peer, partial)
+            peer.send('getblocktxn', encode_get_block_transactions(block_hash, missing))
+            return
+        self._complete_compact_block(peer, partial)
+
+
+    def _complete_compact_block(self, peer: Peer, partial: PartialBlock) -> None:
+        try:
+            block = partial.to_block()
+        except ValueError as e:
+            # Most likely a short ID collision with a mempool transaction: fall back to the full block.
+            block_hash = partial.header.hash
+            deb(f"Could not rebuild compact block {block_hash}: {e} Requesting the full block.")
+            self._requested[block_hash] = peer
+            peer.send('getdata', encode_inventory([(INV_BLOCK, block_hash)]))
+            return
+        self._accept_block(peer, block)
+
+
+    def _on_get_block_transactions(self, peer: Peer, payload: bytes) -> None:
+        block_hash, indexes = decode_get_block_transactions(payload)
+        block = self.node.get_block_by_hash(block_hash)
+        if block is None:
+            peer.send('notfound', encode_inventory([(INV_BLOCK, block_hash)]))
+            return
+        transactions = block.transactions
+        if any(index >= len(transactions) for index in indexes):
+            raise ValueError(f"Invalid transaction index requested for block {block_hash}.")
+        peer.send('blocktxn', encode_block_transactions(block_hash, [transactions[i] for i in indexes]))
+
+
+    def _on_block_transactions(self, peer: Peer, payload: bytes) -> None:
+        block_hash, transactions = decode_block_transactions(payload)
+        if self._requested.get(block_hash) is not peer or block_hash not in self._partial_blocks:
+            return
+        del self._requested[block_hash]
+        _, partial = self._partial_blocks.pop(block_hash)
+        partial.fill(transactions)
+        self._complete_compact_block(peer, partial)
+
+
+    def _on_get_headers(self, peer: Peer, payload: bytes) -> None:
+        locator, stop_hash = decode_get_headers(payload)
+        peer.send('headers', encode_headers(self.node.get_headers(locator, stop_hash, MAX_HEADERS)))
+
+
+    def _on_headers(self, peer: Peer, payload: bytes) -> None:
+        headers = decode_headers(payload)
+        if self.sync is not None:
+            self.sync.on_headers(peer, headers)
+
+
+
+
+
+class LocalNetwork:
+    """
+    A test harness: n nodes in one process, each with its own in-memory Node, connected over localhost TCP.
+
+    With topology 'line', node i is connected to node i - 1, so items must be relayed across the network. With
+    'mesh', every pair of nodes is connected.
+    """
+
+
+    def __init__(
+        self,
+        n_nodes: int,
+        topology: str = 'line',
+        node_factory: Callable[[], Node] = Node,
+        compact_blocks: bool = True,
+    ):
+        if n_nodes < 1 or topology not in ('line', 'mesh'):
+            raise ValueError("Invalid local network settings.")
+        self.topology = topology
+        self.nodes = [P2PNode(node_factory(), compact_blocks=compact_blocks) for _ in range(n_nodes)]
+
+
+    async def __aenter__(self) -> "LocalNetwork":
+        await self.start()
+        return self
+
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+
+    async def start(self) -> None:
+        for p2p_node in self.nodes:
+            await p2p_node.start()
+        for i, p2p_node in enumerate(self.nodes):
+            targets = [i - 1] if self.topology == 'line' else range(i)
+            for j in targets:
+                if j >= 0:
+                    await p2p_node.connect(DEFAULT_HOST, self.nodes[j].port)
+        # Wait until each inbound peer's version has arrived too.
+        await self.wait_until(lambda: all(peer.ready.is_set() for n in self.nodes for peer in n.peers))
+
+
+    async def stop(self) -> None:
+        for p2p_node in self.nodes:
+            await p2p_node.stop()
+            p2p_node.node.close()
+
+
+    async def wait_until(self, condition: Callable[[], bool], timeout: float = 10, interval: float = 0.005) -> None:
+        """
+        Waits (running the event loop) until condition() is true.
+
+        Raises:
+            TimeoutError: If the condition is not true within the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not condition():
+            if loop.time() > deadline:
+                raise TimeoutError("The local network did not reach the expected state in time.")
+            await asyncio.sleep(interval)
@@ -0,0 +1,229 @@
+# Imports
+import asyncio
+import struct
+
+
+# Components
+from typing import List, NamedTuple, Optional, Tuple
+
+
+# Local components
+from .block_header import HEADER_SIZE, NULL_HASH, BlockHeader
+from .compact_block import COMPACT_NONCE_FORMAT, SHORT_ID_SIZE, CompactBlock
+from .transaction import Transaction
+from .validation import MAX_BLOCK_SIZE
+from ..utils.serialization import read_compact_size, write_compact_size
+
+
+# Constants
+PROTOCOL_VERSION = 1
+# Each message: magic (4) + command (12, zero-padded ASCII) + payload length (4), followed by the payload.
+MESSAGE_MAGIC = b'CSRN'
+MESSAGE_HEADER_FORMAT = struct.Struct('<4s12sI')
+MAX_MESSAGE_SIZE = MAX_BLOCK_SIZE + 1024
+# Version payload: protocol version (4) + height of the sender's tip (8) + hash of the sender's tip (32).
+VERSION_FORMAT = struct.Struct('<IQ32s')
+# Inventory items: type (1) + hash (32).
+INVENTORY_ITEM_FORMAT = struct.Struct('<B32s')
+INV_TRANSACTION = 1
+INV_BLOCK = 2
+MAX_INVENTORY_ITEMS = 50000
+HASH_SIZE = 32
+MAX_LOCATOR_HASHES = 101
+MAX_HEADERS = 2000
+# Bounds the number of transactions in compact block messages (a transaction is more than 100 bytes).
+MAX_BLOCK_TRANSACTIONS = MAX_BLOCK_SIZE // 100
+
+
+# Types
+InventoryItem = Tuple[int, str]
+
+
+
+
+class Version(NamedTuple):
+    version: int
+    height: int
+    tip_hash: str
+
+
+
+
+# Message framing.
+
+
+def encode_message(command: str, payload: bytes = b'') -> bytes:
+    return MESSAGE_HEADER_FORMAT.pack(MESSAGE_MAGIC, command.encode('ascii'), len(payload)) + payload
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[str, bytes]:
+    """
+    Reads one message from a stream.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection is closed.
+        ValueError: If the message header is invalid.
+    """
+    header = await reader.readexactly(MESSAGE_HEADER_FORMAT.size)
+    magic, command, length = MESSAGE_HEADER_FORMAT.unpack(header)
+    if magic != MESSAGE_MAGIC:
+        raise ValueError(f"Invalid message magic: {magic!r}")
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message size {length} exceeds the maximum of {MAX_MESSAGE_SIZE} bytes.")
+    payload = await reader.readexactly(length)
+    return command.rstrip(b'\x00').decode('ascii'), payload
+
+
+
+
+# Payloads. Decoders raise ValueError for malformed payloads.
+
+
+def encode_version(height: int, tip_hash: str) -> bytes:
+    return VERSION_FORMAT.pack(PROTOCOL_VERSION, height, bytes.fromhex(tip_hash))
+
+
+def decode_version(payload: bytes) -> Version:
+    if len(payload) != VERSION_FORMAT.size:
+        raise ValueError("Invalid version message.")
+    version, height, tip_hash = VERSION_FORMAT.unpack(payload)
+    return Version(version, height, tip_hash.hex())
+
+
+def encode_inventory(items: List[InventoryItem]) -> bytes:
+    buffer = bytearray()
+    write_compact_size(buffer, len(items))
+    for inv_type, item_hash in items:
+        buffer += INVENTORY_ITEM_FORMAT.pack(inv_type, bytes.fromhex(item_hash))
+    return bytes(buffer)
+
+
+def decode_inventory(payload: bytes) -> List[InventoryItem]:
+    n, offset = read_compact_size(payload, 0)
+    if n > MAX_INVENTORY_ITEMS or offset + n * INVENTORY_ITEM_FORMAT.size != len(payload):
+        raise ValueError(f"Invalid inventory message: {n} items in {len(payload)} bytes.")
+    return [
+        (inv_type, item_hash.hex())
+        for inv_type, item_hash in INVENTORY_ITEM_FORMAT.iter_unpack(payload[offset:])
+    ]
+
+
+def encode_get_headers(locator: List[str], stop_hash: Optional[str] = None) -> bytes:
+    """
+    A request for the headers that follow the first locator hash on the recipient's main chain, up to stop_hash (or
+    MAX_HEADERS headers).
+    """
+    buffer = bytearray()
+    write_compact_size(buffer, len(locator))
+    for block_hash in locator:
+        buffer += bytes.fromhex(block_hash)
+    buffer += bytes.fromhex(stop_hash or NULL_HASH)
+    return bytes(buffer)
+
+
+def decode_get_headers(payload: bytes) -> Tuple[List[str], Optional[str]]:
+    n, offset = read_compact_size(payload, 0)
+    if n > MAX_LOCATOR_HASHES or offset + (n + 1) * HASH_SIZE != len(payload):
+        raise ValueError(f"Invalid getheaders message: {n} locator hashes in {len(payload)} bytes.")
+    hashes = [payload[i:i + HASH_SIZE].hex() for i in range(offset, len(payload), HASH_SIZE)]
+    stop_hash = hashes.pop()
+    return hashes, None if stop_hash == NULL_HASH else stop_hash
+
+
+def encode_headers(headers: List[BlockHeader]) -> bytes:
+    buffer = bytearray()
+    write_compact_size(buffer, len(headers))
+    for header in headers:
+        buffer += header.to_bytes()
+    return bytes(buffer)
+
+
+def decode_headers(payload: bytes) -> List[BlockHeader]:
+    n, offset = read_compact_size(payload, 0)
+    if n > MAX_HEADERS or offset + n * HEADER_SIZE != len(payload):
+        raise ValueError(f"Invalid headers message: {n} headers in {len(payload)} bytes.")
+    return [BlockHeader.from_bytes(payload[i:i + HEADER_SIZE]) for i in range(offset, len(payload), HEADER_SIZE)]
+
+
+def encode_compact_block(compact: CompactBlock) -> bytes:
+    buffer = bytearray(compact.header.to_bytes())
+    buffer += COMPACT_NONCE_FORMAT.pack(compact.nonce)
+    write_compact_size(buffer, len(compact.short_ids))
+    buffer += b''.join(compact.short_ids)
+    write_compact_size(buffer, len(compact.prefilled))
+    for index, tx in compact.prefilled:
+        write_compact_size(buffer, index)
+        buffer += tx.to_bytes()
+    return bytes(buffer)
+
+
+def decode_compact_block(payload: bytes) -> CompactBlock:
+    header, offset = BlockHeader.read_from(payload, 0)
+    if len(payload) < offset + COMPACT_NONCE_FORMAT.size:
+        raise ValueError("Invalid cmpctblock message.")
+    (nonce,) = COMPACT_NONCE_FORMAT.unpack_from(payload, offset)
+    n, offset = read_compact_size(payload, offset + COMPACT_NONCE_FORMAT.size)
+    end = offset + n * SHORT_ID_SIZE
+    if n > MAX_BLOCK_TRANSACTIONS or end > len(payload):
+        raise ValueError(f"Invalid cmpctblock message: {n} short IDs in {len(payload)} bytes.")
+    short_ids = [payload[i:i + SHORT_ID_SIZE] for i in range(offset, end, SHORT_ID_SIZE)]
+    n, offset = read_compact_size(payload, end)
+    if n > MAX_BLOCK_TRANSACTIONS:
+        raise ValueError(f"Invalid cmpctblock message: {n} prefilled transactions.")
+    prefilled = []
+    for _ in range(n):
+        index, offset = read_compact_size(payload, offset)
+        tx, offset = Transaction.read_from(payload, offset)
+        prefilled.append((index, tx))
+    if offset != len(payload):
+        raise ValueError("Invalid cmpctblock message: unexpected trailing data.")
+    return CompactBlock(header, nonce, short_ids, prefilled)
+
+
+def encode_get_block_transactions(block_hash: str, indexes: List[int]) -> bytes:
+    """
+    A request for the transactions at the given indexes of a block (those missing from a compact block).
+    """
+    buffer = bytearray(bytes.fromhex(block_hash))
+    write_compact_size(buffer, len(indexes))
+    for index in indexes:
+        write_compact_size(buffer, index)
+    return bytes(buffer)
+
+
+def decode_get_block_transactions(payload: bytes) -> Tuple[str, List[int]]:
+    if len(payload) < HASH_SIZE:
+        raise ValueError("Invalid getblocktxn message.")
+    n, offset = read_compact_size(payload, HASH_SIZE)
+    if n > MAX_BLOCK_TRANSACTIONS:
+        raise ValueError(f"Invalid getblocktxn message: {n} indexes.")
+    indexes = []
+    for _ in range(n):
+        index, offset = read_compact_size(payload, offset)
+        indexes.append(index)
+    if offset != len(payload):
+        raise ValueError("Invalid getblocktxn message: unexpected trailing data.")
+    return payload[:HASH_SIZE].hex(), indexes
+
+
+def encode_block_transactions(block_hash: str, transactions: List[Transaction]) -> bytes:
+    buffer = bytearray(bytes.fromhex(block_hash))
+    write_compact_size(buffer, len(transactions))
+    for tx in transactions:
+        buffer += tx.to_bytes()
+    return bytes(buffer)
+
+
+def decode_block_transactions(payload: bytes) -> Tuple[str, List[Transaction]]:
+    if len(payload) < HASH_SIZE:
+        raise ValueError("Invalid blocktxn message.")
+    n, offset = read_compact_size(payload, HASH_SIZE)
+    if n > MAX_BLOCK_TRANSACTIONS:
+        raise ValueError(f"Invalid blocktxn message: {n} transactions.")
+    transactions = []
+    for _ in range(n):
+        tx, offset = Transaction.read_from(payload, offset)
+        transactions.append(tx)
+    if offset != len(payload):
+        raise ValueError("Invalid blocktxn message: unexpected trailing data.")
+    return payload[:HASH_SIZE].hex(), transactions
@@ -0,0 +1,518 @@
+# Imports
+import asyncio
+import inspect
+import json
+
+
+# Components
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .gaius import bytes_to_script
+from .node import Node
+from .transaction import Transaction
+from .validation import MAX_BLOCK_SIZE
+
+
+if TYPE_CHECKING:
+    from .p2p import P2PNode
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_HOST = '127.0.0.1'
+# A request body can hold a batch of calls, or a transaction as JSON (which is larger than its binary form).
+MAX_REQUEST_SIZE = 4 * MAX_BLOCK_SIZE
+MAX_HEADER_LINES = 100
+MAX_BATCH_SIZE = 1000
+# Idle keep-alive connections are closed after this many seconds.
+KEEP_ALIVE_TIMEOUT = 60
+# The number of serialized results (blocks and transactions) kept in memory.
+DEFAULT_RESULT_CACHE_SIZE = 1000
+HASH_HEX_LENGTH = 64
+# JSON-RPC 2.0 error codes.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Application errors: e.g. a submitted transaction that the mempool rejects.
+REJECTED = -32000
+HTTP_STATUS_REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 405: 'Method Not Allowed'}
+
+
+
+
+class RpcError(ValueError):
+    """
+    An error that is returned to the caller as a JSON-RPC error object.
+    """
+
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+
+
+class HttpRequest(NamedTuple):
+    method: str
+    path: str
+    version: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+    @property
+    def keep_alive(self) -> bool:
+        # HTTP/1.1 connections stay open unless the client asks to close them; HTTP/1.0 connections are closed
+        # unless the client asks to keep them open.
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+
+
+
+# HTTP and JSON encoding.
+
+
+def dump_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+async def read_http_request(reader: asyncio.StreamReader) -> Optional[HttpRequest]:
+    """
+    Reads one HTTP request. Returns None if the connection was closed before a request started.
+
+    Raises:
+        ValueError: If the request is malformed or too large.
+        asyncio.IncompleteReadError: If the connection was closed during the request.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, version = line.decode('latin-1').split()
+    except ValueError:
+        raise ValueError(f"Invalid HTTP request line: {line[:100]!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            break
+        if not line:
+            raise asyncio.IncompleteReadError(line, None)
+        if len(headers) >= MAX_HEADER_LINES:
+            raise ValueError("Too many HTTP headers.")
+        name, separator, value = line.decode('latin-1').partition(':')
+        if not separator:
+            raise ValueError(f"Invalid HTTP header: {line[:100]!r}")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise ValueError("Invalid Content-Length header.")
+    if not 0 <= length <= MAX_REQUEST_SIZE:
+        raise ValueError(f"Request size {length} exceeds the maximum of {MAX_REQUEST_SIZE} bytes.")
+    body = await reader.readexactly(length)
+    return HttpRequest(method, path, version, headers, body)
+
+
+def encode_http_response(status: int, body: bytes = b'', keep_alive: bool = True) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {HTTP_STATUS_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+def encode_result(call_id: Any, result: bytes) -> bytes:
+    # The result is already serialized, and is spliced into the response as is.
+    return b'{"jsonrpc":"2.0","result":' + result + b',"id":' + dump_json(call_id) + b'}'
+
+
+def encode_error(call_id: Any, code: int, message: str) -> bytes:
+    return dump_json({'jsonrpc': '2.0', 'error': {'code': code, 'message': message}, 'id': call_id})
+
+
+
+
+class RpcServer:
+    """
+    A JSON-RPC 2.0 server over HTTP, for wallets and other clients of a Node.
+
+    Requests are POSTed to any path. A request body holds one call, or a batch (a list) of calls, which get one
+    response (a list, without the responses to notifications). Connections are kept alive (HTTP/1.1) so that a
+    polling client does not reconnect for each request, and requests on one connection are answered in order.
+
+    Blocks and transactions do not change once created, so their serialized JSON is cached (keyed on block hash),
+    and responses are built from the cached bytes: polling for the tip or a recent block costs a few dictionary
+    lookups, rather than loading, converting and serializing the block each time.
+
+    Like the P2P layer, the server runs on the event loop that owns the Node. With a P2PNode, submitted
+    transactions are also announced to the node's peers.
+
+    Methods (with named or positional parameters):
+    - get_tip(): the height and hash of the tip.
+    - get_block(hash=None, height=None): a block by hash or main-chain height (by default, the tip), or null.
+    - get_transaction(hash, height=None): a transaction in the mempool, or in the block at height, or null.
+        Without a height, confirmed transactions are found through the address index (if the node has one).
+    - get_utxo(height, transaction_hash, output_index): an unspent output (value and lock script), or null.
+    - submit_transaction(transaction): adds a transaction (as JSON, or serialized as hex) to the mempool, and
+        returns its hash.
+    """
+
+
+    def __init__(
+        self,
+        node: Node,
+        host: str = DEFAULT_HOST,
+        port: int = 0,
+        p2p_node: Optional["P2PNode"] = None,
+        result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+    ):
+        self.node = node
+        self.host = host
+        self.port = port
+        self.p2p_node = p2p_node
+        self.result_cache_size = result_cache_size
+        self.requests = 0
+        self._results: OrderedDict = OrderedDict()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.methods: Dict[str, Callable[..., bytes]] = {
+            'get_tip': self.get_tip,
+            'get_block': self.get_block,
+            'get_transaction': self.get_transaction,
+            'get_utxo': self.get_utxo,
+            'submit_transaction': self.submit_transaction,
+        }
+        self._signatures: Dict[Callable, inspect.Signature] = {}
+
+
+    async def __aenter__(self) -> "RpcServer":
+        await self.start()
+        return self
+
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._on_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log(f"RPC server listening on {self.host}:{self.port}.")
+
+
+    async def stop(self) -> None:
+        # The server only finishes closing once its connections are closed.
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await asyncio.wait_for(read_http_request(reader), KEEP_ALIVE_TIMEOUT)
+                if request is None:
+                    break
+                keep_alive = request.keep_alive
+                if request.method != 'POST':
+                    body = encode_error(None, INVALID_REQUEST, "Requests must use POST.")
+                    writer.write(encode_http_response(405, body, keep_alive))
+                else:
+                    body = self.handle(request.body)
+                    writer.write(encode_http_response(204 if body is None else 200, body or b'', keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ValueError as e:
+            deb(f"Bad HTTP request: {e}")
+            writer.write(encode_http_response(400, encode_error(None, INVALID_REQUEST, str(e)), keep_alive=False))
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+    def handle(self, body: bytes) -> Optional[bytes]:
+        """
+        Handles a request body (one call or a batch). Returns the serialized response, or None if there is nothing
+        to return (only notifications).
+        """
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return encode_error(None, PARSE_ERROR, "Parse error.")
+        if not isinstance(request, list):
+            return self._handle_call(request)
+        if not request or len(request) > MAX_BATCH_SIZE:
+            return encode_error(None, INVALID_REQUEST, f"A batch must have 1 to {MAX_BATCH_SIZE} calls.")
+        responses = [response for response in map(self._handle_call, request) if response is not None]
+        return b'[' + b','.join(responses) + b']' if responses else None
+
+
+    def _handle_call(self, call: Any) -> Optional[bytes]:
+        self.requests += 1
+        if not isinstance(call, dict) or call.get('jsonrpc') != '2.0' or not isinstance(call.get('method'), str):
+            return encode_error(None, INVALID_REQUEST, "Invalid request.")
+        call_id = call.get('id')
+        params = call.get('params', [])
+        try:
+            method = self.methods.get(call['method'])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method '{call['method']}' not found.")
+            if isinstance(params, list):
+                args, kwargs = params, {}
+            elif isinstance(params, dict):
+                args, kwargs = [], params
+            else:
+                raise RpcError(INVALID_REQUEST, "Params must be a list or an object.")
+            signature = self._signatures.get(method)
+            if signature is None:
+                signature = self._signatures[method] = inspect.signature(method)
+            try:
+                signature.bind(*args, **kwargs)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+            result = method(*args, **kwargs)
+        except RpcError as e:
+            response = encode_error(call_id, e.code, str(e))
+        except ValueError as e:
+            response = encode_error(call_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            logger.exception(f"RPC call {call['method']} failed.")
+            response = encode_error(call_id, INTERNAL_ERROR, f"Internal error: {e}")
+        else:
+            response = encode_result(call_id, result)
+        # A call without an id is a notification, which gets no response.
+        return response if 'id' in call else None
+
+
+    def _get_cached(self, key: Tuple, func: Callable[[], Any]) -> bytes:
+        # Returns the serialized result for key, serializing func() if it is not cached yet.
+        results = self._results
+        result = results.get(key)
+        if result is None:
+            result = dump_json(func())
+            results[key] = result
+            if len(results) > self.result_cache_size:
+                results.popitem(last=False)
+        else:
+            results.move_to_end(key)
+        return result
+
+
+    # Methods. Each returns its result serialized as JSON.
+
+
+    def get_tip(self) -> bytes:
+        entry = self.node.tip_entry
+        return self._get_cached(('tip', entry.block_hash), lambda: {'height': entry.height, 'hash': entry.block_hash})
+
+
+    def get_block(self, hash: Optional[str] = None, height: Optional[int] = None) -> bytes:
+        node = self.node
+        if hash is None:
+            block_hash = node.block_store.get_hash_by_height(node.height if height is None else check_height(height))
+        else:
+            block_hash = check_hash(hash)
+        if block_hash is None or block_hash not in node.block_index:
+            return b'null'
+
+        def get_result():
+            block = node.get_block_by_hash(block_hash)
+            return {'hash': block_hash, 'height': block.header.height, **block.to_json()}
+        return self._get_cached(('block', block_hash), get_result)
+
+
+    def get_transaction(self, hash: str, height: Optional[int] = None) -> bytes:
+        node = self.node
+        tx_hash = check_hash(hash)
+        if height is None:
+            tx = node.mempool.get_transaction(tx_hash)
+            if tx is not None:
+                return self._get_cached(('transaction', tx_hash, None), lambda: get_transaction_result(tx, None, None))
+            if node.address_index is None:
+                return b'null'
+            heights = node.address_index.get_transaction_heights(tx_hash)
+        else:
+            heights = [check_height(height)]
+        for h in heights:
+            block_hash = node.block_store.get_hash_by_height(h)
+            if block_hash is None:
+                continue
+            key = ('transaction', tx_hash, block_hash)
+            if key in self._results:
+                return self._get_cached(key, None)
+            for tx in node.get_block_by_hash(block_hash).transactions:
+                if tx.hash == tx_hash:
+                    return self._get_cached(key, lambda: get_transaction_result(tx, h, block_hash))
+        return b'null'
+
+
+    def get_utxo(self, height: int, transaction_hash: str, output_index: int) -> bytes:
+        if not isinstance(output_index, int) or output_index < 0:
+            raise RpcError(INVALID_PARAMS, "Invalid output index.")
+        coin = self.node.utxo_set.get_coin((check_height(height), check_hash(transaction_hash), output_index))
+        if coin is None:
+            return b'null'
+        return dump_json({'value': coin.value, 'lock_script': bytes_to_script(coin.lock_script)})
+
+
+    def submit_transaction(self, transaction: Any) -> bytes:
+        if isinstance(transaction, str):
+            tx = Transaction.from_bytes(bytes.fromhex(transaction))
+        elif isinstance(transaction, dict):
+            tx = Transaction.from_json(transaction)
+        else:
+            raise RpcError(INVALID_PARAMS, "The transaction must be a JSON object or a hex string.")
+        try:
+            if self.p2p_node is not None:
+                self.p2p_node.submit_transaction(tx)
+            else:
+                self.node.mempool.add_transaction(tx)
+        except ValueError as e:
+            raise RpcError(REJECTED, f"Transaction rejected: {e}")
+        return dump_json(tx.hash)
+
+
+
+
+def check_hash(value: Any) -> str:
+    if not isinstance(value, str) or len(value) != HASH_HEX_LENGTH:
+        raise RpcError(INVALID_PARAMS, f"Invalid hash: {value!r}")
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        raise RpcError(INVALID_PARAMS, f"Invalid hash: {value!r}")
+    return value.lower()
+
+
+def check_height(value: Any) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise RpcError(INVALID_PARAMS, f"Invalid height: {value!r}")
+    return value
+
+
+def get_transaction_result(tx: Transaction, height: Optional[int], block_hash: Optional[str]) -> Dict[str, Any]:
+    # A transaction in the mempool has no block height or hash.
+    return {'hash': tx.hash, 'block_height': height, 'block_hash': block_hash, 'transaction': tx.to_json()}
+
+
+
+
+class RpcClient:
+    """
+    A minimal JSON-RPC client over one keep-alive HTTP connection (for tests, benchmarks and scripts).
+
+    Raises RpcError for error responses.
+    """
+
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._next_id = 0
+
+
+    async def __aenter__(self) -> "RpcClient":
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+    async def post(self, body: bytes) -> Tuple[int, bytes]:
+        """
+        Sends a request body, and returns the response status and body.
+        """
+        self._writer.write(
+            f"POST / HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+        )
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("The server closed the connection.")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, await self._reader.readexactly(length)
+
+
+    def _make_call(self, method: str, params: Any) -> Dict[str, Any]:
+        self._next_id += 1
+        return {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': self._next_id}
+
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        _, body = await self.post(dump_json(self._make_call(method, kwargs or list(args))))
+        return get_result(json.loads(body))
+
+
+    async def batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Makes several calls in one request. Each call is (method, params). Returns the results in call order; for
+        calls that failed, the RpcError.
+        """
+        requests = [self._make_call(method, params) for method, params in calls]
+        _, body = await self.post(dump_json(requests))
+        responses = {response['id']: response for response in json.loads(body)}
+        results = []
+        for request in requests:
+            try:
+                results.append(get_result(responses[request['id']]))
+            except RpcError as e:
+                results.append(e)
+        return results
+
+
+
+
+def get_result(response: Dict[str, Any]) -> Any:
+    """
+    Raises:
+        RpcError: If the response is an error.
+    """
+    error = response.get('error')
+    if error is not None:
+        raise RpcError(error['code'], error['message'])
+    return response['result']
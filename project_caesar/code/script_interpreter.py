@@ -0,0 +1,186 @@
+# Components
+from functools import lru_cache
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+# Local imports
+from ..utils import hash
+
+
+# Local components
+from .gaius import MAX_DIRECT_PUSH_LENGTH, PUSH_DATA_1, PUSH_DATA_2, opcode_names, opcodes
+
+
+# Constants
+MAX_SCRIPT_SIZE = 10000
+MAX_STACK_SIZE = 1000
+COMPILE_CACHE_SIZE = 100000
+OP_0 = int(opcodes['OP_0'], 16)
+OP_VERIFY = int(opcodes['OP_VERIFY'], 16)
+OP_DUPLICATE = int(opcodes['OP_DUPLICATE'], 16)
+OP_EQUAL = int(opcodes['OP_EQUAL'], 16)
+OP_EQUAL_VERIFY = int(opcodes['OP_EQUAL_VERIFY'], 16)
+OP_HASH_160 = int(opcodes['OP_HASH_160'], 16)
+OP_CHECK_SIGNATURE = int(opcodes['OP_CHECK_SIGNATURE'], 16)
+# In a compiled script, every data push (including OP_0) becomes a single OP_PUSH operation.
+OP_PUSH = -1
+TRUE = b'\x01'
+FALSE = b''
+
+
+# Types
+# A signature checker is called with (signature, public_key) and returns whether the signature is valid for the
+# transaction input being verified.
+SignatureChecker = Callable[[bytes, bytes], bool]
+
+
+
+
+class ScriptError(ValueError):
+    pass
+
+
+
+
+class CompiledScript(NamedTuple):
+    """
+    A script compiled into a tuple of (opcode, operand) operations. The operand is the pushed data for OP_PUSH, and
+    None for every other opcode.
+    """
+    ops: Tuple[Tuple[int, Optional[bytes]], ...]
+    push_only: bool
+    # For a standard pay-to-public-key-hash lock script, the public key hash. Otherwise None.
+    public_key_hash: Optional[bytes]
+
+
+
+
+def compile_script(script: bytes) -> CompiledScript:
+    """
+    Compiles script bytes. See compile_lock_script for the cached version.
+
+    Raises:
+        ScriptError: If the script is too long, contains an unknown opcode, or a data push runs past its end.
+    """
+    if len(script) > MAX_SCRIPT_SIZE:
+        raise ScriptError(f"Script size {len(script)} exceeds the maximum of {MAX_SCRIPT_SIZE} bytes.")
+    ops = []
+    i = 0
+    n = len(script)
+    while i < n:
+        op = script[i]
+        i += 1
+        if op == OP_0:
+            ops.append((OP_PUSH, FALSE))
+            continue
+        if op <= MAX_DIRECT_PUSH_LENGTH:
+            length = op
+        elif op == PUSH_DATA_1 and i + 1 <= n:
+            length = script[i]
+            i += 1
+        elif op == PUSH_DATA_2 and i + 2 <= n:
+            length = int.from_bytes(script[i:i + 2], 'little')
+            i += 2
+        elif op in opcode_names and op not in (PUSH_DATA_1, PUSH_DATA_2):
+            ops.append((op, None))
+            continue
+        else:
+            raise ScriptError(f"Unknown or truncated opcode at offset {i - 1}: {op:02x}")
+        if i + length > n:
+            raise ScriptError(f"Script data item at offset {i} runs past the end of the script.")
+        ops.append((OP_PUSH, script[i:i + length]))
+        i += length
+    push_only = all(op == OP_PUSH for op, _ in ops)
+    public_key_hash = None
+    if (
+        len(ops) == 5
+        and ops[0][0] == OP_DUPLICATE
+        and ops[1][0] == OP_HASH_160
+        and ops[2][0] == OP_PUSH
+        and ops[3][0] == OP_EQUAL_VERIFY
+        and ops[4][0] == OP_CHECK_SIGNATURE
+    ):
+        public_key_hash = ops[2][1]
+    return CompiledScript(tuple(ops), push_only, public_key_hash)
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_lock_script(script: bytes) -> CompiledScript:
+    """
+    Compiles a lock script. Results are cached, so a lock script that is spent many times (e.g. an address that
+    receives many payments) is only parsed once. Unlock scripts carry unique signatures, so they are compiled with
+    compile_script, and do not evict lock scripts from the cache.
+    """
+    return compile_script(script)
+
+
+def hash_160(data: bytes) -> bytes:
+    if not data:
+        raise ScriptError("Cannot hash an empty stack item.")
+    return bytes.fromhex(hash.toy_hash(data.hex()))
+
+
+def is_true(item: bytes) -> bool:
+    return any(item)
+
+
+def execute(compiled: CompiledScript, stack: List[bytes], check_signature: SignatureChecker) -> None:
+    """
+    Runs a compiled script on a stack.
+
+    Raises:
+        ScriptError: If an operation fails (e.g. too few stack items, or a failed OP_EQUAL_VERIFY).
+    """
+    for op, data in compiled.ops:
+        if op == OP_PUSH:
+            stack.append(data)
+            if len(stack) > MAX_STACK_SIZE:
+                raise ScriptError(f"Stack size exceeds the maximum of {MAX_STACK_SIZE} items.")
+            continue
+        if not stack or (len(stack) < 2 and op in (OP_EQUAL, OP_EQUAL_VERIFY, OP_CHECK_SIGNATURE)):
+            raise ScriptError(f"Too few stack items for {opcode_names[op]}.")
+        if op == OP_DUPLICATE:
+            stack.append(stack[-1])
+            if len(stack) > MAX_STACK_SIZE:
+                raise ScriptError(f"Stack size exceeds the maximum of {MAX_STACK_SIZE} items.")
+        elif op == OP_HASH_160:
+            stack.append(hash_160(stack.pop()))
+        elif op == OP_EQUAL:
+            stack.append(TRUE if stack.pop() == stack.pop() else FALSE)
+        elif op == OP_EQUAL_VERIFY:
+            if stack.pop() != stack.pop():
+                raise ScriptError("OP_EQUAL_VERIFY failed.")
+        elif op == OP_VERIFY:
+            if not is_true(stack.pop()):
+                raise ScriptError("OP_VERIFY failed.")
+        elif op == OP_CHECK_SIGNATURE:
+            public_key = stack.pop()
+            signature = stack.pop()
+            stack.append(TRUE if check_signature(signature, public_key) else FALSE)
+        else:
+            raise ScriptError(f"Opcode {opcode_names[op]} cannot be executed.")
+
+
+def verify_script(unlock_script: bytes, lock_script: bytes, check_signature: SignatureChecker) -> bool:
+    """
+    Checks that an unlock script satisfies a lock script: the unlock script (which may only push data) is run, then
+    the lock script is run on the resulting stack, and the top stack item must be true.
+
+    A standard pay-to-public-key-hash lock script, unlocked with a signature and a public key, is checked directly
+    without running the scripts.
+    """
+    try:
+        unlock = compile_script(unlock_script)
+        lock = compile_lock_script(lock_script)
+        if not unlock.push_only:
+            return False
+        if lock.public_key_hash is not None and len(unlock.ops) == 2:
+            signature = unlock.ops[0][1]
+            public_key = unlock.ops[1][1]
+            return hash_160(public_key) == lock.public_key_hash and check_signature(signature, public_key)
+        stack = []
+        execute(unlock, stack, check_signature)
+        execute(lock, stack, check_signature)
+    except ScriptError:
+        return False
+    return bool(stack) and is_true(stack[-1])
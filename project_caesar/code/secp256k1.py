@@ -0,0 +1,270 @@
+# Imports
+import hashlib
+import hmac
+
+
+# Components
+from typing import List, Optional, Tuple
+
+
+# Constants
+# The secp256k1 curve: y^2 = x^3 + 7 over the field of integers modulo P, with generator G of order N.
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+B = 7
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+SECRET_KEY_SIZE = 32
+PUBLIC_KEY_SIZE = 33
+SIGNATURE_SIZE = 64
+# The fixed-base table for G has one row per WINDOW_BITS bits of a scalar, and 2^WINDOW_BITS points per row.
+WINDOW_BITS = 8
+
+
+# Types
+# Affine points are (x, y) and Jacobian points are (X, Y, Z), with x = X / Z^2 and y = Y / Z^3. None is the point at
+# infinity.
+Point = Optional[Tuple[int, int]]
+JacobianPoint = Tuple[int, int, int]
+
+
+
+
+# Point arithmetic, in Jacobian coordinates (so that no field inversion is needed until the end).
+
+
+def _double(p: JacobianPoint) -> JacobianPoint:
+    x, y, z = p
+    if y == 0:
+        return (0, 0, 0)
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    x3 = (m * m - 2 * s) % P
+    y3 = (m * (s - x3) - 8 * yy * yy) % P
+    z3 = 2 * y * z % P
+    return (x3, y3, z3)
+
+
+def _add_affine(p: JacobianPoint, q: Tuple[int, int]) -> JacobianPoint:
+    # Adds an affine point q to a Jacobian point p (a "mixed" addition, cheaper than a full one).
+    x1, y1, z1 = p
+    if z1 == 0:
+        return (q[0], q[1], 1)
+    zz = z1 * z1 % P
+    u2 = q[0] * zz % P
+    s2 = q[1] * zz * z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        if r == 0:
+            return _double(p)
+        return (0, 0, 0)
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    y3 = (r * (v - x3) - y1 * hhh) % P
+    z3 = z1 * h % P
+    return (x3, y3, z3)
+
+
+def _to_affine(p: JacobianPoint) -> Point:
+    x, y, z = p
+    if z == 0:
+        return None
+    z_inverse = pow(z, -1, P)
+    zz = z_inverse * z_inverse % P
+    return (x * zz % P, y * zz * z_inverse % P)
+
+
+def _batch_to_affine(points: List[JacobianPoint]) -> List[Point]:
+    # Converts many points with a single field inversion (Montgomery's trick).
+    products = []
+    acc = 1
+    for _, _, z in points:
+        products.append(acc)
+        acc = acc * z % P
+    acc_inverse = pow(acc, -1, P)
+    result = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        z_inverse = acc_inverse * products[i] % P
+        acc_inverse = acc_inverse * z % P
+        zz = z_inverse * z_inverse % P
+        result[i] = (x * zz % P, y * zz * z_inverse % P)
+    return result
+
+
+
+
+# Scalar multiplication.
+
+
+_generator_table: Optional[List[List[Point]]] = None
+
+
+def get_generator_table() -> List[List[Point]]:
+    """
+    The fixed-base table: row i holds j * 2^(WINDOW_BITS * i) * G for j in 0 .. 2^WINDOW_BITS - 1 (entry 0 is None).
+    It is built on first use.
+    """
+    global _generator_table
+    if _generator_table is None:
+        n_rows = (256 + WINDOW_BITS - 1) // WINDOW_BITS
+        n_columns = 1 << WINDOW_BITS
+        table = []
+        base = G
+        for _ in range(n_rows):
+            row = [(base[0], base[1], 1)]
+            for _ in range(n_columns - 2):
+                row.append(_add_affine(row[-1], base))
+            affine_row = _batch_to_affine(row)
+            table.append([None] + affine_row)
+            # The next row's base is 2^WINDOW_BITS times this one: one more than the last entry.
+            base = _to_affine(_add_affine(row[-1], base))
+        _generator_table = table
+    return _generator_table
+
+
+def multiply_generator(k: int) -> Point:
+    """
+    Computes k * G with the fixed-base table: one mixed addition per WINDOW_BITS bits of k, and no doublings.
+    """
+    table = get_generator_table()
+    mask = (1 << WINDOW_BITS) - 1
+    p = (0, 0, 0)
+    i = 0
+    k %= N
+    while k:
+        j = k & mask
+        if j:
+            p = _add_affine(p, table[i][j])
+        k >>= WINDOW_BITS
+        i += 1
+    return _to_affine(p)
+
+
+def multiply(k: int, point: Tuple[int, int]) -> Point:
+    """
+    Computes k * point for an arbitrary point, with a 4-bit window.
+    """
+    k %= N
+    # Precompute 1 .. 15 times the point.
+    multiples = [None, point]
+    jacobian = (point[0], point[1], 1)
+    for _ in range(14):
+        jacobian = _add_affine(jacobian, point)
+        multiples.append(jacobian)
+    multiples = [None, point] + _batch_to_affine(multiples[2:])
+    p = (0, 0, 0)
+    for shift in range((k.bit_length() + 3) // 4 * 4 - 4, -4, -4):
+        if p[2]:
+            p = _double(_double(_double(_double(p))))
+        j = (k >> shift) & 0xF
+        if j:
+            p = _add_affine(p, multiples[j])
+    return _to_affine(p)
+
+
+def add(p: Point, q: Point) -> Point:
+    if p is None:
+        return q
+    if q is None:
+        return p
+    return _to_affine(_add_affine((p[0], p[1], 1), q))
+
+
+
+
+# Keys and signatures.
+
+
+def get_public_key(secret_key: bytes) -> bytes:
+    """
+    Returns the compressed public key (33 bytes) for a 32-byte secret key.
+
+    Raises:
+        ValueError: If the secret key is not in the range 1 .. N - 1.
+    """
+    d = int.from_bytes(secret_key, 'big')
+    if len(secret_key) != SECRET_KEY_SIZE or not 1 <= d < N:
+        raise ValueError("Invalid secret key.")
+    return encode_point(multiply_generator(d))
+
+
+def encode_point(point: Tuple[int, int]) -> bytes:
+    x, y = point
+    return bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+
+
+def decode_point(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Decodes a compressed public key. Returns None if it is not a point on the curve.
+    """
+    if len(data) != PUBLIC_KEY_SIZE or data[0] not in (2, 3):
+        return None
+    x = int.from_bytes(data[1:], 'big')
+    if x >= P:
+        return None
+    y_squared = (pow(x, 3, P) + B) % P
+    y = pow(y_squared, (P + 1) // 4, P)
+    if y * y % P != y_squared:
+        return None
+    if (y & 1) != (data[0] & 1):
+        y = P - y
+    return (x, y)
+
+
+def get_nonce(secret_key: int, message_hash: bytes) -> int:
+    # Deterministic nonce generation (RFC 6979, with HMAC-SHA256), so signing needs no random number generator.
+    x = secret_key.to_bytes(32, 'big')
+    h = (int.from_bytes(message_hash, 'big') % N).to_bytes(32, 'big')
+    v = b'\x01' * 32
+    k = b'\x00' * 32
+    k = hmac.new(k, v + b'\x00' + x + h, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b'\x01' + x + h, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        nonce = int.from_bytes(v, 'big')
+        if 1 <= nonce < N:
+            return nonce
+        k = hmac.new(k, v + b'\x00', hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def sign(secret_key: bytes, message_hash: bytes) -> bytes:
+    """
+    Signs a 32-byte message hash. The signature is r and s (32 bytes each), with s in the lower half of the range,
+    so that each signature has a single valid encoding.
+    """
+    d = int.from_bytes(secret_key, 'big')
+    if len(secret_key) != SECRET_KEY_SIZE or not 1 <= d < N:
+        raise ValueError("Invalid secret key.")
+    z = int.from_bytes(message_hash, 'big') % N
+    k = get_nonce(d, message_hash)
+    r = multiply_generator(k)[0] % N
+    s = pow(k, -1, N) * (z + r * d) % N
+    if s > N // 2:
+        s = N - s
+    return r.to_bytes(32, 'big') + s.to_bytes(32, 'big')
+
+
+def verify(public_key: bytes, message_hash: bytes, signature: bytes) -> bool:
+    if len(signature) != SIGNATURE_SIZE:
+        return False
+    point = decode_point(public_key)
+    if point is None:
+        return False
+    r = int.from_bytes(signature[:32], 'big')
+    s = int.from_bytes(signature[32:], 'big')
+    if not (1 <= r < N and 1 <= s <= N // 2):
+        return False
+    z = int.from_bytes(message_hash, 'big') % N
+    s_inverse = pow(s, -1, N)
+    result = add(multiply_generator(z * s_inverse % N), multiply(r * s_inverse % N, point))
+    return result is not None and result[0] % N == r
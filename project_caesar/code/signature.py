@@ -0,0 +1,135 @@
+# Components
+from collections import OrderedDict
+from typing import Tuple
+
+
+# Local imports
+from . import secp256k1
+from ..utils import hash
+
+
+# Local components
+from .public_key import secret_key_to_public_key
+from .transaction import Transaction
+from ..utils.serialization import write_int
+
+
+# Constants
+TOY_KEY_SIZE = 4
+DEFAULT_SIGNATURE_CACHE_SIZE = 100000
+
+
+
+
+class SignatureCache:
+    """
+    A bounded set of (message hash, public key, signature) entries that have been verified as valid, so that a
+    signature checked when its transaction entered the mempool is not checked again when the transaction arrives in
+    a block. Invalid signatures are not cached. When the cache is full, the least recently used entry is removed.
+    """
+
+
+    def __init__(self, max_size: int = DEFAULT_SIGNATURE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[Tuple[bytes, bytes, bytes], None] = OrderedDict()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def __contains__(self, key: Tuple[bytes, bytes, bytes]) -> bool:
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            return True
+        return False
+
+
+    def add(self, key: Tuple[bytes, bytes, bytes]) -> None:
+        entries = self._entries
+        entries[key] = None
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+signature_cache = SignatureCache()
+
+
+
+
+def get_signature_hash(tx: Transaction, input_index: int) -> bytes:
+    """
+    The message signed by an input's signature: the SHA256 hash of the transaction with all unlock scripts removed,
+    followed by the input index.
+
+    Removing the unlock scripts means that the inputs of a transaction can be signed in any order.
+    """
+    def get_preimage() -> bytes:
+        inputs = [i.model_copy(update={'unlock_script': None}) for i in tx.inputs]
+        return tx.model_copy(update={'inputs': inputs}).to_bytes()
+    buffer = bytearray(tx.cached('signature_preimage', get_preimage))
+    write_int(buffer, input_index)
+    return hash.get_sha256_digest(bytes(buffer))
+
+
+def sign_toy(secret_key: str, message_hash: bytes) -> str:
+    # Toy signature function: XOR the secret key with the first 4 bytes of the message hash.
+    # It can be checked against the public key, but (like the toy keys) it offers no security.
+    secret_key_int = int(secret_key, 16)
+    h = int.from_bytes(message_hash[:TOY_KEY_SIZE], 'big')
+    return format(secret_key_int ^ h, '08x')
+
+
+def verify_toy(public_key: bytes, message_hash: bytes, signature: bytes) -> bool:
+    if len(public_key) != TOY_KEY_SIZE or len(signature) != TOY_KEY_SIZE:
+        return False
+    h = int.from_bytes(message_hash[:TOY_KEY_SIZE], 'big')
+    secret_key_int = int.from_bytes(signature, 'big') ^ h
+    expected = int(secret_key_to_public_key(format(secret_key_int, '08x')), 16)
+    return expected == int.from_bytes(public_key, 'big')
+
+
+def verify_signature(public_key: bytes, message_hash: bytes, signature: bytes, cache_only: bool = False) -> bool:
+    """
+    Checks a signature over a message hash against a public key. The key type is given by its length: 4-byte toy
+    keys, or 33-byte (compressed) secp256k1 ECDSA keys.
+
+    Valid signatures are kept in the signature cache. With cache_only, only the cache is checked: a False result
+    then means "not known to be valid".
+    """
+    key = (message_hash, public_key, signature)
+    if key in signature_cache:
+        return True
+    if cache_only:
+        return False
+    if len(public_key) == TOY_KEY_SIZE:
+        valid = verify_toy(public_key, message_hash, signature)
+    else:
+        valid = secp256k1.verify(public_key, message_hash, signature)
+    if valid:
+        signature_cache.add(key)
+    return valid
+
+
+def sign_input(tx: Transaction, input_index: int, secret_key: str) -> str:
+    """
+    Signs an input of a transaction, with a toy secret key (4 bytes) or a secp256k1 secret key (32 bytes).
+
+    Returns:
+        str: An unlock script (signature and public key) for a pay-to-public-key-hash output owned by the key.
+    """
+    message_hash = get_signature_hash(tx, input_index)
+    if len(secret_key) == TOY_KEY_SIZE * 2:
+        signature = sign_toy(secret_key, message_hash)
+        public_key = secret_key_to_public_key(secret_key).zfill(TOY_KEY_SIZE * 2)
+    else:
+        secret_key_bytes = bytes.fromhex(secret_key)
+        signature = secp256k1.sign(secret_key_bytes, message_hash).hex()
+        public_key = secp256k1.get_public_key(secret_key_bytes).hex()
+    return f'{signature} {public_key}'
@@ -1,5 +1,5 @@
 # Components
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import Field
 
 
@@ -9,16 +9,17 @@ from ..utils import hash, misc
 
 # Local components
 from .input import Input
-from .models.hex_string import HexString
+from .models.binary_serializable import BinarySerializable
 from .models.json_serializable import JsonSerializable
 from .output import Output
 from ..utils.hex_utils import compact_size, int_to_hex
 from ..utils.misc import stop
+from ..utils.serialization import read_int, write_int
 
 
 
 
-class Transaction(JsonSerializable):
+class Transaction(JsonSerializable, BinarySerializable):
     """
     Represents a transaction in a blockchain, containing inputs and outputs.
     """
@@ -43,7 +44,17 @@ class Transaction(JsonSerializable):
 
 
     @property
-    def hex_values(self) -> Dict[str, HexString]:
+    def is_coinbase(self) -> bool:
+        """
+        A coinbase transaction creates new coins: it has a single input, which does not spend a previous output.
+        """
+        if not self.inputs or len(self.inputs) != 1:
+            return False
+        return self.inputs[0].is_coinbase
+
+
+    @property
+    def hex_values(self) -> Dict[str, Any]:
         input_count_hex = int_to_hex(self.input_count)
         output_count_hex = int_to_hex(self.output_count)
         fee_hex = int_to_hex(self.fee)
@@ -61,19 +72,44 @@ class Transaction(JsonSerializable):
         }
 
 
-    @property
-    def hex(self) -> HexString:
-        v = self.hex_values
-        s = ''
-        for key in 'input_count output_count fee'.split():
-            s += v[key + '_length']
-            s += v[key]
-        s += ''.join([i.hex for i in self.inputs])
-        s += ''.join([o.hex for o in self.outputs])
-        return s
+    def serialize_into(self, buffer: bytearray) -> None:
+        write_int(buffer, self.input_count)
+        write_int(buffer, self.output_count)
+        write_int(buffer, self.fee)
+        for i in self.inputs:
+            i.serialize_into(buffer)
+        for o in self.outputs:
+            o.serialize_into(buffer)
 
 
-    @property
-    def hash(self) -> HexString:
-        return hash.get_sha256(self.hex)
+    @classmethod
+    def read_from(cls, data: bytes, offset: int, trusted: bool = False) -> Tuple["Transaction", int]:
+        input_count, offset = read_int(data, offset)
+        output_count, offset = read_int(data, offset)
+        fee, offset = read_int(data, offset)
+        inputs = []
+        for _ in range(input_count or 0):
+            i, offset = Input.read_from(data, offset, trusted)
+            inputs.append(i)
+        outputs = []
+        for _ in range(output_count or 0):
+            o, offset = Output.read_from(data, offset, trusted)
+            outputs.append(o)
+        instance = cls.from_values(
+            trusted,
+            input_count=input_count,
+            output_count=output_count,
+            fee=fee,
+            inputs=inputs,
+            outputs=outputs,
+        )
+        return instance, offset
+
+
+    def to_bytes(self) -> bytes:
+        return self.cached('bytes', super().to_bytes)
 
+
+    @property
+    def hash(self) -> str:
+        return self.cached('hash', lambda: hash.get_sha256(self.to_bytes()))
@@ -0,0 +1,323 @@
+# Imports
+import sqlite3
+
+
+# Components
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Local imports
+from ..utils import module_logger
+
+
+# Local components
+from .block import Block
+from .gaius import script_to_bytes
+from ..utils.serialization import read_bytes, read_compact_size, read_hex, read_int
+from ..utils.serialization import write_bytes, write_compact_size, write_hex, write_int
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+# Constants
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_COMMIT_EVERY = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS utxos (
+    block_height INTEGER NOT NULL,
+    transaction_hash BLOB NOT NULL,
+    output_index INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    lock_script BLOB NOT NULL,
+    PRIMARY KEY (block_height, transaction_hash, output_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS undo (
+    block_height INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+# Types
+# An outpoint identifies an output: (block_height, transaction_hash, output_index).
+Outpoint = Tuple[int, str, int]
+
+
+
+
+class Coin(NamedTuple):
+    """
+    An unspent output.
+    """
+    value: int
+    lock_script: bytes
+
+
+
+
+class BlockUndo(NamedTuple):
+    """
+    The data needed to disconnect a block from the UTXO set: the coins it spent and the outpoints it created.
+    """
+    spent: List[Tuple[Outpoint, Coin]]
+    created: List[Outpoint]
+
+
+    def to_bytes(self) -> bytes:
+        buffer = bytearray()
+        write_compact_size(buffer, len(self.spent))
+        for (block_height, transaction_hash, output_index), coin in self.spent:
+            write_int(buffer, block_height)
+            write_hex(buffer, transaction_hash)
+            write_int(buffer, output_index)
+            write_int(buffer, coin.value)
+            write_bytes(buffer, coin.lock_script)
+        write_compact_size(buffer, len(self.created))
+        for block_height, transaction_hash, output_index in self.created:
+            write_int(buffer, block_height)
+            write_hex(buffer, transaction_hash)
+            write_int(buffer, output_index)
+        return bytes(buffer)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BlockUndo":
+        spent = []
+        n, offset = read_compact_size(data, 0)
+        for _ in range(n):
+            block_height, offset = read_int(data, offset)
+            transaction_hash, offset = read_hex(data, offset)
+            output_index, offset = read_int(data, offset)
+            value, offset = read_int(data, offset)
+            lock_script, offset = read_bytes(data, offset)
+            spent.append(((block_height, transaction_hash, output_index), Coin(value, lock_script)))
+        created = []
+        n, offset = read_compact_size(data, offset)
+        for _ in range(n):
+            block_height, offset = read_int(data, offset)
+            transaction_hash, offset = read_hex(data, offset)
+            output_index, offset = read_int(data, offset)
+            created.append((block_height, transaction_hash, output_index))
+        return cls(spent, created)
+
+
+
+
+class UtxoSet:
+    """
+    The set of unspent transaction outputs, keyed on outpoint (block_height, transaction_hash, output_index).
+
+    Coins are stored in an SQLite database (use ':memory:' for a node without a data directory), in front of which
+    sits a write-back LRU cache. Changes from each block are kept in the cache and written to the database in one
+    transaction every commit_every blocks. For each block, undo data is stored, so that the block can be
+    disconnected again (e.g. during a reorganization).
+    """
+
+
+    def __init__(
+        self,
+        path: str = ':memory:',
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        commit_every: int = DEFAULT_COMMIT_EVERY,
+    ):
+        self.path = path
+        self.cache_size = cache_size
+        self.commit_every = commit_every
+        # Cache values: a Coin, or None for a coin that has been spent (or does not exist).
+        self._cache: OrderedDict[Outpoint, Optional[Coin]] = OrderedDict()
+        self._dirty: Dict[Outpoint, Optional[Coin]] = {}
+        self._pending_undo: Dict[int, Optional[bytes]] = {}
+        self._uncommitted_blocks = 0
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self.height = self._get_meta('height')
+        self.block_hash = self._get_meta('block_hash')
+
+
+    def __enter__(self) -> "UtxoSet":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+    def _get_meta(self, key: str):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+
+    def __contains__(self, outpoint: Outpoint) -> bool:
+        return self.get_coin(outpoint) is not None
+
+
+    def get_coin(self, outpoint: Outpoint) -> Optional[Coin]:
+        cache = self._cache
+        if outpoint in cache:
+            cache.move_to_end(outpoint)
+            return cache[outpoint]
+        block_height, transaction_hash, output_index = outpoint
+        if block_height is None or transaction_hash is None or output_index is None:
+            return None
+        row = self._db.execute(
+            'SELECT value, lock_script FROM utxos WHERE block_height = ? AND transaction_hash = ? AND output_index = ?',
+            (block_height, bytes.fromhex(transaction_hash), output_index),
+        ).fetchone()
+        coin = None if row is None else Coin(row[0], row[1])
+        self._cache_put(outpoint, coin)
+        return coin
+
+
+    def _cache_put(self, outpoint: Outpoint, coin: Optional[Coin]) -> None:
+        cache = self._cache
+        cache[outpoint] = coin
+        cache.move_to_end(outpoint)
+
+
+    def _set_coin(self, outpoint: Outpoint, coin: Optional[Coin]) -> None:
+        self._dirty[outpoint] = coin
+        self._cache_put(outpoint, coin)
+
+
+    def _evict(self) -> None:
+        # Evict the least recently used entries. Dirty entries must be written before they can be evicted, and this
+        # is only done between blocks, so that each block is written in one transaction.
+        cache = self._cache
+        if len(cache) <= self.cache_size:
+            return
+        if len(self._dirty) > self.cache_size // 2:
+            self.flush()
+        dirty = self._dirty
+        for outpoint in list(cache):
+            if len(cache) <= self.cache_size:
+                break
+            if outpoint not in dirty:
+                del cache[outpoint]
+
+
+    def apply_block(self, block: Block, height: int) -> BlockUndo:
+        """
+        Spends the outputs referenced by the block's inputs and adds the block's outputs.
+
+        Raises:
+            ValueError: If an input spends an output that does not exist or is already spent. The UTXO set is left
+                unchanged.
+        """
+        undo = BlockUndo([], [])
+        try:
+            for tx in block.transactions:
+                if not tx.is_coinbase:
+                    for i in tx.inputs:
+                        outpoint = i.outpoint
+                        coin = self.get_coin(outpoint)
+                        if coin is None:
+                            raise ValueError(f"Transaction {tx.hash} spends a missing or spent output: {outpoint}")
+                        self._set_coin(outpoint, None)
+                        undo.spent.append((outpoint, coin))
+                transaction_hash = tx.hash
+                for output_index, o in enumerate(tx.outputs):
+                    outpoint = (height, transaction_hash, output_index)
+                    self._set_coin(outpoint, Coin(o.value, script_to_bytes(o.lock_script)))
+                    undo.created.append(outpoint)
+        except Exception:
+            self._revert(undo)
+            raise
+        self._pending_undo[height] = undo.to_bytes()
+        self.height = height
+        self.block_hash = block.hash
+        self._block_done()
+        return undo
+
+
+    def _revert(self, undo: BlockUndo) -> None:
+        # The spent coins are restored first, because a block can spend an output that it created: that output is in
+        # both lists, and must end up removed.
+        for outpoint, coin in reversed(undo.spent):
+            self._set_coin(outpoint, coin)
+        for outpoint in reversed(undo.created):
+            self._set_coin(outpoint, None)
+
+
+    def get_undo(self, height: int) -> Optional[BlockUndo]:
+        if height in self._pending_undo:
+            data = self._pending_undo[height]
+        else:
+            row = self._db.execute('SELECT data FROM undo WHERE block_height = ?', (height,)).fetchone()
+            data = None if row is None else row[0]
+        return None if data is None else BlockUndo.from_bytes(data)
+
+
+    def undo_block(self, height: int, previous_block_hash: Optional[str]) -> BlockUndo:
+        """
+        Disconnects the block at height (which must be the tip), using its stored undo data.
+        """
+        if height != self.height:
+            raise ValueError(f"Can only disconnect the tip block (height {self.height}), not height {height}.")
+        undo = self.get_undo(height)
+        if undo is None:
+            raise ValueError(f"No undo data for the block at height {height}.")
+        self._revert(undo)
+        self._pending_undo[height] = None
+        self.height = height - 1 if height > 0 else None
+        self.block_hash = previous_block_hash
+        self._block_done()
+        return undo
+
+
+    def _block_done(self) -> None:
+        self._uncommitted_blocks += 1
+        if self._uncommitted_blocks >= self.commit_every:
+            self.flush()
+        self._evict()
+
+
+    def flush(self) -> None:
+        """
+        Writes all pending changes to the database in one transaction.
+        """
+        deletes = []
+        inserts = []
+        for (block_height, transaction_hash, output_index), coin in self._dirty.items():
+            key = (block_height, bytes.fromhex(transaction_hash), output_index)
+            if coin is None:
+                deletes.append(key)
+            else:
+                inserts.append(key + (coin.value, coin.lock_script))
+        undo_deletes = [(h,) for h, data in self._pending_undo.items() if data is None]
+        undo_inserts = [(h, data) for h, data in self._pending_undo.items() if data is not None]
+        with self._db:
+            self._db.executemany(
+                'DELETE FROM utxos WHERE block_height = ? AND transaction_hash = ? AND output_index = ?',
+                deletes,
+            )
+            self._db.executemany('INSERT OR REPLACE INTO utxos VALUES (?, ?, ?, ?, ?)', inserts)
+            self._db.executemany('DELETE FROM undo WHERE block_height = ?', undo_deletes)
+            self._db.executemany('INSERT OR REPLACE INTO undo VALUES (?, ?)', undo_inserts)
+            self._db.executemany(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                [('height', self.height), ('block_hash', self.block_hash)],
+            )
+        self._dirty.clear()
+        self._pending_undo.clear()
+        self._uncommitted_blocks = 0
+
+
+    def get_coins(self, outpoints: Iterable[Outpoint]) -> List[Optional[Coin]]:
+        return [self.get_coin(outpoint) for outpoint in outpoints]
+
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._db.execute('SELECT COUNT(*) FROM utxos').fetchone()[0]
+
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
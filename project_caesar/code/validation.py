@@ -0,0 +1,173 @@
+# Components
+from typing import Dict, List, Optional, Tuple
+
+
+# Local components
+from .block import Block
+from .block_header import BlockHeader
+from .gaius import script_to_bytes
+from .script_interpreter import verify_script
+from .signature import get_signature_hash, verify_signature
+from .transaction import Transaction
+from .utxo_set import Coin, Outpoint, UtxoSet
+
+
+# Constants
+MAX_BLOCK_SIZE = 4 * 1024 * 1024
+BLOCK_REWARD = 5000000000
+
+
+
+
+class BlockValidationError(ValueError):
+    """
+    Raised when a block is rejected. The stage is the validation stage that rejected it.
+    """
+
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(f"Block rejected at stage '{stage}': {message}")
+        self.stage = stage
+
+
+
+
+def check_block_stateless(block: Block, previous_header: Optional[BlockHeader]) -> None:
+    """
+    Cheap checks that need only the block and its parent's header: sizes, counts, Merkle root, proof of work and
+    linkage.
+
+    Raises:
+        ValueError: If a check fails.
+    """
+    transactions = block.transactions
+    if not transactions:
+        raise ValueError("Block has no transactions.")
+    if block.transaction_count != len(transactions):
+        raise ValueError(f"transaction_count is {block.transaction_count}, but the block has {len(transactions)}.")
+    size = len(block.to_bytes())
+    if size > MAX_BLOCK_SIZE:
+        raise ValueError(f"Block size {size} exceeds the maximum of {MAX_BLOCK_SIZE} bytes.")
+    for index, tx in enumerate(transactions):
+        check_transaction_stateless(tx)
+        if tx.is_coinbase != (index == 0):
+            raise ValueError("The first transaction (and only the first) must be a coinbase transaction.")
+    if block.header.merkle_root != block.merkle_root:
+        raise ValueError("The header's Merkle root does not match the transactions.")
+    if not block.meets_difficulty:
+        raise ValueError("The block hash does not meet the mining difficulty threshold.")
+    if previous_header is not None:
+        check_header_linkage(block.header, previous_header)
+
+
+def check_header_linkage(header: BlockHeader, previous_header: BlockHeader) -> None:
+    """
+    Checks that a header follows its parent: previous block hash and height, and the same difficulty.
+    """
+    if header.previous_block['block_hash'] != previous_header.hash:
+        raise ValueError("The previous block hash does not match the previous block.")
+    if header.previous_block['block_height'] != previous_header.height:
+        raise ValueError("The previous block height does not match the previous block.")
+    if header.mining_difficulty_threshold != previous_header.mining_difficulty_threshold:
+        raise ValueError("The mining difficulty threshold does not match the previous block.")
+
+
+def check_transaction_stateless(tx: Transaction) -> None:
+    if not tx.inputs or not tx.outputs:
+        raise ValueError(f"Transaction {tx.hash} has no inputs or no outputs.")
+    if tx.input_count != len(tx.inputs):
+        raise ValueError(f"Transaction {tx.hash}: input_count is {tx.input_count}, but it has {len(tx.inputs)}.")
+    if tx.output_count != len(tx.outputs):
+        raise ValueError(f"Transaction {tx.hash}: output_count is {tx.output_count}, but it has {len(tx.outputs)}.")
+    if tx.fee is None or tx.fee < 0:
+        raise ValueError(f"Transaction {tx.hash} has an invalid fee: {tx.fee}")
+    for o in tx.outputs:
+        if o.value is None or o.value < 0:
+            raise ValueError(f"Transaction {tx.hash} has an invalid output value: {o.value}")
+
+
+def check_block_inputs(block: Block, height: int, utxo_set: UtxoSet) -> List[Tuple[Transaction, List[Coin]]]:
+    """
+    Looks up the coins spent by the block's transactions, and checks values and fees.
+
+    An input may spend an output created earlier in the same block.
+
+    Returns:
+        List of (transaction, coins spent by each of its inputs), for the non-coinbase transactions.
+
+    Raises:
+        ValueError: If an input spends a missing or already spent output, or the values do not add up.
+    """
+    created: Dict[Outpoint, Coin] = {}
+    spent = set()
+    result = []
+    total_fees = 0
+    for tx in block.transactions:
+        if not tx.is_coinbase:
+            coins = []
+            for i in tx.inputs:
+                outpoint = i.outpoint
+                if outpoint in spent:
+                    raise ValueError(f"Transaction {tx.hash} double-spends the output {outpoint}.")
+                coin = created.get(outpoint) or utxo_set.get_coin(outpoint)
+                if coin is None:
+                    raise ValueError(f"Transaction {tx.hash} spends a missing or spent output: {outpoint}")
+                spent.add(outpoint)
+                coins.append(coin)
+            check_transaction_values(tx, coins)
+            total_fees += tx.fee
+            result.append((tx, coins))
+        transaction_hash = tx.hash
+        for output_index, o in enumerate(tx.outputs):
+            created[(height, transaction_hash, output_index)] = Coin(o.value, script_to_bytes(o.lock_script))
+    coinbase_value = sum(o.value for o in block.transactions[0].outputs)
+    if coinbase_value > BLOCK_REWARD + total_fees:
+        raise ValueError(f"The coinbase value {coinbase_value} exceeds the block reward plus fees.")
+    return result
+
+
+def check_transaction_values(tx: Transaction, coins: List[Coin]) -> None:
+    """
+    Checks that the value of the coins spent by a transaction, minus the value of its outputs, equals its fee.
+    """
+    input_value = sum(coin.value for coin in coins)
+    output_value = sum(o.value for o in tx.outputs)
+    if input_value - output_value != tx.fee:
+        raise ValueError(
+            f"Transaction {tx.hash}: inputs ({input_value}) minus outputs ({output_value}) "
+            f"do not equal the fee ({tx.fee})."
+        )
+
+
+def verify_input_script(tx: Transaction, input_index: int, lock_script: bytes, cache_only: bool = False) -> bool:
+    """
+    Checks that an input's unlock script satisfies the lock script of the output it spends.
+
+    With cache_only, signatures are only looked up in the signature cache: a False result then means "not known to
+    be valid".
+    """
+    try:
+        unlock_script = script_to_bytes(tx.inputs[input_index].unlock_script)
+    except ValueError:
+        return False
+
+    def check_signature(signature: bytes, public_key: bytes) -> bool:
+        return verify_signature(public_key, get_signature_hash(tx, input_index), signature, cache_only)
+
+    return verify_script(unlock_script, lock_script, check_signature)
+
+
+def verify_transaction_scripts(tx_bytes: bytes, lock_scripts: List[bytes]) -> Optional[str]:
+    """
+    Verifies the scripts of all of a transaction's inputs. The transaction is passed as bytes, so that this can run
+    in a worker process. The bytes come from a transaction that was already parsed (and validated), so they are
+    trusted.
+
+    Returns:
+        An error message, or None if all of the scripts are valid.
+    """
+    tx = Transaction.from_bytes(tx_bytes, trusted=True)
+    for input_index, lock_script in enumerate(lock_scripts):
+        if not verify_input_script(tx, input_index, lock_script):
+            return f"Transaction {tx.hash}: the script for input {input_index} is not valid."
+    return None
@@ -14,6 +14,9 @@ DEFAULT_DEBUG = False
 DEFAULT_LOG_TIMESTAMP = False
 DEFAULT_LOG_TO_FILE = False
 DEFAULT_LOG_FILE = 'log.txt'
+DEFAULT_LOG_QUEUE = False
+DEFAULT_LOG_FLUSH_INTERVAL = 1.0
+DEFAULT_HASH_BACKEND = 'hashlib'
 
 
 class Config(BaseModel):
@@ -24,6 +27,9 @@ class Config(BaseModel):
     log_timestamp: bool
     log_to_file: bool
     log_file: str
+    log_queue: bool = DEFAULT_LOG_QUEUE
+    log_flush_interval: float = DEFAULT_LOG_FLUSH_INTERVAL
+    hash_backend: constants.HashBackendNameLiteral = DEFAULT_HASH_BACKEND
 
     @classmethod
     def from_args(cls, args: Any) -> 'Config':
@@ -42,6 +48,9 @@ class Config(BaseModel):
             log_timestamp=args.log_timestamp,
             log_to_file=args.log_to_file,
             log_file=args.log_file,
+            log_queue=args.log_queue,
+            log_flush_interval=args.log_flush_interval,
+            hash_backend=args.hash_backend,
         )
 
 
@@ -54,4 +63,7 @@ config: Final[Config] = Config(
     log_timestamp=DEFAULT_LOG_TIMESTAMP,
     log_to_file=DEFAULT_LOG_TO_FILE,
     log_file=DEFAULT_LOG_FILE,
+    log_queue=DEFAULT_LOG_QUEUE,
+    log_flush_interval=DEFAULT_LOG_FLUSH_INTERVAL,
+    hash_backend=DEFAULT_HASH_BACKEND,
 ) 
\ No newline at end of file
@@ -7,6 +7,7 @@ from typing import get_args, Literal
 
 # Types
 LogLevelNameLiteral = Literal['debug', 'info', 'warning', 'error', 'critical']
+HashBackendNameLiteral = Literal['hashlib', 'reference']
 
 
 # Constants
@@ -17,5 +18,6 @@ SCRIPT_DIR_NAME = 'scripts'
 
 # Derived
 LOG_LEVEL_NAMES = list(get_args(LogLevelNameLiteral))
+HASH_BACKEND_NAMES = list(get_args(HashBackendNameLiteral))
 TOP_LEVEL_DIR_NAMES = [TOP_LEVEL_PACKAGE_DIR_NAME, SCRIPT_DIR_NAME]
 
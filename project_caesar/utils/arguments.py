@@ -49,5 +49,27 @@ def get_common_parser():
         default=config.log_file,
     )
 
+    parser.add_argument(
+        '--log-queue',
+        action='store_true',
+        help="Write log output from a background thread, so that logging does not block the caller.",
+    )
+
+    parser.add_argument(
+        '--log-flush-interval',
+        type=float,
+        default=config.log_flush_interval,
+        help="With --log-queue, the maximum number of seconds that file output is buffered.",
+    )
+
+    parser.add_argument(
+        '--hash-backend',
+        dest='hash_backend',
+        type=str,
+        default=config.hash_backend,
+        choices=constants.HASH_BACKEND_NAMES,
+        help="Set the SHA256 implementation: 'hashlib' (C, fast) or 'reference' (pure Python, for auditing).",
+    )
+
     return parser
 
@@ -1,6 +1,70 @@
+# Imports
+import hashlib
+
+
+# Components
+from typing import Callable, Dict, List
+
+
+# Local imports
+from project_caesar.configuration import config
+
+
 # Local components
-from ..code.models.hex_string import HexString
-from ..submodules import sha256_python3 as sha256
+from ..code.models.hex_string import HexString, hex_to_bytes
+
+
+# The pure-Python reference implementation is a git submodule, which may not be checked out.
+try:
+    from ..submodules import sha256_python3 as sha256
+except ImportError:
+    sha256 = None
+
+
+
+
+# Hash backends
+# A backend is a function that returns the raw SHA256 digest of a byte string.
+HASH_BACKENDS: Dict[str, Callable[[bytes], bytes]] = {}
+
+
+def register_hash_backend(name: str):
+    def decorator(func: Callable[[bytes], bytes]) -> Callable[[bytes], bytes]:
+        HASH_BACKENDS[name] = func
+        return func
+    return decorator
+
+
+@register_hash_backend('hashlib')
+def sha256_hashlib(x: bytes) -> bytes:
+    # OpenSSL (C) implementation.
+    return hashlib.sha256(x).digest()
+
+
+if sha256 is not None:
+    @register_hash_backend('reference')
+    def sha256_reference(x: bytes) -> bytes:
+        # Pure-Python implementation, kept for auditing.
+        return bytes.fromhex(sha256.hexdigest(x))
+
+
+_backend_name = None
+_digest = None
+
+
+def set_hash_backend(name: str) -> None:
+    global _backend_name, _digest
+    if name not in HASH_BACKENDS:
+        raise ValueError(f"Hash backend '{name}' is not available. Available backends: {sorted(HASH_BACKENDS)}")
+    _backend_name = name
+    _digest = HASH_BACKENDS[name]
+
+
+def get_hash_backend() -> str:
+    return _backend_name
+
+
+set_hash_backend(config.hash_backend)
 
 
 
@@ -18,9 +82,59 @@ def toy_hash(data_hex):
 
 
 
-def get_sha256(x: HexString) -> HexString:
-  if not HexString.is_valid_hex(x):
-        raise ValueError(f"Invalid hex string: {x}")
-  x_bytes = bytes.fromhex(x)
-  return sha256.hexdigest(x_bytes)
+def get_sha256(x: HexString | bytes | str) -> str:
+    # Serialized models are hashed directly as bytes; hex input is converted first.
+    # A HexString is already bytes.
+    x_bytes = x if isinstance(x, (bytes, bytearray)) else hex_to_bytes(x)
+    return _digest(x_bytes).hex()
+
+
+
+def get_sha256_digest(x: bytes) -> bytes:
+    return _digest(x)
+
+
+
+def get_sha256_batch(items: List[bytes]) -> List[bytes]:
+    # Hash many byte strings in one call, returning raw digests.
+    # Used for hashing whole levels of a Merkle tree at once.
+    digest = _digest
+    return [digest(x) for x in items]
+
+
+
+def get_double_sha256_batch(items: List[bytes]) -> List[bytes]:
+    # SHA256(SHA256(x)) for many byte strings, returning raw digests.
+    digest = _digest
+    return [digest(digest(x)) for x in items]
+
+
+
+def run_self_test() -> Dict[str, Dict[str, str]]:
+    """
+    Checks that every available backend produces identical digests on the genesis block.
+
+    Returns:
+        Dict[str, Dict[str, str]]: For each backend, the digests that were compared.
 
+    Raises:
+        ValueError: If any backend disagrees with the others.
+    """
+    # Imported here to avoid a circular import (the models use this module).
+    from ..code.genesis import get_genesis_block
+    block_0 = get_genesis_block()
+    tx_bytes = block_0.transactions[0].to_bytes()
+    block_bytes = block_0.to_bytes()
+    results = {}
+    for name, digest in HASH_BACKENDS.items():
+        results[name] = {
+            'empty': digest(b'').hex(),
+            'transaction': digest(tx_bytes).hex(),
+            'block': digest(block_bytes).hex(),
+            'block_double': digest(digest(block_bytes)).hex(),
+        }
+    expected = next(iter(results.values()))
+    for name, digests in results.items():
+        if digests != expected:
+            raise ValueError(f"Hash backend '{name}' produced different digests: {digests} != {expected}")
+    return results
@@ -4,15 +4,22 @@ import sys
 
 
 # Components
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 def iso_timestamp_to_int(iso_timestamp):
-    dt_object = datetime.strptime(iso_timestamp, "%Y-%m-%dT%H:%M:%SZ")
+    # Timestamps are in UTC (the Z suffix), whatever the local time zone.
+    dt_object = datetime.strptime(iso_timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
     int_timestamp = int(dt_object.timestamp())
     return int_timestamp
 
 
+def int_to_iso_timestamp(int_timestamp):
+    # Inverse of iso_timestamp_to_int.
+    dt_object = datetime.fromtimestamp(int_timestamp, timezone.utc)
+    return dt_object.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 def json_to_text(json_data):
     return json.dumps(json_data, indent=4)
 
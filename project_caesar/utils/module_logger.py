@@ -3,12 +3,16 @@
 
 # Imports
 import argparse
+import atexit
 import os
 import logging
+import logging.handlers
+import queue
+import time
 
 
 # Components
-from typing import Callable, Optional, Self, Tuple
+from typing import Callable, List, Optional, Self, Tuple
 from pathlib import Path
 from pydantic import BaseModel, ConfigDict, Field, field_validator, validate_call
 
@@ -35,6 +39,10 @@ MAP_LEVEL_NAME_TO_LEVEL = logging.getLevelNamesMapping()
 # {'CRITICAL': 50, 'FATAL': 50, 'ERROR': 40, 'WARN': 30, 'WARNING': 30, 'INFO': 20, 'DEBUG': 10, 'NOTSET': 0}
 MAP_LEVEL_NAME_TO_LEVEL = {k.lower(): v for k, v in MAP_LEVEL_NAME_TO_LEVEL.items()}
 MAP_LEVEL_TO_LEVEL_NAME = {v: k for k, v in MAP_LEVEL_NAME_TO_LEVEL.items()}
+# Handlers installed by configure_logger carry this attribute, so that configuring a logger again replaces them,
+# rather than adding more (which would duplicate the output).
+HANDLER_MARKER = '_module_logger_handler'
+LOG_FILE_BUFFER_SIZE = 64 * 1024
 
 
 
@@ -59,6 +67,14 @@ class LoggerConfig(BaseModel):
         description="Whether to save log output to a file.",
     )
     log_file: Optional[Path] = Field(config_default.log_file, description="Path to the log file.")
+    log_queue: Optional[bool] = Field(
+        config_default.log_queue,
+        description="Write log output from a shared background thread.",
+    )
+    log_flush_interval: Optional[float] = Field(
+        config_default.log_flush_interval,
+        description="In queue mode, the maximum number of seconds that file output is buffered.",
+    )
 
 
     @field_validator("log_file")
@@ -87,6 +103,8 @@ class LoggerConfig(BaseModel):
             log_timestamp=config.log_timestamp,
             log_to_file=config.log_to_file,
             log_file=config.log_file,
+            log_queue=config.log_queue,
+            log_flush_interval=config.log_flush_interval,
         )
 
 
@@ -229,8 +247,165 @@ def create_logger(
     return logger, log, deb
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """
+    A file handler that does not flush after each record: output is written through a large buffer, and flushed
+    when flush_interval seconds have passed since the last flush (or for records of level ERROR and above).
+
+    In queue mode, the queue listener also flushes its handlers whenever the queue has been empty for
+    flush_interval seconds, so that buffered output is not held back indefinitely when logging stops.
+    """
+
+
+    def __init__(self, filename, flush_interval: float, buffer_size: int = LOG_FILE_BUFFER_SIZE):
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._last_flush = time.monotonic()
+        super().__init__(filename, mode="a", delay=True)
+
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+            return
+        if record.levelno >= logging.ERROR or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+
+    def flush(self) -> None:
+        super().flush()
+        self._last_flush = time.monotonic()
+
+
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    A queue listener that flushes its handlers whenever the queue has been empty for flush_interval seconds.
+    """
+
+
+    def __init__(self, log_queue, *handlers, flush_interval: float):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+
+
+class LightQueueHandler(logging.handlers.QueueHandler):
+    """
+    A queue handler that prepares records with as little work as possible on the caller's thread.
+
+    The standard QueueHandler copies each record and formats it. Here, the record is not copied: the loggers that
+    use this handler have no other handlers that could see the change. Only the message arguments are merged into
+    the message (they could change before the listener formats the record), and any exception is formatted to text
+    (its traceback holds references to the caller's frames). The listener's handlers do the formatting.
+    """
+
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+
+
+# Queue mode: every logger that is configured with log_queue gets the same QueueHandler, which only puts each record
+# on a queue. One background thread (the listener) takes the records off the queue and writes them with the real
+# handlers (console, and file), so that log I/O does not run on the caller's thread.
+_log_queue = queue.SimpleQueue()
+_queue_handler = LightQueueHandler(_log_queue)
+setattr(_queue_handler, HANDLER_MARKER, True)
+_queue_listener: Optional[FlushingQueueListener] = None
+# The settings that the listener's handlers were created with.
+_queue_listener_settings = None
+
+
+def start_queue_listener(handlers, flush_interval: float, settings=None) -> None:
+    """
+    Starts the queue listener with the given handlers, replacing (and stopping) the current listener. Records that
+    are queued in the meantime are written by the new listener.
+    """
+    global _queue_listener, _queue_listener_settings
+    stop_queue_listener()
+    _queue_listener = FlushingQueueListener(_log_queue, *handlers, flush_interval=flush_interval)
+    _queue_listener_settings = settings
+    _queue_listener.start()
+
+
+def stop_queue_listener() -> None:
+    """
+    Writes the queued records, then stops the listener thread and closes its handlers (which flushes them).
+    """
+    global _queue_listener, _queue_listener_settings
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    for handler in _queue_listener.handlers:
+        handler.close()
+    _queue_listener = None
+    _queue_listener_settings = None
+
+
+# Registered after the logging module's own exit handler, so it runs first: the queue is drained before shutdown.
+atexit.register(stop_queue_listener)
+
+
+def remove_installed_handlers(logger: logging.Logger) -> None:
+    """Removes the handlers that configure_logger installed on a logger (e.g. before configuring it again)."""
+    for handler in list(logger.handlers):
+        if getattr(handler, HANDLER_MARKER, False):
+            logger.removeHandler(handler)
+            if handler is not _queue_handler:
+                handler.close()
+
+
 def configure_logger(logger: CustomLogger, logger_config: LoggerConfig):
-    """Configure a logger using a LoggerConfig."""
+    """
+    Configure a logger using a LoggerConfig.
+
+    Configuring a logger again replaces the handlers that were installed the previous time.
+
+    With log_queue, the logger only queues its records, and the shared listener thread writes them. The listener's
+    handlers are shared by all loggers in queue mode, so the most recent configuration sets their format and
+    outputs; each logger keeps its own level.
+    """
 
     # Determine the logger name.
     if logger_config.logger_name:
@@ -248,10 +423,38 @@ def configure_logger(logger: CustomLogger, logger_config: LoggerConfig):
     logger.propagate = False
 
     # Log format
-    log_format = f"[{logger.name}: %(lineno)s (%(funcName)s)] %(message)s"
+    log_format = "[%(name)s: %(lineno)s (%(funcName)s)] %(message)s"
     if logger_config.log_timestamp:
         log_format = "%(asctime)s " + log_format
     log_format = f"%(levelname)-8s {log_format}"
+
+    log_to_file = bool(logger_config.log_to_file and logger_config.log_file)
+    remove_installed_handlers(logger)
+    if logger_config.log_queue:
+        flush_interval = logger_config.log_flush_interval or config_default.log_flush_interval
+        settings = (log_format, log_to_file, logger_config.log_file, flush_interval)
+        # The listener's handlers are only replaced if the settings changed.
+        if _queue_listener is None or _queue_listener_settings != settings:
+            handlers = create_handlers(log_format, logging.NOTSET, logger_config, flush_interval)
+            start_queue_listener(handlers, flush_interval, settings)
+        logger.addHandler(_queue_handler)
+        return
+
+    for handler in create_handlers(log_format, level_value, logger_config):
+        setattr(handler, HANDLER_MARKER, True)
+        logger.addHandler(handler)
+
+
+def create_handlers(
+    log_format: str,
+    level_value: int,
+    logger_config: LoggerConfig,
+    flush_interval: Optional[float] = None,
+) -> List[logging.Handler]:
+    """
+    Creates the console handler, and a file handler if a log file is specified. With a flush interval, the file
+    handler buffers its output (see BufferedFileHandler).
+    """
     log_formatter = logging.Formatter(fmt=log_format, datefmt="%Y-%m-%d %H:%M:%S")
 
     # Add colored formatter if available
@@ -288,17 +491,19 @@ def configure_logger(logger: CustomLogger, logger_config: LoggerConfig):
             },
         )
 
+    handlers = []
+
     # Configure console handler
     if not colorlog_imported:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(level_value)
         console_handler.setFormatter(log_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     else:
         console_handler2 = colorlog.StreamHandler()
         console_handler2.setLevel(level_value)
         console_handler2.setFormatter(log_formatter2)
-        logger.addHandler(console_handler2)
+        handlers.append(console_handler2)
 
     # Configure file handler if a log file is specified
     if logger_config.log_to_file and logger_config.log_file:
@@ -307,8 +512,12 @@ def configure_logger(logger: CustomLogger, logger_config: LoggerConfig):
         # Ensure it exists if not empty.
         if parent_dir:
             os.makedirs(parent_dir, exist_ok=True)
-        file_handler = logging.FileHandler(logger_config.log_file, mode="a", delay=True)
+        if flush_interval is None:
+            file_handler = logging.FileHandler(logger_config.log_file, mode="a", delay=True)
+        else:
+            file_handler = BufferedFileHandler(logger_config.log_file, flush_interval)
         file_handler.setLevel(level_value)
         file_handler.setFormatter(log_formatter if not colorlog_imported else log_formatter2)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
+    return handlers
@@ -0,0 +1,130 @@
+# Components
+from typing import Optional, Tuple
+
+
+
+
+ENDIANNESS = 'little'
+
+
+def write_compact_size(buffer: bytearray, n: int) -> None:
+    """
+    Appends the Compact Size encoding of n to the buffer.
+
+    This is the bytes equivalent of hex_utils.compact_size.
+    """
+    if n < 0xFD:
+        buffer.append(n)  # 1 byte for lengths < 253
+    elif n <= 0xFFFF:
+        buffer.append(0xFD)  # 0xFD + 2 bytes for lengths <= 65,535
+        buffer += n.to_bytes(2, ENDIANNESS)
+    elif n <= 0xFFFFFFFF:
+        buffer.append(0xFE)  # 0xFE + 4 bytes for lengths <= 4,294,967,295
+        buffer += n.to_bytes(4, ENDIANNESS)
+    else:
+        buffer.append(0xFF)  # 0xFF + 8 bytes for larger lengths
+        buffer += n.to_bytes(8, ENDIANNESS)
+
+
+def read_compact_size(data: bytes, offset: int) -> Tuple[int, int]:
+    """
+    Reads a Compact Size value from data at offset.
+
+    Returns:
+        Tuple[int, int]: The value and the offset of the first byte after it.
+    """
+    try:
+        first = data[offset]
+    except IndexError:
+        raise ValueError(f"Unexpected end of data at offset {offset}.")
+    if first < 0xFD:
+        return first, offset + 1
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}[first]
+    start = offset + 1
+    end = start + size
+    if end > len(data):
+        raise ValueError(f"Unexpected end of data at offset {start}.")
+    return int.from_bytes(data[start:end], ENDIANNESS), end
+
+
+def int_to_bytes(n: Optional[int]) -> bytes:
+    """
+    Returns the minimal big-endian bytes of n. This matches hex_utils.int_to_hex.
+    """
+    if n is None:
+        return b''
+    if n < 0:
+        raise ValueError(f"Cannot serialize negative integer: {n}")
+    return n.to_bytes(max(1, (n.bit_length() + 7) // 8), 'big')
+
+
+def write_int(buffer: bytearray, n: Optional[int]) -> None:
+    """
+    Appends a length-prefixed integer to the buffer. None is written as a zero-length field.
+    """
+    if n is None:
+        buffer.append(0)
+        return
+    if n < 0:
+        raise ValueError(f"Cannot serialize negative integer: {n}")
+    if n <= 0xFF:
+        # Fast path: the common case of a single-byte value.
+        buffer.append(1)
+        buffer.append(n)
+        return
+    value = int_to_bytes(n)
+    write_compact_size(buffer, len(value))
+    buffer += value
+
+
+def read_int(data: bytes, offset: int) -> Tuple[Optional[int], int]:
+    """
+    Reads a length-prefixed integer. A zero-length field is read as None.
+    """
+    value, offset = read_bytes(data, offset)
+    if not value:
+        return None, offset
+    return int.from_bytes(value, 'big'), offset
+
+
+def write_bytes(buffer: bytearray, value: bytes) -> None:
+    """
+    Appends a length-prefixed byte string to the buffer.
+    """
+    write_compact_size(buffer, len(value))
+    buffer += value
+
+
+def read_bytes(data: bytes, offset: int) -> Tuple[bytes, int]:
+    """
+    Reads a length-prefixed byte string.
+    """
+    length, offset = read_compact_size(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise ValueError(f"Unexpected end of data at offset {offset}: expected {length} bytes.")
+    return bytes(data[offset:end]), end
+
+
+def write_hex(buffer: bytearray, hex_value: Optional[str]) -> None:
+    """
+    Appends a length-prefixed hex value (e.g. a hash) to the buffer. None is written as a zero-length field.
+    """
+    if hex_value is None:
+        buffer.append(0)
+        return
+    try:
+        value = bytes.fromhex(hex_value)
+    except ValueError:
+        raise ValueError(f"Invalid hex string: {hex_value}")
+    write_bytes(buffer, value)
+
+
+def read_hex(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    """
+    Reads a length-prefixed hex value. A zero-length field is read as None.
+    """
+    value, offset = read_bytes(data, offset)
+    if not value:
+        return None, offset
+    return value.hex(), offset
@@ -0,0 +1,171 @@
+# Imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.block import Block
+from project_caesar.code.gaius import script_to_hex
+from project_caesar.code.genesis import get_genesis_block, get_genesis_block_json
+from project_caesar.code.input import Input
+from project_caesar.code.output import Output
+from project_caesar.code.transaction import Transaction
+from project_caesar.utils import arguments, hash, module_logger, serialization
+from project_caesar.utils.hex_utils import compact_size, int_to_hex
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark serialization, hashing and model construction. Results can be saved as JSON, so that "
+                "they can be compared between releases.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--sizes',
+    type=str,
+    default='1,100,10000',
+    help="Comma-separated numbers of transactions in the synthetic blocks.",
+)
+parser.add_argument(
+    '--repeat',
+    type=int,
+    default=5,
+    help="The number of times to run each benchmark. The best and mean times are reported.",
+)
+parser.add_argument(
+    '--output',
+    type=str,
+    default=None,
+    help="Write the results to this file as JSON.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+LOCK_SCRIPT = 'OP_DUPLICATE OP_HASH_160 f575f780 OP_EQUAL_VERIFY OP_CHECK_SIGNATURE'
+
+
+def get_synthetic_block(n_transactions):
+    # A block with a coinbase and n_transactions - 1 distinct transactions (1 input, 2 outputs each).
+    block = get_genesis_block()
+    transactions = block.transactions[:1]
+    for k in range(1, n_transactions):
+        transactions.append(Transaction(
+            input_count=1,
+            output_count=2,
+            fee=1000,
+            inputs=[Input(
+                previous_output={'block_height': k, 'transaction_hash': f'{k:064x}', 'output_index': 0},
+                unlock_script='aabbccdd 1eaebef0',
+            )],
+            outputs=[Output(value=1000 + k, lock_script=LOCK_SCRIPT), Output(value=k, lock_script=LOCK_SCRIPT)],
+        ))
+    block.transactions = transactions
+    block.transaction_count = n_transactions
+    return block
+
+
+def invalidate_block(block):
+    block.invalidate_cache()
+    for tx in block.transactions:
+        tx.invalidate_cache()
+
+
+def bench(results, name, func, number=1, setup=None, size=None):
+    """
+    Runs func number times per repetition, and records the best and mean time per call.
+    setup (if given) runs before each repetition, outside of the timing.
+    """
+    times = []
+    for _ in range(a.repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    result = {
+        'name': name,
+        'size': size,
+        'number': number,
+        'repeat': a.repeat,
+        'best_s': min(times),
+        'mean_s': sum(times) / len(times),
+    }
+    results.append(result)
+    label = name if size is None else f"{name} [{size}]"
+    print(f"{label:<40} best {result['best_s'] * 1e6:>12.2f} us   mean {result['mean_s'] * 1e6:>12.2f} us")
+
+
+def get_git_commit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    sizes = [int(size) for size in a.sizes.split(',')]
+    results = []
+
+    log("Primitives.")
+    data_hex = 'ab' * 300
+    data = bytes.fromhex(data_hex)
+    bench(results, 'compact_size', lambda: compact_size(data_hex), number=100000)
+    bench(results, 'int_to_hex', lambda: int_to_hex(5000000000), number=100000)
+    bench(results, 'write_compact_size', lambda: serialization.write_compact_size(bytearray(), 300), number=100000)
+    bench(results, 'script_to_hex', lambda: script_to_hex(LOCK_SCRIPT), number=100000)
+    bench(results, 'get_sha256 (bytes)', lambda: hash.get_sha256(data), number=100000, size=len(data))
+    bench(results, 'get_sha256 (hex)', lambda: hash.get_sha256(data_hex), number=100000, size=len(data))
+
+    log("Models.")
+    block_0_json = get_genesis_block_json()
+    tx = get_synthetic_block(2).transactions[1]
+    bench(results, 'genesis construction', get_genesis_block, number=1000)
+    bench(results, 'Block.from_json (genesis)', lambda: Block.from_json(block_0_json), number=1000)
+    # The cache is cleared inside the timed call: setup only runs once per repetition.
+    bench(results, 'Transaction.hex (cold)', lambda: (tx.invalidate_cache(), tx.hex), number=10000)
+
+    for size in sizes:
+        log(f"Synthetic block with {size} transactions.")
+        block = get_synthetic_block(size)
+        block_json = block.to_json()
+        block_bytes = block.to_bytes()
+        bench(results, 'Block.to_bytes (cold)', block.to_bytes, setup=lambda: invalidate_block(block), size=size)
+        bench(results, 'Block.hash (cold)', lambda: block.hash, setup=lambda: invalidate_block(block), size=size)
+        bench(results, 'Block.hash (cached)', lambda: block.hash, number=1000, size=size)
+        bench(results, 'Block.from_json', lambda: Block.from_json(block_json), size=size)
+        bench(results, 'Block.from_bytes', lambda: Block.from_bytes(block_bytes), size=size)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'git_commit': get_git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'hash_backend': hash.get_hash_backend(),
+        'results': results,
+    }
+    if a.output is not None:
+        with open(a.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        log(f"Wrote results to {a.output}.")
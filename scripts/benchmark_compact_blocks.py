@@ -0,0 +1,97 @@
+# Imports
+import argparse
+import asyncio
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.p2p import LocalNetwork
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Compare the bandwidth and latency of relaying a new block as a compact block and as a full block.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--nodes',
+    type=int,
+    default=5,
+    help="The number of nodes, connected in a line.",
+)
+parser.add_argument(
+    '--transactions',
+    type=int,
+    default=2000,
+    help="The number of transactions in the block (all of them are in every node's mempool).",
+)
+parser.add_argument(
+    '--missing',
+    type=int,
+    default=10,
+    help="The number of the block's transactions that only the first node has.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+async def relay_block(blocks, transactions, n_missing, n_nodes, compact_blocks, lock_script):
+    async with LocalNetwork(n_nodes, 'line', compact_blocks=compact_blocks) as network:
+        first, last = network.nodes[0], network.nodes[-1]
+        for p2p_node in network.nodes:
+            for block in blocks:
+                p2p_node.node.process_block(block)
+        relayed = transactions[:len(transactions) - n_missing]
+        for tx in relayed:
+            first.submit_transaction(tx)
+        await network.wait_until(
+            lambda: all(len(n.node.mempool) == len(relayed) for n in network.nodes),
+            timeout=600,
+        )
+        for tx in transactions[len(relayed):]:
+            first.node.mempool.add_transaction(tx)
+        block = first.node.mempool.get_block_template(first.node.tip, lock_script).block
+        received = sum(peer.bytes_received for n in network.nodes for peer in n.peers)
+        start = time.perf_counter()
+        first.submit_block(block)
+        await network.wait_until(lambda: last.node.height == block.header.height, timeout=600, interval=0.0005)
+        elapsed = time.perf_counter() - start
+        received = sum(peer.bytes_received for n in network.nodes for peer in n.peers) - received
+        print(
+            f"{'Compact' if compact_blocks else 'Full'} blocks: relayed a {len(block.to_bytes())}-byte block with "
+            f"{len(block.transactions)} transactions across {n_nodes} nodes in {elapsed * 1000:.1f} ms, "
+            f"{received} bytes received"
+        )
+
+
+async def run(n_nodes, n_transactions, n_missing):
+    # Fan out the genesis coin until there are enough coins to spend.
+    generator = ChainGenerator(seed=0, transactions_per_block=1000, max_inputs=1, max_outputs=8, n_keys=1000)
+    blocks = []
+    while len(generator.coins) < n_transactions:
+        blocks.append(generator.generate_block())
+    transactions = generator.generate_spends(n_transactions)
+    lock_script = generator.keys[0].lock_script
+    for compact_blocks in (True, False):
+        await relay_block(blocks, transactions, n_missing, n_nodes, compact_blocks, lock_script)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    asyncio.run(run(a.nodes, a.transactions, a.missing))
@@ -0,0 +1,61 @@
+# Imports
+import argparse
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.merkle import MerkleTree
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark Merkle tree construction, updates and inclusion proofs.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--transactions',
+    type=int,
+    default=10000,
+    help="The number of transactions (leaves) in the tree.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label}: {elapsed * 1000:.3f} ms")
+    return result
+
+
+# Run
+if __name__ == "__main__":
+    n = a.transactions
+    leaves = [hash.get_sha256(i.to_bytes(8, 'big')) for i in range(n)]
+    deb(f"Args: {a}")
+    log(f"Benchmarking a Merkle tree with {n} leaves.")
+    tree = timed(f"Build ({n} leaves)", lambda: MerkleTree(leaves))
+    extra = hash.get_sha256(b'extra')
+    timed("Append (1 leaf)", lambda: tree.append(extra))
+    timed("Replace (1 leaf)", lambda: tree.replace(n // 2, extra), repeat=100)
+    proof = timed("Get proof", lambda: tree.get_proof(n // 2), repeat=100)
+    ok = timed("Verify proof", lambda: MerkleTree.verify_proof(extra, n // 2, proof, tree.root), repeat=100)
+    assert ok
+    assert MerkleTree(tree.levels[0][i].hex() for i in range(len(tree))).root == tree.root
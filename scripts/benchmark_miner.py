@@ -0,0 +1,65 @@
+# Imports
+import argparse
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.miner import Miner
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark the proof-of-work miner by mining copies of the genesis block.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--difficulty',
+    type=int,
+    default=16,
+    help="The mining difficulty threshold (the number of leading zero bits in the block hash).",
+)
+parser.add_argument(
+    '--blocks',
+    type=int,
+    default=5,
+    help="The number of blocks to mine.",
+)
+parser.add_argument(
+    '--workers',
+    type=int,
+    default=None,
+    help="The number of worker processes. Defaults to the number of CPUs.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    with Miner(workers=a.workers) as miner:
+        log(f"Mining {a.blocks} blocks at difficulty {a.difficulty} with {miner.workers} workers.")
+        for i in range(a.blocks):
+            block = get_genesis_block()
+            block.mining_difficulty_threshold = a.difficulty
+            # Give each block a different timestamp, so that each one needs its own nonce.
+            block.timestamp = f"2024-11-18T08:{i // 60 % 60:02d}:{i % 60:02d}Z"
+            result = miner.mine(block)
+            print(
+                f"Block {i}: nonce={result.nonce} hash={result.block_hash} attempts={result.attempts} "
+                f"time={result.elapsed:.3f}s hashes_per_second={result.hashes_per_second:.0f}"
+            )
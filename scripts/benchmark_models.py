@@ -0,0 +1,89 @@
+# Imports
+import argparse
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.block import Block
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.output import Output
+from project_caesar.code.transaction import Transaction
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark model construction: validated (from_json) versus trusted (from_trusted).",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--objects',
+    type=int,
+    default=10000,
+    help="The number of objects to create for each model and path.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+def timed(label, func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / n * 1e6:.2f} us per object")
+
+
+def build_transaction_trusted(data):
+    # Build a transaction from JSON data without validation, as read_from does for trusted bytes.
+    return Transaction.from_trusted(
+        input_count=data['input_count'],
+        output_count=data['output_count'],
+        fee=data['fee'],
+        inputs=[Input.from_trusted(**i) for i in data['inputs']],
+        outputs=[Output.from_trusted(**o) for o in data['outputs']],
+    )
+
+
+def build_block_trusted(data):
+    values = dict(data)
+    values['transactions'] = [build_transaction_trusted(t) for t in data['transactions']]
+    return Block.from_trusted(**values)
+
+
+# Run
+if __name__ == "__main__":
+    n = a.objects
+    deb(f"Args: {a}")
+    block_0 = get_genesis_block()
+    tx = block_0.transactions[0]
+    input_data = tx.inputs[0].to_json()
+    output_data = tx.outputs[0].to_json()
+    tx_data = tx.to_json()
+    block_data = block_0.to_json()
+    block_bytes = block_0.to_bytes()
+    log(f"Creating {n} objects per model and path.")
+    timed("Output (validated)", lambda: Output.from_json(output_data), n)
+    timed("Output (trusted)", lambda: Output.from_trusted(**output_data), n)
+    timed("Input (validated)", lambda: Input.from_json(input_data), n)
+    timed("Input (trusted)", lambda: Input.from_trusted(**input_data), n)
+    timed("Transaction (validated)", lambda: Transaction.from_json(tx_data), n)
+    timed("Transaction (trusted)", lambda: build_transaction_trusted(tx_data), n)
+    timed("Block (validated)", lambda: Block.from_json(block_data), n)
+    timed("Block (trusted)", lambda: build_block_trusted(block_data), n)
+    timed("Block (from_bytes, validated)", lambda: Block.from_bytes(block_bytes), n)
+    timed("Block (from_bytes, trusted)", lambda: Block.from_bytes(block_bytes, trusted=True), n)
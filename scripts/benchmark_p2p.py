@@ -0,0 +1,86 @@
+# Imports
+import argparse
+import asyncio
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.p2p import LocalNetwork
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark transaction and block relay between local nodes.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--nodes',
+    type=int,
+    default=3,
+    help="The number of nodes.",
+)
+parser.add_argument(
+    '--topology',
+    choices=['line', 'mesh'],
+    default='line',
+    help="How the nodes are connected: in a line (each item is relayed through every node), or every pair.",
+)
+parser.add_argument(
+    '--transactions',
+    type=int,
+    default=5000,
+    help="The number of transactions to relay.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+async def run(n_nodes, topology, n_transactions):
+    # Fan out the genesis coin until there are enough coins to spend.
+    generator = ChainGenerator(seed=0, transactions_per_block=1000, max_inputs=1, max_outputs=8, n_keys=1000)
+    blocks = []
+    while len(generator.coins) < n_transactions:
+        blocks.append(generator.generate_block())
+    transactions = generator.generate_spends(n_transactions)
+    async with LocalNetwork(n_nodes, topology) as network:
+        first, last = network.nodes[0], network.nodes[-1]
+        start = time.perf_counter()
+        for block in blocks:
+            first.submit_block(block)
+            await network.wait_until(lambda: last.node.height == block.header.height, timeout=600)
+        elapsed = time.perf_counter() - start
+        print(f"Relayed {len(blocks)} blocks across {n_nodes} nodes in {elapsed:.2f} s")
+        start = time.perf_counter()
+        for tx in transactions:
+            first.submit_transaction(tx)
+        await network.wait_until(
+            lambda: all(len(n.node.mempool) == len(transactions) for n in network.nodes),
+            timeout=600,
+        )
+        elapsed = time.perf_counter() - start
+        relays = len(transactions) * (n_nodes - 1)
+        print(
+            f"Relayed {len(transactions)} transactions to {n_nodes - 1} nodes ({topology}) in {elapsed:.2f} s: "
+            f"{relays / elapsed:.0f} relays/s"
+        )
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    asyncio.run(run(a.nodes, a.topology, a.transactions))
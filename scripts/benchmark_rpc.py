@@ -0,0 +1,96 @@
+# Imports
+import argparse
+import asyncio
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.node import Node
+from project_caesar.code.rpc_server import RpcClient, RpcServer, dump_json
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark wallet-style polling of the JSON-RPC server (get_tip and get_block for the tip).",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--clients',
+    type=int,
+    default=10,
+    help="The number of concurrent clients, each with one keep-alive connection.",
+)
+parser.add_argument(
+    '--requests',
+    type=int,
+    default=1000,
+    help="The number of requests per client.",
+)
+parser.add_argument(
+    '--transactions-per-block',
+    type=int,
+    default=200,
+    help="The maximum number of non-coinbase transactions per block (the tip block's size).",
+)
+parser.add_argument(
+    '--batch',
+    type=int,
+    default=1,
+    help="The number of calls per request (a JSON-RPC batch if more than 1).",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+async def poll(host, port, n_requests, batch_size):
+    # The requests are encoded once, and the responses are not decoded, so that the client costs little.
+    bodies = []
+    for method in ('get_tip', 'get_block'):
+        calls = [{'jsonrpc': '2.0', 'method': method, 'id': i} for i in range(batch_size)]
+        bodies.append(dump_json(calls[0] if batch_size == 1 else calls))
+    async with RpcClient(host, port) as client:
+        for i in range(n_requests):
+            status, _ = await client.post(bodies[i % 2])
+            assert status == 200
+
+
+async def run(n_clients, n_requests, transactions_per_block, batch_size):
+    generator = ChainGenerator(seed=0, transactions_per_block=transactions_per_block, max_inputs=1, max_outputs=4)
+    with Node() as node:
+        # Fan out the genesis coin, so that the tip block is full.
+        while len(node.tip.transactions) <= transactions_per_block // 2:
+            node.process_block(generator.generate_block())
+        print(f"Tip block: {len(node.tip.transactions)} transactions, {len(node.tip.to_bytes())} bytes")
+        for cache_size in (0, 1000):
+            async with RpcServer(node, result_cache_size=cache_size) as server:
+                start = time.perf_counter()
+                await asyncio.gather(*[
+                    poll(server.host, server.port, n_requests, batch_size) for _ in range(n_clients)
+                ])
+                elapsed = time.perf_counter() - start
+                calls = n_clients * n_requests * batch_size
+                print(
+                    f"{'Cached' if cache_size else 'Uncached'} results: {calls} calls from {n_clients} clients in "
+                    f"{elapsed:.2f} s: {calls / elapsed:.0f} calls/s"
+                )
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    asyncio.run(run(a.clients, a.requests, a.transactions_per_block, a.batch))
@@ -0,0 +1,60 @@
+# Imports
+import argparse
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code import secp256k1
+from project_caesar.code.signature import signature_cache, verify_signature
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark secp256k1 ECDSA signing and verification, with and without the signature cache.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--signatures',
+    type=int,
+    default=200,
+    help="The number of signatures to create and verify.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+def timed(label, func, n):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed * 1000:.1f} ms total, {elapsed / n * 1e6:.1f} us each")
+    return result
+
+
+# Run
+if __name__ == "__main__":
+    n = a.signatures
+    deb(f"Args: {a}")
+    timed("Build generator table", secp256k1.get_generator_table, 1)
+    secret_keys = [hash.get_sha256_digest(i.to_bytes(8, 'big')) for i in range(n)]
+    messages = [hash.get_sha256_digest(b'message' + i.to_bytes(8, 'big')) for i in range(n)]
+    public_keys = timed("Derive public keys", lambda: [secp256k1.get_public_key(sk) for sk in secret_keys], n)
+    signatures = timed("Sign", lambda: [secp256k1.sign(sk, m) for sk, m in zip(secret_keys, messages)], n)
+    items = list(zip(public_keys, messages, signatures))
+    signature_cache.clear()
+    assert timed("Verify (not cached)", lambda: all(verify_signature(*item) for item in items), n)
+    assert timed("Verify (cached)", lambda: all(verify_signature(*item) for item in items), n)
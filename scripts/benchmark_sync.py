@@ -0,0 +1,77 @@
+# Imports
+import argparse
+import asyncio
+import time
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.p2p import LocalNetwork
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Benchmark a headers-first sync of a synthetic chain from local source nodes to a new node.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--blocks',
+    type=int,
+    default=100000,
+    help="The number of blocks in the synthetic chain.",
+)
+parser.add_argument(
+    '--transactions-per-block',
+    type=int,
+    default=1,
+    help="The maximum number of non-coinbase transactions per block.",
+)
+parser.add_argument(
+    '--sources',
+    type=int,
+    default=1,
+    help="The number of source nodes that have the chain (the new node downloads blocks from all of them).",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+async def run(n_blocks, transactions_per_block, n_sources):
+    network = LocalNetwork(n_sources + 1, topology='mesh')
+    sources = [p2p_node.node for p2p_node in network.nodes[:n_sources]]
+    generator = ChainGenerator(seed=0, transactions_per_block=transactions_per_block)
+    start = time.perf_counter()
+    for block in generator.generate_blocks(n_blocks):
+        for node in sources:
+            node.process_block(block)
+    print(f"Generated and loaded {n_blocks} blocks into {n_sources} source node(s) in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    # The new node connects to the sources, and starts syncing when it receives their version messages.
+    async with network:
+        sync = network.nodes[-1].sync
+        await sync.done.wait()
+        elapsed = time.perf_counter() - start
+        if sync.failed:
+            print("The sync failed.")
+            return
+        print(f"Synced {sync.blocks_connected} blocks in {elapsed:.1f} s: {sync.blocks_connected / elapsed:.0f} blocks/s")
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    asyncio.run(run(a.blocks, a.transactions_per_block, a.sources))
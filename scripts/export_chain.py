@@ -0,0 +1,61 @@
+# Imports
+import argparse
+import sys
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_io import export_chain
+from project_caesar.code.node import Node
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Export a node's chain as newline-delimited JSON (one block per line).",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--data-dir',
+    type=str,
+    required=True,
+    help="The node's data directory.",
+)
+parser.add_argument(
+    '--file',
+    type=str,
+    default='-',
+    help="The file to write to. Defaults to stdout.",
+)
+parser.add_argument(
+    '--start-height',
+    type=int,
+    default=1,
+    help="The first block to export. The genesis block is skipped by default.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    with Node(a.data_dir) as node:
+        if a.file == '-':
+            n = export_chain(node, sys.stdout, start_height=a.start_height)
+        else:
+            with open(a.file, 'w') as f:
+                n = export_chain(node, f, start_height=a.start_height)
+    log(f"Exported {n} blocks.")
@@ -0,0 +1,92 @@
+# Imports
+import argparse
+import sys
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.chain_io import write_blocks
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Generate a valid synthetic chain as newline-delimited JSON (one block per line).",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--blocks',
+    type=int,
+    default=100,
+    help="The number of blocks to generate (after the genesis block).",
+)
+parser.add_argument(
+    '--transactions-per-block',
+    type=int,
+    default=10,
+    help="The maximum number of non-coinbase transactions per block.",
+)
+parser.add_argument(
+    '--max-inputs',
+    type=int,
+    default=2,
+    help="The maximum number of inputs per transaction (fan-in).",
+)
+parser.add_argument(
+    '--max-outputs',
+    type=int,
+    default=2,
+    help="The maximum number of outputs per transaction (fan-out).",
+)
+parser.add_argument(
+    '--keys',
+    type=int,
+    default=100,
+    help="The number of keys that outputs are paid to. Fewer keys means more key reuse.",
+)
+parser.add_argument(
+    '--seed',
+    type=int,
+    default=0,
+    help="The random seed. The same seed and settings always produce the same chain.",
+)
+parser.add_argument(
+    '--file',
+    type=str,
+    default='-',
+    help="The file to write to. Defaults to stdout.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    generator = ChainGenerator(
+        seed=a.seed,
+        transactions_per_block=a.transactions_per_block,
+        max_inputs=a.max_inputs,
+        max_outputs=a.max_outputs,
+        n_keys=a.keys,
+    )
+    blocks = generator.generate_blocks(a.blocks)
+    if a.file == '-':
+        n = write_blocks(blocks, sys.stdout)
+    else:
+        with open(a.file, 'w') as f:
+            n = write_blocks(blocks, f)
+    log(f"Generated {n} blocks.")
@@ -0,0 +1,36 @@
+# Imports
+import argparse
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Check that all available hash backends produce identical digests on the genesis block.",
+    parents=[arguments.get_common_parser()]
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    results = hash.run_self_test()
+    for name, digests in results.items():
+        deb(f"{name}: {digests}")
+    log(f"Hash backends agree on the genesis block: {', '.join(sorted(results))}")
@@ -0,0 +1,61 @@
+# Imports
+import argparse
+import sys
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.chain_io import DEFAULT_BATCH_SIZE, import_chain
+from project_caesar.code.node import Node
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Import a chain from newline-delimited JSON (one block per line), validating each block.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--data-dir',
+    type=str,
+    required=True,
+    help="The node's data directory.",
+)
+parser.add_argument(
+    '--file',
+    type=str,
+    default='-',
+    help="The file to read from. Defaults to stdin.",
+)
+parser.add_argument(
+    '--batch-size',
+    type=int,
+    default=DEFAULT_BATCH_SIZE,
+    help="The number of blocks to process between flushes to disk.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    with Node(a.data_dir) as node:
+        if a.file == '-':
+            n = import_chain(node, sys.stdin, batch_size=a.batch_size)
+        else:
+            with open(a.file) as f:
+                n = import_chain(node, f, batch_size=a.batch_size)
+        log(f"Imported {n} blocks. Height: {node.height}")
@@ -0,0 +1,88 @@
+# Imports
+import argparse
+import asyncio
+
+
+# Local imports
+from project_caesar.configuration import Config
+from project_caesar.code.node import Node
+from project_caesar.code.p2p import P2PNode
+from project_caesar.code.rpc_server import RpcServer
+from project_caesar.utils import arguments, hash, module_logger
+
+
+# Arguments
+parser = argparse.ArgumentParser(
+    description="Run a node, with the peer-to-peer layer and the JSON-RPC server, until interrupted.",
+    parents=[arguments.get_common_parser()]
+)
+parser.add_argument(
+    '--data-dir',
+    type=str,
+    default=None,
+    help="The node's data directory. By default, the node keeps its chain in memory.",
+)
+parser.add_argument(
+    '--address-index',
+    action='store_true',
+    help="Maintain an address index (get_transaction then finds confirmed transactions without a height).",
+)
+parser.add_argument(
+    '--host',
+    type=str,
+    default='127.0.0.1',
+    help="The address to listen on.",
+)
+parser.add_argument(
+    '--p2p-port',
+    type=int,
+    default=8600,
+    help="The port for connections from other nodes.",
+)
+parser.add_argument(
+    '--rpc-port',
+    type=int,
+    default=8601,
+    help="The port for JSON-RPC requests.",
+)
+parser.add_argument(
+    '--connect',
+    type=str,
+    action='append',
+    default=[],
+    help="A node to connect to, as host:port. Can be given several times.",
+)
+a = parser.parse_args()
+
+
+# Config
+config = Config.from_args(a)
+hash.set_hash_backend(config.hash_backend)
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(
+    __file__,
+    config=config,
+    configure_all=True,
+)
+
+
+async def run(node):
+    async with P2PNode(node, a.host, a.p2p_port) as p2p_node:
+        async with RpcServer(node, a.host, a.rpc_port, p2p_node=p2p_node):
+            for address in a.connect:
+                host, _, port = address.rpartition(':')
+                await p2p_node.connect(host, int(port))
+            await asyncio.Event().wait()
+
+
+# Run
+if __name__ == "__main__":
+    deb(f"Args: {a}")
+    with Node(a.data_dir, address_index=a.address_index) as node:
+        log(f"Height: {node.height}")
+        try:
+            asyncio.run(run(node))
+        except KeyboardInterrupt:
+            log("Stopped.")
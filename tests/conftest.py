@@ -1,5 +1,6 @@
 # Imports
 import argparse
+import time
 import pytest
 
 
@@ -51,3 +52,16 @@ def setup_module(pytestconfig):
 
     pytestconfig.test_args = a
 
+
+
+@pytest.fixture
+def set_time_zone(monkeypatch):
+    """Returns a function that sets the local time zone (by name, as in TZ) until the end of the test."""
+
+    def set_time_zone(name):
+        monkeypatch.setenv('TZ', name)
+        time.tzset()
+
+    yield set_time_zone
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,74 @@
+# Imports
+import collections
+
+
+# Local imports
+from project_caesar.code.chain_generator import GENESIS_SECRET_KEY, ChainGenerator, Key
+from project_caesar.code.node import Node
+
+
+def get_expected_balances(generator):
+    balances = collections.Counter()
+    for coin in generator.coins:
+        balances[coin.key.address] += coin.value
+    return balances
+
+
+def test_balances_match_wallet():
+    generator = ChainGenerator(seed=3, transactions_per_block=5, max_inputs=3, max_outputs=3, n_keys=5)
+    with Node(address_index=True) as node:
+        for block in generator.generate_blocks(10):
+            node.process_block(block)
+        index = node.address_index
+        assert index.height == 10
+        for address, balance in get_expected_balances(generator).items():
+            assert index.get_balance(address) == balance
+        for key in generator.keys:
+            unspent = index.get_unspent(key.address)
+            assert sorted(c.outpoint for c in generator.coins if c.key == key) == [c.outpoint for c in unspent]
+            assert all(node.utxo_set.get_coin(c.outpoint).value == c.value for c in unspent)
+
+
+def test_history():
+    generator = ChainGenerator(seed=4, transactions_per_block=3, n_keys=3)
+    genesis_key = Key.from_secret_key(GENESIS_SECRET_KEY)
+    with Node(address_index=True) as node:
+        blocks = list(generator.generate_blocks(3))
+        for block in blocks:
+            node.process_block(block)
+        index = node.address_index
+        # The genesis coin is received at height 0, and spent by the first transaction of block 1.
+        history = index.get_history(genesis_key.address)
+        assert history == [(0, node.get_block(0).transactions[0].hash), (1, blocks[0].transactions[1].hash)]
+        assert index.get_balance(genesis_key.address) == 0
+        # Lookups by public key hash give the same results.
+        public_key_hash = genesis_key.lock_script.split()[2]
+        assert index.get_history(public_key_hash) == history
+        assert index.get_balance('csr_00000000') == 0
+        assert index.get_history('csr_00000000') == []
+
+
+def test_undo_block():
+    generator = ChainGenerator(seed=5, transactions_per_block=4, n_keys=4)
+    with Node(address_index=True) as node:
+        for block in generator.generate_blocks(2):
+            node.process_block(block)
+        index = node.address_index
+        before = {key.address: (index.get_balance(key.address), index.get_history(key.address)) for key in generator.keys}
+        node.process_block(generator.generate_block())
+        index.undo_block(3, node.get_block(2).hash)
+        assert index.height == 2
+        after = {key.address: (index.get_balance(key.address), index.get_history(key.address)) for key in generator.keys}
+        assert after == before
+
+
+def test_catch_up(tmp_path):
+    generator = ChainGenerator(seed=6, n_keys=4)
+    with Node(str(tmp_path)) as node:
+        for block in generator.generate_blocks(5):
+            node.process_block(block)
+    # Enabling the index on an existing data directory builds it from the stored chain.
+    with Node(str(tmp_path), address_index=True) as node:
+        assert node.address_index.height == 5
+        for address, balance in get_expected_balances(generator).items():
+            assert node.address_index.get_balance(address) == balance
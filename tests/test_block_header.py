@@ -0,0 +1,66 @@
+# Imports
+import struct
+
+import pytest
+
+
+# Local imports
+from project_caesar.code.block_header import HEADER_SIZE, MAX_TIMESTAMP, TIMESTAMP_OFFSET, BlockHeader
+from project_caesar.code.genesis import get_genesis_block
+
+
+def test_header_has_fixed_size():
+    block_0 = get_genesis_block()
+    assert len(block_0.header.to_bytes()) == HEADER_SIZE
+    block_0.nonce = 2 ** 40
+    assert len(block_0.header.to_bytes()) == HEADER_SIZE
+
+
+def test_block_hash_is_header_hash():
+    block_0 = get_genesis_block()
+    assert block_0.hash == block_0.header.hash
+    assert block_0.header.merkle_root == block_0.merkle_root
+
+
+def test_header_round_trip():
+    header = get_genesis_block().header
+    header_copy = BlockHeader.from_bytes(header.to_bytes())
+    assert header_copy.to_json() == header.to_json()
+    assert header_copy.height == 0
+
+
+def test_header_hash_does_not_depend_on_time_zone(set_time_zone):
+    hashes = []
+    for time_zone in ('UTC', 'America/New_York', 'Asia/Tokyo'):
+        set_time_zone(time_zone)
+        block_0 = get_genesis_block()
+        # 2024-11-03T06:30:00Z is 01:30 in New York, an hour that happens twice there.
+        header = block_0.header.model_copy(update={'timestamp': '2024-11-03T06:30:00Z'})
+        assert BlockHeader.from_bytes(header.to_bytes()).hash == header.hash
+        hashes.append((block_0.hash, header.hash))
+    assert len(set(hashes)) == 1
+
+
+def test_out_of_range_timestamp_is_rejected():
+    data = bytearray(get_genesis_block().header.to_bytes())
+    for timestamp in (MAX_TIMESTAMP + 1, 2 ** 62, 2 ** 64 - 1):
+        struct.pack_into('<Q', data, TIMESTAMP_OFFSET, timestamp)
+        with pytest.raises(ValueError):
+            BlockHeader.from_bytes(bytes(data))
+
+
+def test_transaction_change_changes_block_hash():
+    block_0 = get_genesis_block()
+    h = block_0.hash
+    tx = block_0.transactions[0]
+    tx.fee = 1
+    block_0.invalidate_cache()
+    # The transaction change is covered through the Merkle root.
+    assert block_0.hash != h
+
+
+def test_hash_must_be_32_bytes():
+    block_0 = get_genesis_block()
+    block_0.previous_block = {'block_height': 0, 'block_hash': '00000000'}
+    with pytest.raises(ValueError):
+        block_0.header.to_bytes()
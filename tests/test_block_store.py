@@ -0,0 +1,75 @@
+# Imports
+import os
+import pytest
+
+
+# Local imports
+from project_caesar.code.block_store import INDEX_FILE_NAME, SEGMENT_FILE_NAME, BlockStore
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.node import Node
+
+
+def get_chain(n):
+    # A chain of copies of the genesis block, linked by hash.
+    blocks = [get_genesis_block()]
+    for height in range(1, n):
+        block = get_genesis_block()
+        block.previous_block = {'block_height': height - 1, 'block_hash': blocks[-1].hash}
+        blocks.append(block)
+    return blocks
+
+
+def test_put_and_get_blocks(tmp_path):
+    blocks = get_chain(5)
+    with BlockStore(str(tmp_path), sync_every=2) as store:
+        for block in blocks:
+            store.put_block(block)
+        assert store.height == 4
+        for height, block in enumerate(blocks):
+            assert store.get_block_by_height(height).hash == block.hash
+            assert store.has_block(block.hash)
+
+
+def test_reopen_store(tmp_path):
+    blocks = get_chain(5)
+    with BlockStore(str(tmp_path), segment_size=500) as store:
+        for block in blocks:
+            store.put_block(block)
+    with BlockStore(str(tmp_path)) as store:
+        assert len(store) == 5
+        assert store.get_block_by_height(3).hash == blocks[3].hash
+
+
+def test_incomplete_index_entry_is_discarded(tmp_path):
+    blocks = get_chain(3)
+    with BlockStore(str(tmp_path)) as store:
+        for block in blocks:
+            store.put_block(block)
+    # Simulate a crash part-way through writing a block and its index entry.
+    with open(os.path.join(tmp_path, INDEX_FILE_NAME), 'ab') as f:
+        f.write(b'\x01\x02\x03')
+    with open(os.path.join(tmp_path, SEGMENT_FILE_NAME.format(0)), 'ab') as f:
+        f.write(b'\x04\x05\x06')
+    with BlockStore(str(tmp_path)) as store:
+        assert store.height == 2
+        store.put_block(get_chain(4)[3])
+    with BlockStore(str(tmp_path)) as store:
+        assert store.height == 3
+
+
+def test_height_gap_is_rejected(tmp_path):
+    blocks = get_chain(3)
+    with BlockStore(str(tmp_path)) as store:
+        store.put_block(blocks[0])
+        with pytest.raises(ValueError):
+            store.put_block(blocks[2])
+
+
+def test_node_restarts_from_block_store(tmp_path):
+    with Node(data_dir=str(tmp_path)) as node:
+        assert node.height == 0
+        block_1 = get_chain(2)[1]
+        node.block_store.put_block(block_1)
+    with Node(data_dir=str(tmp_path)) as node:
+        assert node.height == 1
+        assert node.tip.hash == block_1.hash
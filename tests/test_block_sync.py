@@ -0,0 +1,101 @@
+# Imports
+import asyncio
+import struct
+
+import pytest
+
+
+# Local imports
+from project_caesar.code.block_header import TIMESTAMP_OFFSET
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.node import Node
+from project_caesar.code.p2p import LocalNetwork, P2PNode
+from project_caesar.code.p2p_messages import decode_headers, encode_message, encode_version, read_message
+from project_caesar.utils.serialization import write_compact_size
+
+
+def get_blocks(n_blocks, seed=1):
+    generator = ChainGenerator(seed=seed, transactions_per_block=3, n_keys=10)
+    return list(generator.generate_blocks(n_blocks))
+
+
+def test_locator_and_headers():
+    blocks = get_blocks(40)
+    with Node() as node:
+        for block in blocks:
+            node.process_block(block)
+        locator = node.get_locator()
+        assert locator[0] == blocks[-1].hash
+        assert locator[-1] == node.get_block(0).hash
+        assert len(locator) < 20
+        # Headers follow the first locator hash on the main chain.
+        headers = node.get_headers([blocks[9].hash, blocks[4].hash], max_headers=5)
+        assert [h.hash for h in headers] == [b.hash for b in blocks[10:15]]
+        headers = node.get_headers(['00' * 32], stop_hash=blocks[2].hash)
+        assert [h.hash for h in headers] == [b.hash for b in blocks[:3]]
+
+
+def test_sync_from_several_peers():
+    blocks = get_blocks(300)
+
+    async def run():
+        network = LocalNetwork(3, topology='mesh')
+        for p2p_node in network.nodes[:2]:
+            for block in blocks:
+                p2p_node.node.process_block(block)
+        async with network:
+            fresh = network.nodes[2]
+            sync = fresh.sync
+            assert sync is not None
+            await asyncio.wait_for(sync.done.wait(), timeout=60)
+            assert not sync.failed
+            assert fresh.node.tip.hash == blocks[-1].hash
+            assert sync.blocks_connected == len(blocks)
+    asyncio.run(run())
+
+
+def test_sync_after_missing_blocks():
+    # A node that falls behind catches up when it receives a block whose parent it does not have.
+    blocks = get_blocks(30, seed=2)
+
+    async def run():
+        async with LocalNetwork(2) as network:
+            source, target = network.nodes
+            for block in blocks[:10]:
+                source.submit_block(block)
+            await network.wait_until(lambda: target.node.height == 10)
+            for block in blocks[10:-1]:
+                source.node.process_block(block)
+            source.submit_block(blocks[-1])
+            await network.wait_until(lambda: target.node.height == len(blocks))
+            assert target.node.tip.hash == blocks[-1].hash
+    asyncio.run(run())
+
+
+def test_sync_fails_on_invalid_headers():
+    # A sync peer that sends a header with an out-of-range timestamp is disconnected, which ends the sync.
+    blocks = get_blocks(2)
+    header = bytearray(blocks[0].header.to_bytes())
+    struct.pack_into('<Q', header, TIMESTAMP_OFFSET, 2 ** 62)
+    headers = bytearray()
+    write_compact_size(headers, 1)
+    headers += header
+    with pytest.raises(ValueError):
+        decode_headers(bytes(headers))
+
+    async def run():
+        with Node() as node:
+            async with P2PNode(node) as p2p_node:
+                reader, writer = await asyncio.open_connection(p2p_node.host, p2p_node.port)
+                writer.write(encode_message('version', encode_version(len(blocks), blocks[-1].hash)))
+                while (await read_message(reader))[0] != 'getheaders':
+                    pass
+                tasks = set(p2p_node._tasks)
+                sync = p2p_node.sync
+                writer.write(encode_message('headers', bytes(headers)))
+                await asyncio.wait_for(sync.done.wait(), 5)
+                assert sync.failed
+                assert p2p_node.sync is None and not p2p_node.peers
+                await asyncio.wait_for(asyncio.gather(*tasks), 5)
+                writer.close()
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+# Imports
+import io
+import random
+
+
+# Local imports
+from project_caesar.code.chain_generator import ChainGenerator, split_value
+from project_caesar.code.chain_io import import_chain, write_blocks
+from project_caesar.code.node import Node
+
+
+def test_generated_chain_is_valid():
+    generator = ChainGenerator(seed=1, transactions_per_block=5, max_inputs=3, max_outputs=3, n_keys=10)
+    with Node() as node:
+        for block in generator.generate_blocks(10):
+            node.process_block(block)
+        assert node.height == 10
+        assert node.tip.hash == generator.tip.hash
+        # Every coin that the generator holds is unspent.
+        for coin in generator.coins:
+            assert node.utxo_set.get_coin(coin.outpoint).value == coin.value
+
+
+def test_deterministic():
+    hashes_1 = [b.hash for b in ChainGenerator(seed=7).generate_blocks(5)]
+    hashes_2 = [b.hash for b in ChainGenerator(seed=7).generate_blocks(5)]
+    hashes_3 = [b.hash for b in ChainGenerator(seed=8).generate_blocks(5)]
+    assert hashes_1 == hashes_2
+    assert hashes_1 != hashes_3
+
+
+def test_key_reuse():
+    generator = ChainGenerator(seed=1, n_keys=1)
+    lock_scripts = {o.lock_script for b in generator.generate_blocks(3) for tx in b.transactions for o in tx.outputs}
+    assert lock_scripts == {generator.keys[0].lock_script}
+
+
+def test_stream_and_import():
+    f = io.StringIO()
+    assert write_blocks(ChainGenerator(seed=2).generate_blocks(5), f) == 5
+    f.seek(0)
+    with Node() as node:
+        assert import_chain(node, f) == 5
+
+
+def test_split_value():
+    rng = random.Random(0)
+    for total, n in [(10, 1), (10, 10), (1000, 3)]:
+        values = split_value(total, n, rng)
+        assert sum(values) == total
+        assert len(values) == n
+        assert min(values) >= 1
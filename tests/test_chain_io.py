@@ -0,0 +1,55 @@
+# Imports
+import io
+import pytest
+
+
+# Local imports
+from project_caesar.code.chain_io import batched, export_chain, import_chain
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.node import Node
+
+
+LOCK_SCRIPT = get_genesis_block().transactions[0].outputs[0].lock_script
+
+
+def build_chain(node, n_blocks):
+    for i in range(n_blocks):
+        timestamp = f'2024-11-18T09:00:{i:02d}Z'
+        template = node.mempool.get_block_template(node.tip, LOCK_SCRIPT, timestamp=timestamp)
+        node.process_block(template.block)
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        list(batched(range(5), 0))
+
+
+def test_export_and_import(tmp_path):
+    f = io.StringIO()
+    with Node() as node:
+        build_chain(node, 5)
+        assert export_chain(node, f) == 5
+        tip_hash = node.tip.hash
+    f.seek(0)
+    assert len(f.getvalue().splitlines()) == 5
+    with Node(str(tmp_path)) as node:
+        assert import_chain(node, f, batch_size=2) == 5
+        assert node.height == 5
+        assert node.tip.hash == tip_hash
+        # Importing again skips the blocks that the node already has.
+        f.seek(0)
+        assert import_chain(node, f) == 0
+
+
+def test_import_invalid_line():
+    f = io.StringIO()
+    with Node() as node:
+        build_chain(node, 2)
+        export_chain(node, f)
+    f.write('{"version": "x"}\n')
+    f.seek(0)
+    with Node() as node:
+        with pytest.raises(ValueError, match='line 3'):
+            import_chain(node, f, batch_size=1)
+        assert node.height == 2
@@ -0,0 +1,67 @@
+# Imports
+import asyncio
+
+import pytest
+
+
+# Local imports
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.compact_block import PartialBlock, create_compact_block
+from project_caesar.code.p2p import LocalNetwork
+from project_caesar.code.p2p_messages import decode_block_transactions, decode_compact_block
+from project_caesar.code.p2p_messages import decode_get_block_transactions, encode_block_transactions
+from project_caesar.code.p2p_messages import encode_compact_block, encode_get_block_transactions
+
+
+def test_compact_block_reconstruction():
+    generator = ChainGenerator(seed=1, transactions_per_block=10, n_keys=10)
+    block = list(generator.generate_blocks(8))[-1]
+    transactions = block.transactions
+    assert len(transactions) > 5
+    compact = decode_compact_block(encode_compact_block(create_compact_block(block)))
+    assert compact.header.hash == block.hash
+    assert [i for i, _ in compact.prefilled] == [0]
+    # Rebuilt from a mempool that lacks two of the transactions (and has an unrelated one).
+    unrelated = generator.generate_spends(1)
+    partial = PartialBlock(compact, unrelated + transactions[1:4] + transactions[5:-1])
+    assert partial.missing == [4, len(transactions) - 1]
+    with pytest.raises(ValueError):
+        partial.to_block()
+    block_hash, indexes = decode_get_block_transactions(encode_get_block_transactions(block.hash, partial.missing))
+    assert (block_hash, indexes) == (block.hash, partial.missing)
+    payload = encode_block_transactions(block.hash, [transactions[i] for i in indexes])
+    partial.fill(decode_block_transactions(payload)[1])
+    assert partial.to_block().to_bytes() == block.to_bytes()
+    # The short IDs depend on the nonce.
+    assert create_compact_block(block, nonce=1).short_ids != create_compact_block(block, nonce=2).short_ids
+
+
+def test_compact_block_relay():
+    generator = ChainGenerator(seed=3, transactions_per_block=5, max_inputs=1, max_outputs=4, n_keys=10)
+    blocks = list(generator.generate_blocks(5))
+    transactions = generator.generate_spends(100)
+    lock_script = generator.keys[0].lock_script
+
+    async def relay_block(compact_blocks):
+        # Returns the number of bytes that the last node received while the block propagated.
+        async with LocalNetwork(3, topology='line', compact_blocks=compact_blocks) as network:
+            first, last = network.nodes[0], network.nodes[-1]
+            for p2p_node in network.nodes:
+                for block in blocks:
+                    p2p_node.node.process_block(block)
+            for tx in transactions[:-1]:
+                first.submit_transaction(tx)
+            await network.wait_until(lambda: all(len(n.node.mempool) == len(transactions) - 1 for n in network.nodes))
+            # Only the first node has the last transaction: the others must request it.
+            first.node.mempool.add_transaction(transactions[-1])
+            block = first.node.mempool.get_block_template(first.node.tip, lock_script).block
+            received = sum(peer.bytes_received for peer in last.peers)
+            first.submit_block(block)
+            await network.wait_until(lambda: last.node.height == block.header.height)
+            assert last.node.tip.hash == block.hash
+            assert len(last.node.mempool) == 0
+            return sum(peer.bytes_received for peer in last.peers) - received
+
+    compact_bytes = asyncio.run(relay_block(True))
+    full_bytes = asyncio.run(relay_block(False))
+    assert compact_bytes * 5 < full_bytes
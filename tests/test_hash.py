@@ -0,0 +1,46 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.utils import hash
+
+
+EMPTY_SHA256 = 'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+
+
+@pytest.fixture
+def restore_backend():
+    name = hash.get_hash_backend()
+    yield
+    hash.set_hash_backend(name)
+
+
+def test_backends_agree_on_genesis_block():
+    results = hash.run_self_test()
+    assert 'hashlib' in results
+
+
+@pytest.mark.parametrize('name', sorted(hash.HASH_BACKENDS))
+def test_backend_known_digest(name, restore_backend):
+    hash.set_hash_backend(name)
+    assert hash.get_sha256(b'') == EMPTY_SHA256
+    assert hash.get_sha256('') == EMPTY_SHA256
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        hash.set_hash_backend('unknown')
+
+
+def test_batch_helpers():
+    items = [b'', b'abc']
+    digests = hash.get_sha256_batch(items)
+    assert [d.hex() for d in digests] == [hash.get_sha256(x) for x in items]
+    double = hash.get_double_sha256_batch(items)
+    assert double == [hash.get_sha256_digest(d) for d in digests]
+
+
+def test_invalid_hex_is_rejected():
+    with pytest.raises(ValueError):
+        hash.get_sha256('xyz')
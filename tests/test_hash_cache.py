@@ -0,0 +1,36 @@
+# Local imports
+from project_caesar.code.genesis import get_genesis_block
+
+
+def test_hash_is_cached():
+    block_0 = get_genesis_block()
+    assert block_0.hash is block_0.hash
+    tx = block_0.transactions[0]
+    assert tx.hash is tx.hash
+
+
+def test_assignment_invalidates_hash():
+    block_0 = get_genesis_block()
+    h = block_0.hash
+    block_0.nonce = 1
+    assert block_0.hash != h
+    block_0.nonce = 0
+    assert block_0.hash == h
+
+
+def test_nested_change_requires_explicit_invalidation():
+    block_0 = get_genesis_block()
+    h = block_0.hash
+    tx = block_0.transactions[0]
+    tx.fee = 1
+    block_0.invalidate_cache()
+    assert block_0.merkle_root == tx.hash
+    assert block_0.hash != h
+
+
+def test_copy_has_its_own_cache():
+    block_0 = get_genesis_block()
+    h = block_0.hash
+    block_1 = block_0.model_copy(update={'nonce': 1})
+    assert block_1.hash != h
+    assert block_0.hash == h
@@ -0,0 +1,53 @@
+# Imports
+import pytest
+
+
+# Components
+from typing import Optional
+from pydantic import BaseModel
+
+
+# Local imports
+from project_caesar.code.models.hex_string import HexString
+from project_caesar.utils import hash
+
+
+def test_create():
+    h = HexString(value='0xAABB01')
+    assert h == b'\xaa\xbb\x01'
+    assert h.value == 'aabb01'
+    assert str(h) == 'aabb01'
+    assert HexString(b'\xaa\xbb\x01') == h
+    assert HexString(value='aabb01', length=3).length == 3
+
+
+def test_invalid():
+    for value in ['abc', 'zz', 'aa bb', 'aa\n']:
+        with pytest.raises(ValueError):
+            HexString(value)
+        assert not HexString.is_valid_hex(value)
+    with pytest.raises(ValueError, match='length'):
+        HexString('aabb', length=3)
+    with pytest.raises(ValueError):
+        HexString(5)
+
+
+def test_pydantic_field():
+
+    class Model(BaseModel):
+        data: HexString
+        optional: Optional[HexString] = None
+
+    m = Model(data='aabb')
+    assert isinstance(m.data, HexString)
+    assert m.data.value == 'aabb'
+    assert Model(data=b'\xaa\xbb') == m
+    assert m.model_dump() == {'data': 'aabb', 'optional': None}
+    assert Model.model_validate_json(m.model_dump_json()) == m
+    with pytest.raises(ValueError):
+        Model(data='xyz')
+
+
+def test_hash():
+    h = HexString('aabb')
+    assert hash.get_sha256(h) == hash.get_sha256('aabb') == hash.get_sha256(b'\xaa\xbb')
@@ -0,0 +1,46 @@
+# Imports
+import random
+import pytest
+
+
+# Local imports
+from project_caesar.code import key_batch
+from project_caesar.code.address import public_key_to_address
+from project_caesar.code.public_key import get_public_key_hash, secret_key_to_public_key
+
+
+def get_secret_keys(n=1000):
+    rng = random.Random(0)
+    keys = [f'{rng.getrandbits(32):08x}' for _ in range(n)]
+    # Edge cases: zero, wrap-around, and keys whose public key has leading zeros.
+    return keys + ['00000000', 'ffffffff', '21524111', '21524110', '00010001']
+
+
+def test_batch_matches_scalar():
+    secret_keys = get_secret_keys()
+    public_keys = [secret_key_to_public_key(sk) for sk in secret_keys]
+    assert key_batch.secret_keys_to_public_keys(secret_keys) == public_keys
+    assert key_batch.get_public_key_hashes(public_keys) == [get_public_key_hash(pk) for pk in public_keys]
+    addresses = [public_key_to_address(pk) for pk in public_keys]
+    assert key_batch.public_keys_to_addresses(public_keys) == addresses
+    assert key_batch.secret_keys_to_addresses(secret_keys) == addresses
+    assert key_batch.derive_addresses(secret_keys) == addresses
+
+
+def test_derive_addresses_in_processes():
+    secret_keys = get_secret_keys(300)
+    expected = key_batch.secret_keys_to_addresses(secret_keys)
+    assert key_batch.derive_addresses(secret_keys, workers=2, chunk_size=100) == expected
+
+
+def test_arrays_match_scalar():
+    pytest.importorskip('numpy')
+    secret_keys = get_secret_keys()
+    public_keys = [secret_key_to_public_key(sk) for sk in secret_keys]
+    secret_key_array = key_batch.hex_to_array(secret_keys)
+    public_key_array = key_batch.secret_keys_to_public_keys_array(secret_key_array)
+    assert key_batch.array_to_hex(public_key_array, pad=False) == public_keys
+    hashes = key_batch.get_public_key_hashes_array(public_key_array)
+    assert key_batch.array_to_hex(hashes) == [get_public_key_hash(pk) for pk in public_keys]
+    address_hashes = key_batch.public_keys_to_addresses_array(public_key_array)
+    assert key_batch.addresses_array_to_addresses(address_hashes) == [public_key_to_address(pk) for pk in public_keys]
@@ -0,0 +1,140 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.mempool import Mempool, get_coinbase_transaction
+from project_caesar.code.node import Node
+from project_caesar.code.output import Output
+from project_caesar.code.signature import sign_input
+from project_caesar.code.transaction import Transaction
+from project_caesar.code.utxo_set import UtxoSet
+from project_caesar.code.validation import BLOCK_REWARD
+
+
+LOCK_SCRIPT = get_genesis_block().transactions[0].outputs[0].lock_script
+SECRET_KEY = '40010001'
+N_COINS = 10
+COIN_VALUE = 100000
+
+
+def get_utxo_set():
+    # A UTXO set with N_COINS coins at height 0, all owned by SECRET_KEY.
+    coinbase = get_coinbase_transaction(0, COIN_VALUE, LOCK_SCRIPT)
+    coinbase.outputs = [Output(value=COIN_VALUE, lock_script=LOCK_SCRIPT) for _ in range(N_COINS)]
+    coinbase.output_count = N_COINS
+    block_0 = get_genesis_block()
+    block_0.transactions = [coinbase]
+    utxo_set = UtxoSet()
+    utxo_set.apply_block(block_0, 0)
+    return utxo_set, coinbase.hash
+
+
+def get_spend(coinbase_hash, output_index, fee, n_outputs=1):
+    tx = Transaction(
+        input_count=1,
+        output_count=n_outputs,
+        fee=fee,
+        inputs=[Input(previous_output={'block_height': 0, 'transaction_hash': coinbase_hash, 'output_index': output_index})],
+        outputs=[Output(value=(COIN_VALUE - fee) // n_outputs, lock_script=LOCK_SCRIPT) for _ in range(n_outputs)],
+    )
+    tx.fee = COIN_VALUE - sum(o.value for o in tx.outputs)
+    tx.inputs[0].unlock_script = sign_input(tx, 0, SECRET_KEY)
+    tx.invalidate_cache()
+    return tx
+
+
+def test_add_and_order_by_fee_rate():
+    utxo_set, coinbase_hash = get_utxo_set()
+    mempool = Mempool(utxo_set)
+    txs = [get_spend(coinbase_hash, i, fee) for i, fee in enumerate([100, 300, 200])]
+    for tx in txs:
+        mempool.add_transaction(tx)
+    assert len(mempool) == 3
+    selected, size, fees = mempool.select_transactions(10000)
+    assert selected == [txs[1], txs[2], txs[0]]
+    assert fees == 600
+    assert size == sum(len(tx.to_bytes()) for tx in txs)
+    # Fee rate is fee per byte: a larger transaction with the same fee comes later.
+    big = get_spend(coinbase_hash, 3, 300, n_outputs=5)
+    mempool.add_transaction(big)
+    selected, _, _ = mempool.select_transactions(10000)
+    assert selected.index(big) > selected.index(txs[1])
+
+
+def test_select_respects_size():
+    utxo_set, coinbase_hash = get_utxo_set()
+    mempool = Mempool(utxo_set)
+    txs = [get_spend(coinbase_hash, i, 100 + i) for i in range(5)]
+    for tx in txs:
+        mempool.add_transaction(tx)
+    size = len(txs[0].to_bytes())
+    selected, total_size, _ = mempool.select_transactions(2 * size + 1)
+    assert selected == [txs[4], txs[3]]
+    assert total_size <= 2 * size + 1
+
+
+def test_reject_double_spend_and_invalid():
+    utxo_set, coinbase_hash = get_utxo_set()
+    mempool = Mempool(utxo_set)
+    tx = get_spend(coinbase_hash, 0, 100)
+    mempool.add_transaction(tx)
+    assert mempool.get_spender((0, coinbase_hash, 0)) == tx.hash
+    with pytest.raises(ValueError, match='already in the mempool'):
+        mempool.add_transaction(tx)
+    with pytest.raises(ValueError, match='already spends'):
+        mempool.add_transaction(get_spend(coinbase_hash, 0, 200))
+    with pytest.raises(ValueError, match='missing or spent'):
+        mempool.add_transaction(get_spend(coinbase_hash, N_COINS, 100))
+    bad_signature = get_spend(coinbase_hash, 1, 100)
+    bad_signature.inputs[0].unlock_script = sign_input(bad_signature, 0, '40010002')
+    bad_signature.invalidate_cache()
+    with pytest.raises(ValueError, match='script'):
+        mempool.add_transaction(bad_signature)
+    assert len(mempool) == 1
+
+
+def test_evict_lowest_fee_rate():
+    utxo_set, coinbase_hash = get_utxo_set()
+    txs = [get_spend(coinbase_hash, i, 100 * (i + 1)) for i in range(4)]
+    max_size = sum(len(tx.to_bytes()) for tx in txs[1:]) + 10
+    mempool = Mempool(utxo_set, max_size=max_size)
+    for tx in txs[1:]:
+        mempool.add_transaction(tx)
+    with pytest.raises(ValueError, match='too low a fee rate'):
+        mempool.add_transaction(txs[0])
+    mempool.add_transaction(get_spend(coinbase_hash, 5, 1000))
+    assert len(mempool) == 3
+    assert txs[1].hash not in mempool
+    assert mempool.get_spender((0, coinbase_hash, 1)) is None
+    assert mempool.size <= max_size
+
+
+def test_block_template_and_remove_block():
+    with Node() as node:
+        spend = get_spend_from_genesis(node)
+        node.mempool.add_transaction(spend)
+        template = node.mempool.get_block_template(node.tip, LOCK_SCRIPT)
+        assert template.transactions == [spend]
+        assert template.fees == spend.fee
+        block = template.block
+        assert block.transactions[0].outputs[0].value == BLOCK_REWARD + spend.fee
+        node.process_block(block)
+        assert node.height == 1
+        assert len(node.mempool) == 0
+
+
+def get_spend_from_genesis(node):
+    coinbase_hash = node.tip.transactions[0].hash
+    tx = Transaction(
+        input_count=1,
+        output_count=1,
+        fee=500,
+        inputs=[Input(previous_output={'block_height': 0, 'transaction_hash': coinbase_hash, 'output_index': 0})],
+        outputs=[Output(value=BLOCK_REWARD - 500, lock_script=LOCK_SCRIPT)],
+    )
+    tx.inputs[0].unlock_script = sign_input(tx, 0, SECRET_KEY)
+    tx.invalidate_cache()
+    return tx
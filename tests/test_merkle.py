@@ -0,0 +1,58 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.merkle import MerkleTree
+from project_caesar.utils import hash
+
+
+def get_leaves(n):
+    return [hash.get_sha256(i.to_bytes(4, 'big')) for i in range(n)]
+
+
+def get_root_naive(leaves):
+    level = [bytes.fromhex(x) for x in leaves]
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level.append(level[-1])
+        level = [bytes.fromhex(hash.get_sha256(level[i] + level[i + 1])) for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def test_single_transaction_root_is_transaction_hash():
+    block_0 = get_genesis_block()
+    assert block_0.merkle_root == block_0.transactions[0].hash
+
+
+def test_empty_tree_has_no_root():
+    with pytest.raises(ValueError):
+        MerkleTree().root
+
+
+@pytest.mark.parametrize('n', [2, 3, 5, 8, 13])
+def test_root_matches_naive_computation(n):
+    leaves = get_leaves(n)
+    assert MerkleTree(leaves).root == get_root_naive(leaves)
+
+
+def test_append_and_replace_match_rebuild():
+    leaves = get_leaves(9)
+    tree = MerkleTree(leaves[:1])
+    for leaf in leaves[1:]:
+        tree.append(leaf)
+        assert tree.root == MerkleTree(tree.levels[0][i].hex() for i in range(len(tree))).root
+    assert tree.root == get_root_naive(leaves)
+    leaves[4] = hash.get_sha256(b'replacement')
+    tree.replace(4, leaves[4])
+    assert tree.root == get_root_naive(leaves)
+
+
+def test_inclusion_proofs():
+    leaves = get_leaves(7)
+    tree = MerkleTree(leaves)
+    for index, leaf in enumerate(leaves):
+        proof = tree.get_proof(index)
+        assert MerkleTree.verify_proof(leaf, index, proof, tree.root)
+        assert not MerkleTree.verify_proof(leaves[(index + 1) % 7], index, proof, tree.root)
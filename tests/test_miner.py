@@ -0,0 +1,41 @@
+# Imports
+import threading
+
+
+# Local imports
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.miner import Miner
+
+
+def test_mine_block():
+    block = get_genesis_block()
+    block.mining_difficulty_threshold = 10
+    with Miner(workers=2, chunk_size=1000) as miner:
+        result = miner.mine(block)
+    assert result.nonce is not None
+    assert block.nonce == result.nonce
+    assert block.hash == result.block_hash
+    assert block.meets_difficulty
+    assert result.hashes_per_second > 0
+
+
+def test_mine_gives_up_after_max_attempts():
+    block = get_genesis_block()
+    block.mining_difficulty_threshold = 256
+    with Miner(workers=2, chunk_size=100) as miner:
+        result = miner.mine(block, max_attempts=1000)
+    assert result.nonce is None
+    assert result.attempts == 1000
+    assert not result.cancelled
+
+
+def test_cancel_mining():
+    block = get_genesis_block()
+    block.mining_difficulty_threshold = 256
+    with Miner(workers=2, chunk_size=10000) as miner:
+        timer = threading.Timer(0.2, miner.cancel)
+        timer.start()
+        result = miner.mine(block)
+        timer.join()
+    assert result.nonce is None
+    assert result.cancelled
@@ -0,0 +1,17 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.utils.misc import int_to_iso_timestamp, iso_timestamp_to_int
+
+
+@pytest.mark.parametrize('time_zone', ['UTC', 'America/New_York', 'Asia/Tokyo'])
+def test_timestamps_are_utc(set_time_zone, time_zone):
+    set_time_zone(time_zone)
+    assert int_to_iso_timestamp(0) == '1970-01-01T00:00:00Z'
+    assert iso_timestamp_to_int('2024-11-18T08:00:00Z') == 1731916800
+    # 01:30 happens twice in New York on 2024-11-03 (the end of daylight saving time).
+    for int_timestamp in (1730611800, 1730615400):
+        assert iso_timestamp_to_int(int_to_iso_timestamp(int_timestamp)) == int_timestamp
+    assert int_to_iso_timestamp(1730615400) == '2024-11-03T06:30:00Z'
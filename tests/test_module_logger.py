@@ -0,0 +1,49 @@
+# Imports
+import time
+
+
+# Local imports
+from project_caesar.utils import module_logger
+
+
+# Logger
+logger, log, deb = module_logger.create_logger(__file__)
+
+
+def get_installed_handlers():
+    return [h for h in logger.handlers if getattr(h, module_logger.HANDLER_MARKER, False)]
+
+
+def test_configure_logger_is_idempotent():
+    logger_config = module_logger.LoggerConfig()
+    for _ in range(3):
+        module_logger.configure_logger(logger, logger_config)
+    assert len(get_installed_handlers()) == 1
+
+
+def test_queue_logging(tmp_path):
+    log_file = tmp_path / 'log.txt'
+    logger_config = module_logger.LoggerConfig(
+        log_level='debug',
+        log_to_file=True,
+        log_file=log_file,
+        log_queue=True,
+        log_flush_interval=0.05,
+    )
+    try:
+        for _ in range(2):
+            module_logger.configure_logger(logger, logger_config)
+        assert get_installed_handlers() == [module_logger._queue_handler]
+        for i in range(1000):
+            deb(f"Message {i}")
+        # The listener flushes the file once the queue has been empty for the flush interval.
+        deadline = time.monotonic() + 5
+        while log_file.read_text().count('\n') < 1000 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == 1000
+        assert lines[-1].endswith("Message 999")
+    finally:
+        module_logger.configure_logger(logger, module_logger.LoggerConfig())
+        module_logger.stop_queue_listener()
+    assert module_logger._queue_handler not in logger.handlers
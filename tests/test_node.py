@@ -0,0 +1,128 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.block import Block
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.node import Node
+from project_caesar.code.output import Output
+from project_caesar.code.signature import sign_input
+from project_caesar.code.transaction import Transaction
+from project_caesar.code.validation import BLOCK_REWARD, BlockValidationError
+
+
+LOCK_SCRIPT = get_genesis_block().transactions[0].outputs[0].lock_script
+# A toy secret key whose public key hash is the one in the genesis lock script.
+SECRET_KEY = '40010001'
+
+
+def get_coinbase(n_outputs=1):
+    coinbase = get_genesis_block().transactions[0]
+    value = BLOCK_REWARD // n_outputs
+    coinbase.outputs = [Output(value=value, lock_script=LOCK_SCRIPT) for _ in range(n_outputs)]
+    coinbase.output_count = n_outputs
+    return coinbase
+
+
+def get_spend(outpoints, value, fee, secret_key=SECRET_KEY):
+    tx = Transaction(
+        input_count=len(outpoints),
+        output_count=1,
+        fee=fee,
+        inputs=[
+            Input(previous_output={'block_height': h, 'transaction_hash': t, 'output_index': i})
+            for h, t, i in outpoints
+        ],
+        outputs=[Output(value=value - fee, lock_script=LOCK_SCRIPT)],
+    )
+    for index, i in enumerate(tx.inputs):
+        i.unlock_script = sign_input(tx, index, secret_key)
+    tx.invalidate_cache()
+    return tx
+
+
+def get_block(previous_block, transactions):
+    return Block(
+        version=1,
+        previous_block={'block_height': previous_block.header.height, 'block_hash': previous_block.hash},
+        timestamp='2024-11-18T08:19:09Z',
+        mining_difficulty_threshold=0,
+        nonce=0,
+        transaction_count=len(transactions),
+        transactions=transactions,
+    )
+
+
+def test_process_valid_block():
+    with Node() as node:
+        block_0 = node.tip
+        spend = get_spend([(0, block_0.transactions[0].hash, 0)], BLOCK_REWARD, fee=100)
+        block_1 = get_block(block_0, [get_coinbase(), spend])
+        timings = node.process_block(block_1)
+        assert list(timings) == ['stateless', 'inputs', 'scripts', 'apply']
+        assert node.height == 1
+        assert node.tip.hash == block_1.hash
+        assert (1, spend.hash, 0) in node.utxo_set
+
+
+def test_reject_wrong_transaction_count():
+    with Node() as node:
+        block_1 = get_block(node.tip, [get_coinbase()])
+        block_1.transaction_count = 2
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(block_1)
+        assert e.value.stage == 'stateless'
+        assert node.height == 0
+
+
+def test_reject_wrong_merkle_root():
+    with Node() as node:
+        block_1 = get_block(node.tip, [get_coinbase()])
+        header = block_1.header.model_copy(update={'merkle_root': '00' * 32})
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(Block.from_header(header, block_1.transactions))
+        assert e.value.stage == 'stateless'
+
+
+def test_reject_missing_input():
+    with Node() as node:
+        spend = get_spend([(0, '11' * 32, 0)], BLOCK_REWARD, fee=0)
+        block_1 = get_block(node.tip, [get_coinbase(), spend])
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(block_1)
+        assert e.value.stage == 'inputs'
+        assert node.height == 0
+
+
+def test_reject_invalid_signature():
+    with Node() as node:
+        spend = get_spend([(0, node.tip.transactions[0].hash, 0)], BLOCK_REWARD, fee=0, secret_key='40010002')
+        block_1 = get_block(node.tip, [get_coinbase(), spend])
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(block_1)
+        assert e.value.stage == 'scripts'
+        assert node.height == 0
+
+
+def test_reject_excess_coinbase_value():
+    with Node() as node:
+        coinbase = get_coinbase()
+        coinbase.outputs[0].value = BLOCK_REWARD + 1
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(get_block(node.tip, [coinbase]))
+        assert e.value.stage == 'inputs'
+
+
+def test_parallel_script_verification():
+    n = 70
+    with Node(script_workers=2) as node:
+        coinbase = get_coinbase(n_outputs=n)
+        block_1 = get_block(node.tip, [coinbase])
+        node.process_block(block_1)
+        outpoints = [(1, coinbase.hash, i) for i in range(n)]
+        spend = get_spend(outpoints, sum(o.value for o in coinbase.outputs), fee=0)
+        block_2 = get_block(block_1, [get_coinbase(), spend])
+        node.process_block(block_2)
+        assert node.height == 2
@@ -0,0 +1,102 @@
+# Imports
+import asyncio
+import struct
+
+import pytest
+
+
+# Local imports
+from project_caesar.code.block_header import TIMESTAMP_OFFSET
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.node import Node
+from project_caesar.code.p2p import LocalNetwork, P2PNode
+from project_caesar.code.p2p_messages import INV_BLOCK, INV_TRANSACTION, decode_inventory, encode_inventory
+from project_caesar.code.p2p_messages import encode_message, read_message
+from project_caesar.utils.serialization import write_bytes, write_compact_size, write_int
+
+
+def test_message_framing():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message('inv', b'abc') + encode_message('verack'))
+        reader.feed_eof()
+        assert await read_message(reader) == ('inv', b'abc')
+        assert await read_message(reader) == ('verack', b'')
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_message(reader)
+    asyncio.run(run())
+
+
+def test_inventory_encoding():
+    items = [(INV_TRANSACTION, '11' * 32), (INV_BLOCK, '22' * 32)]
+    assert decode_inventory(encode_inventory(items)) == items
+    with pytest.raises(ValueError):
+        decode_inventory(encode_inventory(items)[:-1])
+
+
+def test_relay_blocks_and_transactions():
+    generator = ChainGenerator(seed=1, transactions_per_block=20, max_inputs=1, max_outputs=4, n_keys=10)
+    blocks = list(generator.generate_blocks(5))
+    transactions = generator.generate_spends(100)
+
+    async def run():
+        async with LocalNetwork(3, topology='line') as network:
+            first, last = network.nodes[0], network.nodes[-1]
+            # Blocks are announced, requested and relayed across the line of nodes.
+            for block in blocks:
+                first.submit_block(block)
+                await network.wait_until(lambda: last.node.height == block.header.height)
+            assert last.node.tip.hash == blocks[-1].hash
+            for tx in transactions:
+                first.submit_transaction(tx)
+            await network.wait_until(lambda: all(len(n.node.mempool) == len(transactions) for n in network.nodes))
+            # The middle node announced each item once to each peer (not back to its source).
+            middle = network.nodes[1]
+            assert all(tx.hash in peer.known_inventory for peer in middle.peers for tx in transactions)
+    asyncio.run(run())
+
+
+def get_transaction_bytes(lock_script):
+    # A transaction without inputs, with one output that has the given lock script bytes.
+    buffer = bytearray()
+    for n in (0, 1, 0, 1000):
+        write_int(buffer, n)
+    write_bytes(buffer, lock_script)
+    return bytes(buffer)
+
+
+def test_malformed_messages_disconnect_the_peer():
+    header = bytearray(get_genesis_block().header.to_bytes())
+    struct.pack_into('<Q', header, TIMESTAMP_OFFSET, 2 ** 62)
+    header = bytes(header)
+    headers = bytearray()
+    write_compact_size(headers, 1)
+    headers += header
+    messages = [
+        ('tx', get_transaction_bytes(b'\x4c')),
+        ('tx', get_transaction_bytes(b'\x4d\x01')),
+        ('block', header),
+        ('headers', bytes(headers)),
+        ('cmpctblock', header),
+        ('failing', b''),
+    ]
+
+    def fail(peer, payload):
+        raise RuntimeError("Unexpected error")
+
+    async def run():
+        with Node() as node:
+            async with P2PNode(node) as p2p_node:
+                p2p_node.handlers['failing'] = fail
+                for command, payload in messages:
+                    reader, writer = await asyncio.open_connection(p2p_node.host, p2p_node.port)
+                    assert (await read_message(reader))[0] == 'version'
+                    tasks = set(p2p_node._tasks)
+                    writer.write(encode_message(command, payload))
+                    # The node closes the connection, and the peer's task ends without an error.
+                    await asyncio.wait_for(reader.read(), 5)
+                    await asyncio.wait_for(asyncio.gather(*tasks), 5)
+                    assert not p2p_node.peers
+                    writer.close()
+    asyncio.run(run())
@@ -0,0 +1,168 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.block import Block
+from project_caesar.code.block_index import BlockIndex
+from project_caesar.code.chain_generator import GENESIS_SECRET_KEY, Key
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.mempool import get_coinbase_transaction
+from project_caesar.code.node import Node
+from project_caesar.code.output import Output
+from project_caesar.code.signature import sign_input
+from project_caesar.code.transaction import Transaction
+from project_caesar.code.validation import BLOCK_REWARD, BlockValidationError
+
+
+KEY = Key.from_secret_key(GENESIS_SECRET_KEY)
+GENESIS_OUTPOINT = (0, get_genesis_block().transactions[0].hash, 0)
+
+
+def get_block(previous_block, transactions=(), tag=0, coinbase_value=BLOCK_REWARD):
+    # The tag (in the timestamp) makes blocks on different branches distinct.
+    height = previous_block.header.height + 1
+    coinbase = get_coinbase_transaction(height, coinbase_value, KEY.lock_script)
+    return Block(
+        version=1,
+        previous_block={'block_height': previous_block.header.height, 'block_hash': previous_block.hash},
+        timestamp=f'2024-11-18T08:{10 + height:02d}:{tag:02d}Z',
+        mining_difficulty_threshold=0,
+        nonce=0,
+        transaction_count=len(transactions) + 1,
+        transactions=[coinbase] + list(transactions),
+    )
+
+
+def get_branch(previous_block, n, tag, first_transactions=()):
+    blocks = []
+    for i in range(n):
+        previous_block = get_block(previous_block, first_transactions if i == 0 else (), tag)
+        blocks.append(previous_block)
+    return blocks
+
+
+def get_spend(outpoint, value, fee=10):
+    tx = Transaction(
+        input_count=1,
+        output_count=1,
+        fee=fee,
+        inputs=[Input(previous_output=dict(zip(('block_height', 'transaction_hash', 'output_index'), outpoint)))],
+        outputs=[Output(value=value - fee, lock_script=KEY.lock_script)],
+    )
+    tx.inputs[0].unlock_script = sign_input(tx, 0, GENESIS_SECRET_KEY)
+    tx.invalidate_cache()
+    return tx
+
+
+def test_reorganize_to_longer_branch():
+    with Node(address_index=True) as node:
+        genesis = node.tip
+        spend = get_spend(GENESIS_OUTPOINT, BLOCK_REWARD)
+        branch_a = get_branch(genesis, 2, tag=1, first_transactions=[spend])
+        branch_b = get_branch(genesis, 3, tag=2)
+        for block in branch_a:
+            node.process_block(block)
+        assert GENESIS_OUTPOINT not in node.utxo_set
+        # A branch with less or equal work is stored, but does not become the main chain.
+        for block in branch_b[:2]:
+            assert 'reorg' not in node.process_block(block)
+        assert node.tip.hash == branch_a[-1].hash
+        assert node.has_block(branch_b[1].hash)
+        timings = node.process_block(branch_b[2])
+        assert 'reorg' in timings
+        assert node.height == 3
+        assert [node.get_block(h).hash for h in range(1, 4)] == [b.hash for b in branch_b]
+        # The UTXO set and address index follow the new branch, and the spend is back in the mempool.
+        assert GENESIS_OUTPOINT in node.utxo_set
+        assert (1, spend.hash, 0) not in node.utxo_set
+        assert (3, branch_b[2].transactions[0].hash, 0) in node.utxo_set
+        assert node.address_index.get_balance(KEY.address) == BLOCK_REWARD * 4
+        assert spend.hash in node.mempool
+        # The old branch can become the main chain again.
+        for block in get_branch(branch_a[-1], 2, tag=1):
+            node.process_block(block)
+        assert node.height == 4
+        assert node.get_block(1).hash == branch_a[0].hash
+        assert spend.hash not in node.mempool
+
+
+def test_reorganize_away_from_block_that_spends_its_own_output():
+    with Node() as node:
+        genesis = node.tip
+        spend = get_spend(GENESIS_OUTPOINT, BLOCK_REWARD)
+        spend_of_spend = get_spend((1, spend.hash, 0), spend.outputs[0].value)
+        branch_a = get_branch(genesis, 1, tag=1, first_transactions=[spend, spend_of_spend])
+        branch_b = get_branch(genesis, 2, tag=2)
+        node.process_block(branch_a[0])
+        coins = len(node.utxo_set)
+        for block in branch_b:
+            node.process_block(block)
+        assert node.tip.hash == branch_b[-1].hash
+        # Disconnecting the old branch leaves none of its outputs behind, including the one it spent itself.
+        assert (1, spend.hash, 0) not in node.utxo_set
+        assert (1, spend_of_spend.hash, 0) not in node.utxo_set
+        assert GENESIS_OUTPOINT in node.utxo_set
+        assert len(node.utxo_set) == coins + 1
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(get_block(branch_b[-1], [get_spend((1, spend.hash, 0), spend.outputs[0].value)], 2))
+        assert e.value.stage == 'inputs'
+        assert node.tip.hash == branch_b[-1].hash
+
+
+def test_invalid_branch_is_rejected():
+    with Node() as node:
+        genesis = node.tip
+        branch_a = get_branch(genesis, 1, tag=1)
+        node.process_block(branch_a[0])
+        block_b1 = get_block(genesis, tag=2)
+        block_b2 = get_block(block_b1, tag=2, coinbase_value=BLOCK_REWARD + 1)
+        node.process_block(block_b1)
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(block_b2)
+        assert e.value.stage == 'inputs'
+        # The node returns to the old branch, and blocks that build on the invalid block are rejected.
+        assert node.tip.hash == branch_a[0].hash
+        assert block_b2.hash in node.block_index.invalid
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(get_block(block_b2, tag=2))
+        assert e.value.stage == 'stateless'
+
+
+def test_unknown_previous_block():
+    with Node() as node:
+        orphan = get_block(get_block(node.tip, tag=1), tag=1)
+        with pytest.raises(BlockValidationError) as e:
+            node.process_block(orphan)
+        assert e.value.stage == 'stateless'
+
+
+def test_reorganization_survives_restart(tmp_path):
+    with Node(str(tmp_path)) as node:
+        genesis = node.tip
+        for block in get_branch(genesis, 2, tag=1):
+            node.process_block(block)
+        branch_b = get_branch(genesis, 3, tag=2)
+        for block in branch_b:
+            node.process_block(block)
+    with Node(str(tmp_path)) as node:
+        assert node.height == 3
+        assert node.tip.hash == branch_b[-1].hash
+        assert len(node.block_index) == 6
+        assert node.utxo_set.block_hash == branch_b[-1].hash
+
+
+def test_fork_point():
+    index = BlockIndex()
+    genesis = get_genesis_block()
+    index.add_header(genesis.header)
+    branch_a = get_branch(genesis, 3, tag=1)
+    branch_b = get_branch(branch_a[0], 4, tag=2)
+    entries_a = [index.add_header(b.header) for b in branch_a]
+    entries_b = [index.add_header(b.header) for b in branch_b]
+    assert index.best_tip == entries_b[-1]
+    assert index.get_fork_point(entries_a[-1], entries_b[-1]) == entries_a[0]
+    assert index.get_branch(entries_a[0], entries_b[-1]) == entries_b
+    index.mark_invalid(branch_b[1].hash)
+    assert index.best_tip == entries_a[-1]
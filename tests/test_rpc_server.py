@@ -0,0 +1,71 @@
+# Imports
+import asyncio
+import json
+
+import pytest
+
+
+# Local imports
+from project_caesar.code.chain_generator import ChainGenerator
+from project_caesar.code.node import Node
+from project_caesar.code.rpc_server import INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, REJECTED
+from project_caesar.code.rpc_server import RpcClient, RpcError, RpcServer
+
+
+def test_rpc_server():
+    generator = ChainGenerator(seed=1, transactions_per_block=5, n_keys=10)
+    blocks = list(generator.generate_blocks(10))
+    pooled, submitted_json, submitted_hex = generator.generate_spends(3)
+
+    async def run():
+        with Node(address_index=True) as node:
+            for block in blocks:
+                node.process_block(block)
+            node.mempool.add_transaction(pooled)
+            async with RpcServer(node) as server, RpcClient(server.host, server.port) as client:
+                tip = blocks[-1]
+                assert await client.call('get_tip') == {'height': 10, 'hash': tip.hash}
+                result = await client.call('get_block')
+                assert result['hash'] == tip.hash and result['height'] == 10
+                assert result == await client.call('get_block', hash=tip.hash)
+                assert (await client.call('get_block', height=3))['hash'] == blocks[2].hash
+                assert await client.call('get_block', height=11) is None
+                # Confirmed transactions are found with a height, or through the address index.
+                tx = blocks[4].transactions[1]
+                result = await client.call('get_transaction', tx.hash)
+                assert result['block_height'] == 5 and result['block_hash'] == blocks[4].hash
+                assert result['transaction'] == json.loads(json.dumps(tx.to_json()))
+                assert await client.call('get_transaction', tx.hash, 5) == result
+                assert await client.call('get_transaction', tx.hash, 6) is None
+                assert (await client.call('get_transaction', pooled.hash))['block_height'] is None
+                coinbase = tip.transactions[0]
+                utxo = await client.call('get_utxo', 10, coinbase.hash, 0)
+                assert utxo == {'value': coinbase.outputs[0].value, 'lock_script': coinbase.outputs[0].lock_script}
+                assert await client.call('get_utxo', 10, coinbase.hash, 1) is None
+                # Transactions are submitted as JSON or serialized.
+                assert await client.call('submit_transaction', submitted_json.to_json()) == submitted_json.hash
+                assert await client.call('submit_transaction', submitted_hex.to_bytes().hex()) == submitted_hex.hash
+                assert submitted_json.hash in node.mempool and submitted_hex.hash in node.mempool
+                with pytest.raises(RpcError) as e:
+                    await client.call('submit_transaction', submitted_hex.to_bytes().hex())
+                assert e.value.code == REJECTED
+                with pytest.raises(RpcError) as e:
+                    await client.call('get_block', hash='xyz')
+                assert e.value.code == INVALID_PARAMS
+                # A batch gets one response, in call order; errors are per call.
+                results = await client.batch([
+                    ('get_tip', []),
+                    ('get_block', {'height': 1}),
+                    ('no_such_method', []),
+                    ('get_tip', ['unexpected']),
+                ])
+                assert results[0]['hash'] == tip.hash
+                assert results[1]['hash'] == blocks[0].hash
+                assert [e.code for e in results[2:]] == [METHOD_NOT_FOUND, INVALID_PARAMS]
+                status, body = await client.post(b'[{"jsonrpc": "2.0", "method": "get_tip"}]')
+                assert status == 204 and body == b''
+                status, body = await client.post(b'{')
+                assert json.loads(body)['error']['code'] == PARSE_ERROR
+                # Every request went over one keep-alive connection.
+                assert len(server._writers) == 1
+    asyncio.run(run())
@@ -0,0 +1,102 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.gaius import script_to_bytes
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.output import Output
+from project_caesar.code.script_interpreter import ScriptError, compile_lock_script, compile_script, execute
+from project_caesar.code.script_interpreter import verify_script
+from project_caesar.code.signature import get_signature_hash, sign_input, verify_signature
+from project_caesar.code.transaction import Transaction
+
+
+SECRET_KEY = '40010001'
+PUBLIC_KEY_HASH = 'f575f780'
+LOCK_SCRIPT = f'OP_DUPLICATE OP_HASH_160 {PUBLIC_KEY_HASH} OP_EQUAL_VERIFY OP_CHECK_SIGNATURE'
+
+
+def get_signed_transaction():
+    coinbase = get_genesis_block().transactions[0]
+    tx = Transaction(
+        input_count=1,
+        output_count=1,
+        fee=0,
+        inputs=[Input(previous_output={'block_height': 0, 'transaction_hash': coinbase.hash, 'output_index': 0})],
+        outputs=[Output(value=1000, lock_script=LOCK_SCRIPT)],
+    )
+    tx.inputs[0].unlock_script = sign_input(tx, 0, SECRET_KEY)
+    tx.invalidate_cache()
+    return tx
+
+
+def get_checker(tx):
+    message_hash = get_signature_hash(tx, 0)
+    return lambda signature, public_key: verify_signature(public_key, message_hash, signature)
+
+
+def test_compile_script():
+    compiled = compile_script(script_to_bytes(LOCK_SCRIPT))
+    assert compiled.public_key_hash == bytes.fromhex(PUBLIC_KEY_HASH)
+    assert not compiled.push_only
+    assert len(compiled.ops) == 5
+    # Compiled lock scripts are cached.
+    assert compile_lock_script(script_to_bytes(LOCK_SCRIPT)) is compile_lock_script(script_to_bytes(LOCK_SCRIPT))
+    assert compile_lock_script(script_to_bytes(LOCK_SCRIPT)) == compiled
+    assert compile_script(script_to_bytes('OP_0 aabb')).push_only
+
+
+def test_compile_invalid_script():
+    with pytest.raises(ScriptError):
+        compile_script(bytes.fromhex('ff'))
+    with pytest.raises(ScriptError):
+        compile_script(bytes.fromhex('05aabb'))
+
+
+def test_verify_pay_to_public_key_hash():
+    tx = get_signed_transaction()
+    unlock_script = script_to_bytes(tx.inputs[0].unlock_script)
+    lock_script = script_to_bytes(LOCK_SCRIPT)
+    compile_lock_script.cache_clear()
+    assert verify_script(unlock_script, lock_script, get_checker(tx))
+    # Only the lock script is cached.
+    assert compile_lock_script.cache_info().currsize == 1
+    # The signature covers the outputs.
+    tx.outputs[0].value = 999
+    tx.invalidate_cache()
+    assert not verify_script(unlock_script, lock_script, get_checker(tx))
+
+
+def test_fast_path_matches_generic_execution():
+    tx = get_signed_transaction()
+    checker = get_checker(tx)
+    signature, public_key = tx.inputs[0].unlock_script.split()
+    lock = compile_script(script_to_bytes(LOCK_SCRIPT))
+    for unlock_script in [f'{signature} {public_key}', f'{signature} 1eaebef1', f'00000000 {public_key}']:
+        fast = verify_script(script_to_bytes(unlock_script), script_to_bytes(LOCK_SCRIPT), checker)
+        stack = []
+        try:
+            execute(compile_script(script_to_bytes(unlock_script)), stack, checker)
+            execute(lock, stack, checker)
+            generic = bool(stack) and any(stack[-1])
+        except ScriptError:
+            generic = False
+        assert fast == generic
+
+
+def test_generic_scripts():
+    def checker(signature, public_key):
+        return False
+    assert verify_script(script_to_bytes('aa'), script_to_bytes('aa OP_EQUAL'), checker)
+    assert not verify_script(script_to_bytes('aa'), script_to_bytes('bb OP_EQUAL'), checker)
+    assert not verify_script(script_to_bytes('aa'), script_to_bytes('OP_EQUAL'), checker)
+    assert not verify_script(script_to_bytes('OP_0'), script_to_bytes('OP_VERIFY aa'), checker)
+    # Unlock scripts may only push data.
+    assert not verify_script(script_to_bytes('aa OP_DUPLICATE'), script_to_bytes('OP_EQUAL'), checker)
+
+
+def test_stack_size_is_bounded():
+    lock_script = script_to_bytes(' '.join(['OP_DUPLICATE'] * 1000))
+    assert not verify_script(script_to_bytes('aa'), lock_script, lambda signature, public_key: True)
@@ -0,0 +1,101 @@
+# Imports
+import hashlib
+import random
+
+
+# Local imports
+from project_caesar.code import secp256k1
+from project_caesar.code.gaius import script_to_bytes
+from project_caesar.code.input import Input
+from project_caesar.code.node import Node
+from project_caesar.code.output import Output
+from project_caesar.code.public_key import get_public_key_hash
+from project_caesar.code.signature import SignatureCache, sign_input, signature_cache, verify_signature
+from project_caesar.code.transaction import Transaction
+from project_caesar.code.validation import verify_input_script
+
+
+SECRET_KEY_1 = (1).to_bytes(32, 'big')
+# RFC 6979 test vector for secp256k1 (secret key 1, message 'Satoshi Nakamoto'), with a low s value.
+MESSAGE_HASH = hashlib.sha256(b'Satoshi Nakamoto').digest()
+NONCE = 0x8F8A276C19F4149656B280621E358CCE24F5F52542772691EE69063B74F15D15
+SIGNATURE = bytes.fromhex(
+    '934b1ea10a4b3c1757e2b0c017d0b6143ce3c9a7e6a4a49860d7a6ab210ee3d8'
+    '2442ce9d2b916064108014783e923ec36b49743e2ffa1c4496f01a512aafd9e5'
+)
+
+
+def test_public_key():
+    assert secp256k1.get_public_key(SECRET_KEY_1) == secp256k1.encode_point(secp256k1.G)
+    public_key = secp256k1.get_public_key(bytes.fromhex('ab' * 32))
+    assert secp256k1.encode_point(secp256k1.decode_point(public_key)) == public_key
+
+
+def test_multiply():
+    rng = random.Random(0)
+    for _ in range(10):
+        k = rng.randrange(1, secp256k1.N)
+        assert secp256k1.multiply_generator(k) == secp256k1.multiply(k, secp256k1.G)
+    assert secp256k1.multiply_generator(secp256k1.N) is None
+
+
+def test_sign_and_verify():
+    assert secp256k1.get_nonce(1, MESSAGE_HASH) == NONCE
+    assert secp256k1.sign(SECRET_KEY_1, MESSAGE_HASH) == SIGNATURE
+    public_key = secp256k1.get_public_key(SECRET_KEY_1)
+    assert secp256k1.verify(public_key, MESSAGE_HASH, SIGNATURE)
+    assert not secp256k1.verify(public_key, hashlib.sha256(b'other').digest(), SIGNATURE)
+    assert not secp256k1.verify(secp256k1.get_public_key(bytes.fromhex('ab' * 32)), MESSAGE_HASH, SIGNATURE)
+    # The high-s form of the same signature is rejected.
+    s = int.from_bytes(SIGNATURE[32:], 'big')
+    assert not secp256k1.verify(public_key, MESSAGE_HASH, SIGNATURE[:32] + (secp256k1.N - s).to_bytes(32, 'big'))
+    assert not secp256k1.verify(b'\x02' + b'\xff' * 32, MESSAGE_HASH, SIGNATURE)
+
+
+def test_ecdsa_spend_and_signature_cache():
+    secret_key = 'ab' * 32
+    public_key = secp256k1.get_public_key(bytes.fromhex(secret_key)).hex()
+    lock_script = f'OP_DUPLICATE OP_HASH_160 {get_public_key_hash(public_key)} OP_EQUAL_VERIFY OP_CHECK_SIGNATURE'
+    with Node() as node:
+        block_0 = node.tip
+        template = node.mempool.get_block_template(block_0, lock_script, timestamp='2024-11-18T09:00:00Z')
+        node.process_block(template.block)
+        coinbase = template.block.transactions[0]
+        tx = Transaction(
+            input_count=1,
+            output_count=1,
+            fee=0,
+            inputs=[Input(previous_output={'block_height': 1, 'transaction_hash': coinbase.hash, 'output_index': 0})],
+            outputs=[Output(value=coinbase.outputs[0].value, lock_script=lock_script)],
+        )
+        tx.inputs[0].unlock_script = sign_input(tx, 0, secret_key)
+        tx.invalidate_cache()
+        signature_cache.clear()
+        lock_script_bytes = script_to_bytes(lock_script)
+        assert not verify_input_script(tx, 0, lock_script_bytes, cache_only=True)
+        node.mempool.add_transaction(tx)
+        # The signature was verified at mempool admission, so it is now in the cache.
+        assert verify_input_script(tx, 0, lock_script_bytes, cache_only=True)
+        template = node.mempool.get_block_template(node.tip, lock_script, timestamp='2024-11-18T09:01:00Z')
+        node.process_block(template.block)
+        assert node.height == 2
+
+
+def test_signature_cache_only_stores_valid_signatures():
+    signature_cache.clear()
+    public_key = secp256k1.get_public_key(SECRET_KEY_1)
+    bad_signature = SIGNATURE[:-1] + b'\x00'
+    assert not verify_signature(public_key, MESSAGE_HASH, bad_signature)
+    assert len(signature_cache) == 0
+    assert verify_signature(public_key, MESSAGE_HASH, SIGNATURE)
+    assert verify_signature(public_key, MESSAGE_HASH, SIGNATURE, cache_only=True)
+    assert len(signature_cache) == 1
+
+
+def test_signature_cache_is_bounded():
+    cache = SignatureCache(max_size=2)
+    for key in [(b'1', b'', b''), (b'2', b'', b''), (b'3', b'', b'')]:
+        cache.add(key)
+    assert len(cache) == 2
+    assert (b'1', b'', b'') not in cache
+    assert (b'3', b'', b'') in cache
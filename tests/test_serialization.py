@@ -0,0 +1,108 @@
+# Imports
+import pytest
+
+
+# Components
+from typing import Optional
+from pydantic import Field
+
+
+# Local imports
+from project_caesar.code import gaius
+from project_caesar.code.block import Block
+from project_caesar.code.genesis import get_genesis_block, get_genesis_block_json
+from project_caesar.code.output import Output
+from project_caesar.code.transaction import Transaction
+from project_caesar.utils import serialization
+
+
+def test_compact_size_round_trip():
+    for n in [0, 1, 0xFC, 0xFD, 0xFFFF, 0x10000, 0xFFFFFFFF, 0x100000000]:
+        buffer = bytearray()
+        serialization.write_compact_size(buffer, n)
+        value, offset = serialization.read_compact_size(bytes(buffer), 0)
+        assert value == n
+        assert offset == len(buffer)
+
+
+def test_int_round_trip():
+    for n in [None, 0, 1, 255, 256, 5000000000]:
+        buffer = bytearray()
+        serialization.write_int(buffer, n)
+        value, offset = serialization.read_int(bytes(buffer), 0)
+        assert value == n
+        assert offset == len(buffer)
+
+
+def test_script_round_trip():
+    lock_script = get_genesis_block_json()['transactions'][0]['outputs'][0]['lock_script']
+    b = gaius.script_to_bytes(lock_script)
+    assert b.hex() == '76a904f575f78088ac'
+    assert gaius.bytes_to_script(b) == lock_script
+
+
+def test_truncated_scripts_are_rejected():
+    data = bytes.fromhex('0102') + gaius.script_to_bytes('ff' * 0x100)
+    for end in (1, 3, 4, 5, 40):
+        with pytest.raises(ValueError):
+            gaius.bytes_to_script(data[:end])
+    for script in (b'\x4c', b'\x4d', b'\x4d\x01'):
+        with pytest.raises(ValueError):
+            gaius.bytes_to_script(script)
+
+
+def test_block_hex_is_derived_from_bytes():
+    block_0 = get_genesis_block()
+    assert block_0.hex == block_0.to_bytes().hex()
+
+
+def test_block_round_trip():
+    block_0 = get_genesis_block()
+    block_0_copy = Block.from_bytes(block_0.to_bytes())
+    assert block_0_copy.to_json() == block_0.to_json()
+    assert block_0_copy.hash == block_0.hash
+
+
+def test_transaction_round_trip():
+    tx = get_genesis_block().transactions[0]
+    tx_copy = Transaction.from_bytes(tx.to_bytes())
+    assert tx_copy.hash == tx.hash
+
+
+def test_trailing_bytes_are_rejected():
+    tx = get_genesis_block().transactions[0]
+    with pytest.raises(ValueError):
+        Transaction.from_bytes(tx.to_bytes() + b'\x00')
+
+
+def test_from_trusted():
+    block_0 = get_genesis_block()
+    tx = block_0.transactions[0]
+    trusted = Transaction.from_trusted(
+        input_count=tx.input_count,
+        output_count=tx.output_count,
+        fee=tx.fee,
+        inputs=tx.inputs,
+        outputs=tx.outputs,
+    )
+    assert trusted == tx
+    assert trusted.hash == tx.hash
+    # Missing fields get their defaults, and assignment is still validated.
+    partial = Transaction.from_trusted(fee=1)
+    assert partial.inputs is None
+    with pytest.raises(ValueError):
+        partial.fee = 'x'
+    # Bytes that the node wrote itself are parsed with from_trusted.
+    assert Block.from_bytes(block_0.to_bytes(), trusted=True) == block_0
+
+
+def test_parsed_models_are_validated_unless_trusted():
+    class FundedOutput(Output):
+        value: Optional[int] = Field(default=None, gt=0)
+
+    data = Output(value=0, lock_script=get_genesis_block().transactions[0].outputs[0].lock_script).to_bytes()
+    with pytest.raises(ValueError):
+        FundedOutput.from_bytes(data)
+    assert FundedOutput.from_bytes(data, trusted=True).value == 0
+    block_0 = get_genesis_block()
+    assert Block.from_bytes(block_0.to_bytes()) == Block.from_bytes(block_0.to_bytes(), trusted=True) == block_0
@@ -0,0 +1,118 @@
+# Imports
+import pytest
+
+
+# Local imports
+from project_caesar.code.genesis import get_genesis_block
+from project_caesar.code.input import Input
+from project_caesar.code.node import Node
+from project_caesar.code.output import Output
+from project_caesar.code.transaction import Transaction
+from project_caesar.code.utxo_set import BlockUndo, Coin, UtxoSet
+
+
+def get_spending_block(block_0, value=1000):
+    # A block at height 1 that spends the genesis coinbase output.
+    coinbase = block_0.transactions[0]
+    tx = Transaction(
+        input_count=1,
+        output_count=1,
+        fee=0,
+        inputs=[Input(previous_output={'block_height': 0, 'transaction_hash': coinbase.hash, 'output_index': 0})],
+        outputs=[Output(value=value, lock_script=coinbase.outputs[0].lock_script)],
+    )
+    block_1 = get_genesis_block()
+    block_1.previous_block = {'block_height': 0, 'block_hash': block_0.hash}
+    block_1.transactions = [tx]
+    return block_1
+
+
+def test_apply_and_undo_block(tmp_path):
+    block_0 = get_genesis_block()
+    block_1 = get_spending_block(block_0)
+    coinbase_outpoint = (0, block_0.transactions[0].hash, 0)
+    spend_outpoint = (1, block_1.transactions[0].hash, 0)
+    with UtxoSet(str(tmp_path / 'utxo.sqlite'), cache_size=1) as utxo_set:
+        utxo_set.apply_block(block_0, 0)
+        assert utxo_set.get_coin(coinbase_outpoint).value == 5000000000
+        utxo_set.apply_block(block_1, 1)
+        assert coinbase_outpoint not in utxo_set
+        assert utxo_set.get_coin(spend_outpoint).value == 1000
+        utxo_set.undo_block(1, block_0.hash)
+        assert utxo_set.height == 0
+        assert coinbase_outpoint in utxo_set
+        assert spend_outpoint not in utxo_set
+
+
+def get_coins(utxo_set):
+    utxo_set.flush()
+    return utxo_set._db.execute('SELECT * FROM utxos ORDER BY block_height, transaction_hash, output_index').fetchall()
+
+
+def test_undo_block_that_spends_its_own_output():
+    block_0 = get_genesis_block()
+    block_1 = get_spending_block(block_0)
+    tx_1 = block_1.transactions[0]
+    tx_2 = Transaction(
+        input_count=1,
+        output_count=1,
+        fee=0,
+        inputs=[Input(previous_output={'block_height': 1, 'transaction_hash': tx_1.hash, 'output_index': 0})],
+        outputs=[Output(value=900, lock_script=tx_1.outputs[0].lock_script)],
+    )
+    block_1.transactions = [tx_1, tx_2]
+    with UtxoSet() as utxo_set:
+        utxo_set.apply_block(block_0, 0)
+        coins = get_coins(utxo_set)
+        utxo_set.apply_block(block_1, 1)
+        assert (1, tx_1.hash, 0) not in utxo_set
+        assert len(utxo_set) == 1
+        utxo_set.undo_block(1, block_0.hash)
+        assert (1, tx_1.hash, 0) not in utxo_set
+        assert (1, tx_2.hash, 0) not in utxo_set
+        assert get_coins(utxo_set) == coins
+        # A block that fails after spending its own output is reverted in the same way.
+        block_1.transactions = [tx_1, tx_2, tx_2]
+        with pytest.raises(ValueError):
+            utxo_set.apply_block(block_1, 1)
+        assert (1, tx_1.hash, 0) not in utxo_set
+        assert get_coins(utxo_set) == coins
+
+
+def test_double_spend_is_rejected_and_set_is_unchanged():
+    block_0 = get_genesis_block()
+    block_1 = get_spending_block(block_0)
+    block_1.transactions = block_1.transactions * 2
+    with UtxoSet() as utxo_set:
+        utxo_set.apply_block(block_0, 0)
+        with pytest.raises(ValueError):
+            utxo_set.apply_block(block_1, 1)
+        assert utxo_set.height == 0
+        assert (0, block_0.transactions[0].hash, 0) in utxo_set
+        assert len(utxo_set) == 1
+
+
+def test_reopen_utxo_set(tmp_path):
+    block_0 = get_genesis_block()
+    path = str(tmp_path / 'utxo.sqlite')
+    with UtxoSet(path) as utxo_set:
+        utxo_set.apply_block(block_0, 0)
+    with UtxoSet(path) as utxo_set:
+        assert utxo_set.height == 0
+        assert utxo_set.block_hash == block_0.hash
+        assert (0, block_0.transactions[0].hash, 0) in utxo_set
+
+
+def test_undo_data_round_trip():
+    undo = BlockUndo(spent=[((0, 'ab' * 32, 0), Coin(5, b'\x76'))], created=[(1, 'cd' * 32, 1)])
+    assert BlockUndo.from_bytes(undo.to_bytes()) == undo
+
+
+def test_node_catches_up_utxo_set(tmp_path):
+    with Node(data_dir=str(tmp_path)) as node:
+        block_1 = get_spending_block(node.tip)
+        node.block_store.put_block(block_1)
+    # The UTXO set did not see block 1: it is applied when the node starts.
+    with Node(data_dir=str(tmp_path)) as node:
+        assert node.utxo_set.height == 1
+        assert (1, block_1.transactions[0].hash, 0) in node.utxo_set